@@ -0,0 +1,161 @@
+"""
+Plain-dict serializers for the JSON API.
+
+Each Serializer lists the fields it can output; a request picks a subset
+with ``?fields=title,slug``. Related rows are only loaded when a field that
+needs them is selected (see ``select_related`` / ``prefetch_related``), so a
+slim request costs fewer queries as well as fewer bytes.
+"""
+from core.renditions import renditions_field
+
+
+class FieldError(ValueError):
+    pass
+
+
+def absolute_url(request, url):
+    return request.build_absolute_uri(url) if url else None
+
+
+def file_url(request, field):
+    return absolute_url(request, field.url) if field else None
+
+
+def image_data(request, obj, field_name):
+    """URL, dimensions and responsive renditions (when built) of an image field"""
+    image = getattr(obj, field_name)
+    if not image:
+        return None
+    data = {'url': file_url(request, image)}
+    manifest = getattr(obj, renditions_field(field_name), None) or {}
+    if manifest.get('source') == image.name:
+        data['width'] = manifest['width']
+        data['height'] = manifest['height']
+        data['renditions'] = {
+            key: [{'width': width, 'url': absolute_url(request, image.storage.url(name))} for width, name in entries]
+            for key, entries in manifest['sources'].items()
+        }
+    return data
+
+
+class Serializer:
+    # Every field this resource can output, in output order
+    fields = ()
+    # Fields returned when the request does not pick any (default: all)
+    default_fields = None
+    # {field: relation} to select_related / prefetch_related when the field is selected
+    select_related = {}
+    prefetch_related = {}
+
+    def __init__(self, request, default_fields=None):
+        self.request = request
+        requested = request.GET.get('fields', '')
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise FieldError(
+                f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(self.fields)}"
+            )
+        if names:
+            self.selected = [name for name in self.fields if name in names]
+        else:
+            self.selected = list(default_fields or self.default_fields or self.fields)
+
+    def optimize(self, queryset):
+        """Load the relations the selected fields need, and nothing else"""
+        select = {self.select_related[name] for name in self.selected if name in self.select_related}
+        prefetch = {self.prefetch_related[name] for name in self.selected if name in self.prefetch_related}
+        if select:
+            queryset = queryset.select_related(*sorted(select))
+        if prefetch:
+            queryset = queryset.prefetch_related(*sorted(prefetch))
+        return queryset
+
+    def to_dict(self, obj):
+        data = {}
+        for name in self.selected:
+            getter = getattr(self, f'get_{name}', None)
+            data[name] = getter(obj) if getter else getattr(obj, name)
+        return data
+
+
+class CategorySerializer(Serializer):
+    fields = ('slug', 'name', 'description', 'icon', 'order', 'project_count')
+
+
+class TechnologySerializer(Serializer):
+    fields = ('name', 'icon', 'project_count')
+
+
+class ProjectSerializer(Serializer):
+    fields = (
+        'slug', 'title', 'url', 'description', 'detailed_description', 'category', 'technologies',
+        'status', 'featured', 'image', 'images', 'github_url', 'live_demo_url',
+        'start_date', 'end_date', 'created_at', 'updated_at',
+    )
+    list_fields = (
+        'slug', 'title', 'url', 'description', 'category', 'technologies', 'status',
+        'featured', 'image', 'github_url', 'live_demo_url', 'updated_at',
+    )
+    select_related = {'category': 'category'}
+    prefetch_related = {'technologies': 'technologies', 'images': 'images'}
+
+    def get_url(self, project):
+        return absolute_url(self.request, project.get_absolute_url())
+
+    def get_category(self, project):
+        return {'slug': project.category.slug, 'name': project.category.name}
+
+    def get_technologies(self, project):
+        return [technology.name for technology in project.technologies.all()]
+
+    def get_image(self, project):
+        return image_data(self.request, project, 'image')
+
+    def get_images(self, project):
+        return [
+            {**image_data(self.request, image, 'image'), 'caption': image.caption}
+            for image in project.images.all()
+        ]
+
+
+class CertificationSerializer(Serializer):
+    fields = (
+        'slug', 'title', 'url', 'issuer', 'level', 'certificate_id', 'issue_date',
+        'expiration_date', 'is_expired', 'credential_url', 'image', 'description', 'skills',
+        'featured', 'created_at', 'updated_at',
+    )
+    list_fields = (
+        'slug', 'title', 'url', 'issuer', 'level', 'issue_date', 'expiration_date',
+        'is_expired', 'credential_url', 'image', 'skills', 'featured', 'updated_at',
+    )
+    prefetch_related = {'skills': 'skills'}
+
+    def get_url(self, certification):
+        return absolute_url(self.request, certification.get_absolute_url())
+
+    def get_issuer(self, certification):
+        return {'code': certification.issuer, 'name': certification.get_issuer_display_name()}
+
+    def get_image(self, certification):
+        return image_data(self.request, certification, 'image')
+
+    def get_skills(self, certification):
+        return [{'slug': skill.slug, 'name': skill.name} for skill in certification.skills.all()]
+
+
+class ProfileSerializer(Serializer):
+    # Phone and address are not shown on the site, so they stay private here too
+    fields = (
+        'name', 'title', 'bio', 'about_me', 'image', 'resume', 'email',
+        'github_url', 'linkedin_url', 'twitter_url', 'portfolio_url', 'updated_at',
+    )
+
+    def get_name(self, profile):
+        return profile.display_name()
+
+    def get_image(self, profile):
+        return image_data(self.request, profile, 'profile_image')
+
+    def get_resume(self, profile):
+        return file_url(self.request, profile.resume)
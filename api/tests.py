@@ -0,0 +1,165 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.http import http_date
+
+from certifications.models import Certification
+from core import factories
+from projects.models import Project, ProjectCategory, ProjectImage, Technology
+
+
+class ProjectApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = ProjectCategory.objects.create(name='Machine Learning')
+        cls.django = Technology.objects.create(name='Django')
+        for i in range(5):
+            project = Project.objects.create(
+                title=f'Project {i}', slug=f'project-{i}', description='Vision model',
+                detailed_description='Details', category=cls.category,
+            )
+            if i % 2:
+                project.technologies.add(cls.django)
+        Project.objects.create(
+            title='Draft', description='d', detailed_description='d', category=cls.category, published=False,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_cursor_pages_cover_every_published_project(self):
+        url = reverse('api:project_list') + '?limit=2'
+        slugs = []
+        while url:
+            data = self.client.get(url).json()
+            self.assertLessEqual(len(data['results']), 2)
+            slugs += [project['slug'] for project in data['results']]
+            url = data['next']
+        self.assertEqual(sorted(slugs), [f'project-{i}' for i in range(5)])
+
+    def test_field_selection(self):
+        data = self.client.get(reverse('api:project_list'), {'fields': 'title,slug'}).json()
+        self.assertEqual(data['results'][0], {'slug': 'project-4', 'title': 'Project 4'})
+
+        response = self.client.get(reverse('api:project_list'), {'fields': 'title,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['error'])
+
+    def test_slim_fields_skip_related_queries(self):
+        url = reverse('api:project_list')
+        # tag versions are cached; projects plus the Last-Modified aggregate
+        with self.assertNumQueries(2):
+            self.client.get(url, {'fields': 'slug,title'})
+        # plus the technologies prefetch and the category join
+        with self.assertNumQueries(3):
+            self.client.get(url, {'fields': 'slug,category,technologies'})
+
+    def test_filters_match_the_html_list(self):
+        data = self.client.get(reverse('api:project_list'), {'technology': 'Django', 'fields': 'slug'}).json()
+        self.assertEqual([p['slug'] for p in data['results']], ['project-3', 'project-1'])
+        data = self.client.get(reverse('api:project_list'), {'q': 'vision', 'limit': 1}).json()
+        self.assertEqual(len(data['results']), 1)
+        self.assertIsNotNone(data['next'])
+
+    def test_detail_and_missing_rows(self):
+        data = self.client.get(reverse('api:project_detail', args=['project-1'])).json()
+        self.assertEqual(data['technologies'], ['Django'])
+        self.assertEqual(data['category'], {'slug': 'machine-learning', 'name': 'Machine Learning'})
+        self.assertEqual(self.client.get(reverse('api:project_detail', args=['draft'])).status_code, 404)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.client.get(reverse('api:project_list'), {'limit': 500}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('api:project_list'), {'cursor': '!!'}).status_code, 400)
+        response = self.client.post(reverse('api:project_list'))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response['Allow'], 'GET, HEAD')
+
+    def test_revalidation_with_etag_costs_no_queries(self):
+        url = reverse('api:project_detail', args=['project-1'])
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        self.assertEqual(response['Last-Modified'], http_date(Project.objects.get(slug='project-1').updated_at.timestamp()))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectImage.objects.create(project=Project.objects.get(slug='project-1'), image='projects/gallery/a.jpg')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['images']), 1)
+
+    def test_if_modified_since(self):
+        url = reverse('api:project_detail', args=['project-1'])
+        last_modified = self.client.get(url)['Last-Modified']
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 304)
+
+    def test_deleting_a_project_changes_the_list_validators(self):
+        url = reverse('api:project_list')
+        response = self.client.get(url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.get(slug='project-4').delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+
+class CatalogueApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_categories_and_technologies_count_published_projects(self):
+        category = ProjectCategory.objects.create(name='Web')
+        django = Technology.objects.create(name='Django')
+        for published in (True, False):
+            project = Project.objects.create(
+                title=f'P {published}', description='d', detailed_description='d',
+                category=category, published=published,
+            )
+            project.technologies.add(django)
+        self.assertEqual(
+            self.client.get(reverse('api:category_list')).json()['results'][0]['project_count'], 1,
+        )
+        self.assertEqual(
+            self.client.get(reverse('api:technology_list')).json()['results'],
+            [{'name': 'Django', 'icon': '', 'project_count': 1}],
+        )
+
+    def test_certifications_and_profile(self):
+        factories.create_profile()
+        factories.create_certifications(3)
+        certification = Certification.objects.filter(is_active=True).first()
+        data = self.client.get(reverse('api:certification_detail', args=[certification.slug])).json()
+        self.assertEqual(len(data['skills']), 3)
+        self.assertEqual(data['issue_date'], certification.issue_date.isoformat())
+        data = self.client.get(reverse('api:certification_list'), {'skill': data['skills'][0]['slug']}).json()
+        self.assertIn(certification.slug, [c['slug'] for c in data['results']])
+
+        profile = self.client.get(reverse('api:profile')).json()
+        self.assertEqual(profile['name'], 'Ada Lovelace')
+        self.assertNotIn('phone', profile)
+
+    def test_certification_validators_change_with_the_date(self):
+        factories.create_certifications(2)
+        url = reverse('api:certification_list')
+        response = self.client.get(url, {'validity': 'valid'})
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(
+            self.client.get(url, {'validity': 'valid'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304,
+        )
+        with mock.patch('core.caching.datetime') as clock:
+            clock.date.today.return_value = datetime.date(2099, 1, 1)
+            self.assertEqual(
+                self.client.get(url, {'validity': 'valid'}, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200,
+            )
+
+    def test_responses_allow_cross_origin_reads(self):
+        response = self.client.get(reverse('api:certification_list'))
+        self.assertEqual(response['Access-Control-Allow-Origin'], '*')
+        self.assertIn('no-cache', response['Cache-Control'])
@@ -0,0 +1,14 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('profile/', views.profile, name='profile'),
+    path('projects/', views.project_list, name='project_list'),
+    path('projects/<slug:slug>/', views.project_detail, name='project_detail'),
+    path('categories/', views.category_list, name='category_list'),
+    path('technologies/', views.technology_list, name='technology_list'),
+    path('certifications/', views.certification_list, name='certification_list'),
+    path('certifications/<slug:slug>/', views.certification_detail, name='certification_detail'),
+]
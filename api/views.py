@@ -0,0 +1,220 @@
+"""
+Read-only JSON API (v1) over the portfolio content.
+
+Lists accept the same search (?q=) and facet parameters as the HTML list
+views, ?fields= to pick output fields and ?limit= / ?cursor= for keyset
+pagination. Every response carries a strong ETag built from the cache tag
+versions and the date (see core.caching.content_etag), so revalidating unchanged data is
+answered with a 304 before any query runs, and a Last-Modified from the rows' updated_at.
+Certifications get none: is_expired and ?validity= change with the date alone, which
+If-Modified-Since cannot see.
+"""
+import datetime
+from functools import wraps
+from urllib.parse import urlencode
+
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from certifications.models import Certification
+from certifications.search import CertificationIndex
+from certifications.views import CERTIFICATION_FACETS, CERTIFICATION_ORDERING
+from certifications.views import SEARCH_ORDERING as CERTIFICATION_SEARCH_ORDERING
+from core.caching import content_etag, tag_versions, versions_timestamp
+from core.facets import FacetedFilter
+from core.pagination import KeysetPaginator
+from core.services import get_profile
+from projects.models import Project, ProjectCategory, Technology
+from projects.search import ProjectIndex
+from projects.views import PROJECT_FACETS, PROJECT_ORDERING
+from projects.views import SEARCH_ORDERING as PROJECT_SEARCH_ORDERING
+
+from .serializers import (
+    CategorySerializer, CertificationSerializer, FieldError, ProfileSerializer,
+    ProjectSerializer, TechnologySerializer,
+)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def error_response(message, status):
+    return JsonResponse({'error': message}, status=status)
+
+
+def query_key(request):
+    """Every parameter counts here (fields, limit...), in a stable order"""
+    return urlencode(sorted(request.GET.lists()), doseq=True)
+
+
+def version_time(versions):
+    timestamp = versions_timestamp(versions)
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc) if timestamp else None
+
+
+def respond(request, tags, view_func, *args, **kwargs):
+    versions = tag_versions(*tags)
+    etag = content_etag(request.path, query_key(request), versions)
+    # An unchanged ETag is answered without touching the database
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            data, last_modified = view_func(request, *args, **kwargs)
+        except (ApiError, FieldError) as exc:
+            return error_response(str(exc), getattr(exc, 'status', 400))
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=timestamp, response=JsonResponse(data),
+        )
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+    response['ETag'] = etag
+    # Shared caches may store it but must revalidate before reuse
+    patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def read_only(*tags):
+    """
+    Turn a view returning (data, last_modified) into a cacheable GET-only
+    JSON endpoint depending on the given cache tags.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                response = error_response(f'Method {request.method} not allowed', 405)
+                response['Allow'] = 'GET, HEAD'
+            else:
+                response = respond(request, tags, view_func, *args, **kwargs)
+            # Public data: any site may read it
+            response['Access-Control-Allow-Origin'] = '*'
+            response['Access-Control-Expose-Headers'] = 'ETag, Last-Modified'
+            return response
+        return wrapper
+    return decorator
+
+
+def page_limit(request):
+    value = request.GET.get('limit')
+    if value is None:
+        return DEFAULT_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ApiError('limit must be a number')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f'limit must be between 1 and {MAX_LIMIT}')
+    return limit
+
+
+def paginated(request, queryset, ordering, serializer):
+    """Keyset page of `queryset` with a link to the next one"""
+    paginator = KeysetPaginator(serializer.optimize(queryset), ordering, page_limit(request))
+    cursor = request.GET.get('cursor')
+    if cursor and paginator.decode(cursor) is None:
+        raise ApiError('Invalid cursor')
+    page = paginator.page(cursor)
+
+    next_url = None
+    if page.has_next:
+        query = request.GET.copy()
+        query['cursor'] = page.next_cursor
+        next_url = request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+    return {
+        'results': [serializer.to_dict(obj) for obj in page],
+        'next': next_url,
+    }
+
+
+def newest(queryset, versions_time):
+    """Latest updated_at among the rows, or the last purge if that is later
+    (deleting a row leaves no updated_at behind)"""
+    updated_at = queryset.order_by().aggregate(latest=Max('updated_at'))['latest']
+    return max(filter(None, [updated_at, versions_time]), default=None)
+
+
+def filtered(request, queryset, index, facets, tag):
+    """Search and facet filters shared with the HTML list views"""
+    query = request.GET.get('q')
+    if query:
+        queryset = index.search(queryset, query)
+    return FacetedFilter(request, facets, tags=(tag,)).apply(queryset), bool(query)
+
+
+@read_only('profile')
+def profile(request):
+    owner = get_profile()
+    if owner is None:
+        raise ApiError('No profile', status=404)
+    return ProfileSerializer(request).to_dict(owner), owner.updated_at
+
+
+@read_only('projects')
+def project_list(request):
+    serializer = ProjectSerializer(request, default_fields=ProjectSerializer.list_fields)
+    projects, searched = filtered(
+        request, Project.objects.filter(published=True), ProjectIndex, PROJECT_FACETS, 'projects',
+    )
+    ordering = PROJECT_SEARCH_ORDERING if searched else PROJECT_ORDERING
+    data = paginated(request, projects, ordering, serializer)
+    return data, newest(projects, version_time(tag_versions('projects')))
+
+
+@read_only('projects')
+def project_detail(request, slug):
+    serializer = ProjectSerializer(request)
+    project = serializer.optimize(Project.objects.filter(published=True, slug=slug)).first()
+    if project is None:
+        raise ApiError('Project not found', status=404)
+    return serializer.to_dict(project), project.updated_at
+
+
+@read_only('projects')
+def category_list(request):
+    serializer = CategorySerializer(request)
+    categories = ProjectCategory.objects.filter(is_active=True).annotate(
+        project_count=Count('projects', filter=Q(projects__published=True)),
+    )
+    data = {'results': [serializer.to_dict(category) for category in categories]}
+    return data, version_time(tag_versions('projects'))
+
+
+@read_only('projects')
+def technology_list(request):
+    serializer = TechnologySerializer(request)
+    technologies = Technology.objects.annotate(
+        project_count=Count('projects', filter=Q(projects__published=True)),
+    )
+    data = {'results': [serializer.to_dict(technology) for technology in technologies]}
+    return data, version_time(tag_versions('projects'))
+
+
+@read_only('certifications')
+def certification_list(request):
+    serializer = CertificationSerializer(request, default_fields=CertificationSerializer.list_fields)
+    certifications, searched = filtered(
+        request, Certification.objects.filter(is_active=True), CertificationIndex,
+        CERTIFICATION_FACETS, 'certifications',
+    )
+    ordering = CERTIFICATION_SEARCH_ORDERING if searched else CERTIFICATION_ORDERING
+    # Dated (see the module docstring): revalidated by ETag only
+    return paginated(request, certifications, ordering, serializer), None
+
+
+@read_only('certifications')
+def certification_detail(request, slug):
+    serializer = CertificationSerializer(request)
+    certification = serializer.optimize(Certification.objects.filter(is_active=True, slug=slug)).first()
+    if certification is None:
+        raise ApiError('Certification not found', status=404)
+    return serializer.to_dict(certification), None
@@ -1,6 +1,16 @@
 from django.contrib import admin
+from django.db.models import DateField, Value
+from django.utils import timezone
 from django.utils.html import format_html
-from .models import Certification
+from core.actions import bulk_update_action
+from .models import Certification, Skill
+from .signals import certifications_updated
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug')
+    search_fields = ('name',)
+    prepopulated_fields = {'slug': ('name',)}
 
 @admin.register(Certification)
 class CertificationAdmin(admin.ModelAdmin):
@@ -17,17 +27,24 @@ class CertificationAdmin(admin.ModelAdmin):
     )
     list_filter = ('issuer', 'level', 'featured', 'is_active', 'issue_date')
     list_editable = ('featured', 'is_active')
-    search_fields = ('title', 'description', 'certificate_id', 'skills')
+    search_fields = ('title', 'description', 'certificate_id', 'skills__name')
+    filter_horizontal = ('skills',)
     prepopulated_fields = {'slug': ('title',)}
-    readonly_fields = ('preview_image', 'created_at', 'updated_at', 'is_expired_display')
+    readonly_fields = ('preview_image', 'image_status', 'created_at', 'updated_at', 'is_expired_display')
     date_hierarchy = 'issue_date'
+    actions = [
+        bulk_update_action('activate', 'Activate selected certifications', certifications_updated, is_active=True),
+        bulk_update_action('deactivate', 'Deactivate selected certifications', certifications_updated, is_active=False),
+        bulk_update_action('feature', 'Feature selected certifications', certifications_updated, featured=True),
+        bulk_update_action('unfeature', 'Unfeature selected certifications', certifications_updated, featured=False),
+    ]
     
     fieldsets = (
         ('Basic Information', {
             'fields': ('title', 'slug', 'issuer', 'issuer_other', 'level', 'featured', 'is_active')
         }),
         ('Certification Details', {
-            'fields': ('certificate_id', 'issue_date', 'expiration_date', 'credential_url', 'image', 'preview_image')
+            'fields': ('certificate_id', 'issue_date', 'expiration_date', 'credential_url', 'image', 'image_status', 'preview_image')
         }),
         ('Description & Skills', {
             'fields': ('description', 'skills')
@@ -56,14 +73,21 @@ class CertificationAdmin(admin.ModelAdmin):
         return "-"
     preview_image.short_description = 'Preview'
     
+    def get_queryset(self, request):
+        # One date for the whole request instead of several clock reads per row
+        return super().get_queryset(request).annotate(
+            checked_on=Value(timezone.now().date(), output_field=DateField())
+        )
+    
+    @admin.display(description='Status', ordering='expiration_date')
     def is_expired_display(self, obj):
-        if obj.is_expired:
+        today = getattr(obj, 'checked_on', None) or timezone.now().date()
+        days_left = (obj.expiration_date - today).days if obj.expiration_date else None
+        if days_left is not None and days_left < 0:
             return format_html('<span style="color: red; font-weight: bold;">EXPIRED</span>')
-        elif obj.expiration_date:
-            days_left = obj.days_until_expiry
+        elif days_left is not None:
             if days_left < 30:
                 return format_html('<span style="color: orange; font-weight: bold;">Expires in {} days</span>', days_left)
             else:
                 return format_html('<span style="color: green;">Valid ({} days left)</span>', days_left)
-        return format_html('<span style="color: green;">No expiration</span>')
-    is_expired_display.short_description = 'Status'
\ No newline at end of file
+        return format_html('<span style="color: green;">No expiration</span>')
\ No newline at end of file
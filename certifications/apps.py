@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CertificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'certifications'
+
+    def ready(self):
+        from certifications import related, signals  # noqa: F401
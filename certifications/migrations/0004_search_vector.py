@@ -0,0 +1,79 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:26
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+ISSUER_NAMES = """
+    CASE
+        WHEN c.issuer = 'other' AND coalesce(c.issuer_other, '') <> '' THEN c.issuer_other
+        WHEN c.issuer = 'coursera' THEN 'Coursera'
+        WHEN c.issuer = 'edx' THEN 'edX'
+        WHEN c.issuer = 'udacity' THEN 'Udacity'
+        WHEN c.issuer = 'linkedin_learning' THEN 'LinkedIn Learning'
+        WHEN c.issuer = 'deeplearning-ai' THEN 'DeepLearning.AI'
+        WHEN c.issuer = 'google' THEN 'Google'
+        WHEN c.issuer = 'microsoft' THEN 'Microsoft'
+        WHEN c.issuer = 'aws' THEN 'AWS'
+        WHEN c.issuer = 'ibm' THEN 'IBM'
+        ELSE 'Other'
+    END
+"""
+
+POSTGRESQL_FORWARD = [
+    'CREATE INDEX certifications_certification_search_gin ON certifications_certification USING gin (search_vector)',
+    f"""
+    UPDATE certifications_certification c SET search_vector =
+        setweight(to_tsvector('english', coalesce(c.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(c.skills, '')), 'B') ||
+        setweight(to_tsvector('english', {ISSUER_NAMES}), 'B') ||
+        setweight(to_tsvector('english', coalesce(c.description, '')), 'C')
+    """,
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE certifications_certification_fts USING fts5(
+        title, skills, issuer, description,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    f"""
+    INSERT INTO certifications_certification_fts (rowid, title, skills, issuer, description)
+    SELECT c.id, c.title, c.skills, {ISSUER_NAMES}, c.description
+    FROM certifications_certification c
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        'postgresql': POSTGRESQL_FORWARD,
+        'sqlite': SQLITE_FORWARD,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS certifications_certification_search_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS certifications_certification_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certification',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+def mark_existing_images_pending(apps, schema_editor):
+    # Images uploaded before the pipeline existed were never resized
+    apps.get_model('certifications', 'Certification').objects.exclude(image='').exclude(image__isnull=True).update(image_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0004_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certification',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('', 'No image'), ('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(mark_existing_images_pending, migrations.RunPython.noop),
+    ]
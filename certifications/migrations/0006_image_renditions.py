@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:29
+
+from django.db import migrations, models
+
+
+def queue_rendition_builds(apps, schema_editor):
+    # Re-run the image pipeline so existing images get their renditions
+    apps.get_model('certifications', 'Certification').objects.exclude(image='').exclude(image__isnull=True).update(image_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0005_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certification',
+            name='image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(queue_rendition_builds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0006_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-featured', '-issue_date', '-id'], name='cert_list_keyset_idx'),
+        ),
+    ]
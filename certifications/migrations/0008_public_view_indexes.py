@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0007_list_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['issuer', '-issue_date'], name='cert_issuer_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['level', '-issue_date'], name='cert_level_idx'),
+        ),
+    ]
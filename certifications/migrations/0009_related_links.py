@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0008_public_view_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedCertification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_to_links', to='certifications.certification')),
+                ('source', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_links', to='certifications.certification')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'indexes': [models.Index(fields=['source', '-score'], name='related_cert_score_idx')],
+                'constraints': [models.UniqueConstraint(fields=('source', 'related'), name='unique_related_certification')],
+            },
+        ),
+    ]
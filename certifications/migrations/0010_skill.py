@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:51
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0009_related_links'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(blank=True, max_length=100, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Skill',
+                'verbose_name_plural': 'Skills',
+                'ordering': ['name'],
+                'constraints': [models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='unique_skill_name_ci')],
+            },
+        ),
+        # Renamed to `skills` once the text column is gone (0012)
+        migrations.AddField(
+            model_name='certification',
+            name='skill_set',
+            field=models.ManyToManyField(blank=True, related_name='certifications', to='certifications.skill'),
+        ),
+    ]
@@ -0,0 +1,81 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+BATCH_SIZE = 1000
+
+# Skill.name and Skill.slug max_length
+MAX_LENGTH = 100
+
+
+def split_skills(text):
+    """Skill names in `text`, cut to fit Skill.name"""
+    names = (name.strip()[:MAX_LENGTH].strip() for name in (text or '').split(','))
+    return [name for name in names if name]
+
+
+def unique_slug(name, taken, max_length=MAX_LENGTH):
+    base = slugify(name)[:max_length].rstrip('-') or 'skill'
+    slug, n = base, 1
+    while slug in taken:
+        n += 1
+        suffix = f'-{n}'
+        slug = base[:max_length - len(suffix)].rstrip('-') + suffix
+    return slug
+
+
+def text_to_skills(apps, schema_editor):
+    """Parse every comma-separated skills column into Skill rows and links, in bulk"""
+    Certification = apps.get_model('certifications', 'Certification')
+    Skill = apps.get_model('certifications', 'Skill')
+    Link = Certification.skill_set.through
+
+    rows = list(Certification.objects.exclude(skills='').values_list('pk', 'skills'))
+
+    # First spelling seen wins; "PyTorch" and "pytorch" become one skill
+    names = {}
+    for _, text in rows:
+        for name in split_skills(text):
+            names.setdefault(name.lower(), name)
+
+    taken = set()
+    skills = []
+    for name in names.values():
+        slug = unique_slug(name, taken)
+        taken.add(slug)
+        skills.append(Skill(name=name, slug=slug))
+    Skill.objects.bulk_create(skills, batch_size=BATCH_SIZE)
+    skill_ids = {name.lower(): pk for pk, name in Skill.objects.values_list('pk', 'name')}
+
+    links = {
+        (certification_id, skill_ids[name.lower()])
+        for certification_id, text in rows
+        for name in split_skills(text)
+    }
+    Link.objects.bulk_create(
+        (Link(certification_id=certification_id, skill_id=skill_id) for certification_id, skill_id in links),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def skills_to_text(apps, schema_editor):
+    Certification = apps.get_model('certifications', 'Certification')
+    Link = Certification.skill_set.through
+
+    names = {}
+    for certification_id, name in Link.objects.order_by('skill__name').values_list('certification_id', 'skill__name'):
+        names.setdefault(certification_id, []).append(name)
+    certifications = list(Certification.objects.filter(pk__in=names))
+    for certification in certifications:
+        certification.skills = ', '.join(names[certification.pk])
+    Certification.objects.bulk_update(certifications, ['skills'], batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0010_skill'),
+    ]
+
+    operations = [
+        migrations.RunPython(text_to_skills, skills_to_text),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0011_populate_skills'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='certification',
+            name='skills',
+        ),
+        migrations.RenameField(
+            model_name='certification',
+            old_name='skill_set',
+            new_name='skills',
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0012_skills_relation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='certification',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-updated_at'], name='cert_updated_idx'),
+        ),
+    ]
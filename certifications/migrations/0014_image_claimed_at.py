@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certifications', '0013_api_last_modified_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certification',
+            name='image_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,12 +1,81 @@
 from django.db import models
+from django.db.models.functions import Lower
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from django.urls import reverse
 from django.utils import timezone
-from io import BytesIO
-from django.core.files.uploadedfile import InMemoryUploadedFile
-import os
+from core import images
+
+def unique_slug(name, taken, max_length=100):
+    """slugify(name), suffixed with -2, -3... while it is in `taken`, in at most max_length characters"""
+    base = slugify(name)[:max_length].rstrip('-') or 'skill'
+    slug, n = base, 1
+    while slug in taken:
+        n += 1
+        suffix = f'-{n}'
+        slug = base[:max_length - len(suffix)].rstrip('-') + suffix
+    return slug
+
+class SkillManager(models.Manager):
+
+    def for_names(self, names):
+        """
+        Skills for the given names, matched case-insensitively and created in
+        bulk when missing. Returned in the order of the names, without repeats.
+        """
+        wanted = {}
+        for name in names:
+            # Skill.name holds 100 characters; longer names match on those
+            name = name.strip()[:100].strip()
+            if name:
+                wanted.setdefault(name.lower(), name)
+        if not wanted:
+            return []
+
+        existing = {
+            skill.lower_name: skill
+            for skill in self.annotate(lower_name=Lower('name')).filter(lower_name__in=wanted)
+        }
+        missing = [key for key in wanted if key not in existing]
+        if missing:
+            taken = set(self.values_list('slug', flat=True))
+            new = []
+            for key in missing:
+                slug = unique_slug(wanted[key], taken)
+                taken.add(slug)
+                new.append(Skill(name=wanted[key], slug=slug))
+            for skill in self.bulk_create(new):
+                existing[skill.name.lower()] = skill
+        return [existing[key] for key in wanted]
+
+class Skill(models.Model):
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=100, unique=True, blank=True)
+
+    objects = SkillManager()
+
+    class Meta:
+        verbose_name = 'Skill'
+        verbose_name_plural = 'Skills'
+        ordering = ['name']
+        constraints = [
+            # "PyTorch" and "pytorch" are the same skill
+            models.UniqueConstraint(Lower('name'), name='unique_skill_name_ci'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self.slug:
+            taken = set(Skill.objects.exclude(pk=self.pk).values_list('slug', flat=True))
+            self.slug = unique_slug(self.name, taken)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
 
 class Certification(models.Model):
+    # Uploaded images are resized to fit within this box (see core.images)
+    IMAGE_MAX_SIZE = (600, 400)
+    
     ISSUER_CHOICES = [
         ('coursera', 'Coursera'),
         ('edx', 'edX'),
@@ -36,8 +105,13 @@ class Certification(models.Model):
     expiration_date = models.DateField(blank=True, null=True)
     credential_url = models.URLField()
     image = models.ImageField(upload_to='certifications/', blank=True, null=True)
+    image_status = models.CharField(
+        max_length=20, choices=images.IMAGE_STATUS_CHOICES, default='', blank=True, editable=False
+    )
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    image_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     description = models.TextField()
-    skills = models.TextField(blank=True, help_text="Comma-separated list of skills")
+    skills = models.ManyToManyField(Skill, blank=True, related_name='certifications')
     level = models.CharField(max_length=20, choices=LEVEL_CHOICES, default='intermediate')
     featured = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
@@ -46,6 +120,9 @@ class Certification(models.Model):
     meta_description = models.CharField(max_length=255, blank=True)
     meta_keywords = models.CharField(max_length=255, blank=True)
     
+    # Maintained by core.search on PostgreSQL (SQLite uses an FTS5 table)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True) 
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -53,46 +130,41 @@ class Certification(models.Model):
         verbose_name = 'Certification'
         verbose_name_plural = 'Certifications'
         ordering = ['-issue_date', '-featured']
+        indexes = [
+            # Keyset pagination of the public list (see certifications.views)
+            models.Index(
+                fields=['-featured', '-issue_date', '-id'],
+                condition=models.Q(is_active=True),
+                name='cert_list_keyset_idx',
+            ),
+            # Issuer/level filters on the list; OR-ed together for related
+            # certifications on the detail page
+            models.Index(
+                fields=['issuer', '-issue_date'],
+                condition=models.Q(is_active=True),
+                name='cert_issuer_idx',
+            ),
+            models.Index(
+                fields=['level', '-issue_date'],
+                condition=models.Q(is_active=True),
+                name='cert_level_idx',
+            ),
+            # Last-Modified of the API certification list (see api.views)
+            models.Index(
+                fields=['-updated_at'],
+                condition=models.Q(is_active=True),
+                name='cert_updated_idx',
+            ),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
             
-        # Resize certification image before saving
-        if self.image and not self._state.adding:
-            try:
-                from PIL import Image
-                
-                img = Image.open(self.image)
-                
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Resize to optimal certification image size (600x400 max)
-                max_size = (600, 400)
-                if img.height > max_size[1] or img.width > max_size[0]:
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                    
-                    # Save the resized image
-                    img_io = BytesIO()
-                    img.save(img_io, format='JPEG', quality=85, optimize=True)
-                    img_io.seek(0)
-                    
-                    # Replace the image field
-                    self.image = InMemoryUploadedFile(
-                        img_io,
-                        'ImageField',
-                        f"{os.path.splitext(self.image.name)[0]}.jpg",
-                        'image/jpeg',
-                        img_io.getbuffer().nbytes,
-                        None
-                    )
-            except Exception as e:
-                print(f"Error processing certification image: {e}")
-                pass
-        
+        # Resize certification image to 600x400 max once the upload is stored
+        images.mark_pending(self, 'image')
         super().save(*args, **kwargs)
+        images.schedule(self, 'image', self.IMAGE_MAX_SIZE)
 
     def __str__(self):
         return self.title
@@ -107,9 +179,16 @@ class Certification(models.Model):
     
     @property
     def skills_list(self):
-        if self.skills:
-            return [skill.strip() for skill in self.skills.split(',')]
-        return []
+        """Skill names, kept for templates written against the old text field"""
+        if self.pk is None:
+            return []
+        return [skill.name for skill in self.skills.all()]
+
+    def set_skills(self, names):
+        """Replace the skills with those named, creating any new ones"""
+        if isinstance(names, str):
+            names = names.split(',')
+        self.skills.set(Skill.objects.for_names(names))
     
     @property
     def is_expired(self):
@@ -181,4 +260,22 @@ class Certification(models.Model):
     def years_since_issue(self):
         """Calculate years since certification was issued"""
         delta = timezone.now().date() - self.issue_date
-        return delta.days // 365
\ No newline at end of file
+        return delta.days // 365
+
+class RelatedCertification(models.Model):
+    """Precomputed neighbours of a certification (see certifications.related)"""
+    source = models.ForeignKey(Certification, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Certification, on_delete=models.CASCADE, related_name='related_to_links')
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'related'], name='unique_related_certification'),
+        ]
+        indexes = [
+            models.Index(fields=['source', '-score'], name='related_cert_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.source_id} -> {self.related_id} ({self.score:.2f})'
@@ -0,0 +1,49 @@
+from django.db.models import Q
+
+from core.related import RelatedIndex, jaccard, register
+from .models import Certification, RelatedCertification
+
+SKILL_WEIGHT = 3.0
+ISSUER_WEIGHT = 1.0
+LEVEL_WEIGHT = 0.5
+
+
+@register
+class CertificationRelations(RelatedIndex):
+    model = Certification
+    link_model = RelatedCertification
+    tag = 'certifications'
+
+    def features(self, condition=Q()):
+        certifications = Certification.objects.filter(condition, is_active=True)
+        rows = certifications.values_list('pk', 'issuer', 'level', 'issue_date')
+        features = {
+            pk: {'issuer': issuer, 'level': level, 'skills': set(), 'date': issue_date}
+            for pk, issuer, level, issue_date in rows
+        }
+        links = Certification.skills.through.objects.filter(
+            certification__in=certifications.values('pk'),
+        ).values_list('certification_id', 'skill_id')
+        for certification_id, skill_id in links.iterator(chunk_size=5000):
+            if certification_id in features:
+                features[certification_id]['skills'].add(skill_id)
+        return features
+
+    def keys(self, features):
+        return [('issuer', features['issuer']), ('level', features['level'])] + [
+            ('skill', skill) for skill in features['skills']
+        ]
+
+    def sharing(self, keys):
+        through = Certification.skills.through.objects.filter(skill_id__in=keys['skill'])
+        return (
+            Q(issuer__in=keys['issuer']) | Q(level__in=keys['level'])
+            | Q(pk__in=through.values('certification_id'))
+        )
+
+    def similarity(self, a, b):
+        return (
+            SKILL_WEIGHT * jaccard(a['skills'], b['skills'])
+            + ISSUER_WEIGHT * (a['issuer'] == b['issuer'])
+            + LEVEL_WEIGHT * (a['level'] == b['level'])
+        )
@@ -0,0 +1,54 @@
+from django.db.models import Case, CharField, Exists, F, OuterRef, Q, Subquery, Value, When
+
+from core.search import SearchIndex, register
+from .models import Certification, Skill
+
+
+@register
+class CertificationIndex(SearchIndex):
+    model = Certification
+    columns = (
+        ('title', 'A'),
+        ('skills', 'B'),
+        ('issuer', 'B'),
+        ('description', 'C'),
+    )
+
+    def get_queryset(self):
+        return Certification.objects.prefetch_related('skills')
+
+    def document(self, certification):
+        return [
+            certification.title,
+            ', '.join(skill.name for skill in certification.skills.all()),
+            certification.get_issuer_display_name(),
+            certification.description,
+        ]
+
+    def vector_expressions(self):
+        # PostgreSQL only; importing it loads the psycopg type adapters
+        from django.contrib.postgres.aggregates import StringAgg
+
+        issuer_name = Case(
+            When(issuer='other', issuer_other__gt='', then=F('issuer_other')),
+            *(When(issuer=code, then=Value(label)) for code, label in Certification.ISSUER_CHOICES),
+            output_field=CharField(),
+        )
+        skill_names = Skill.objects.filter(
+            certifications=OuterRef('pk'),
+        ).values('certifications').annotate(
+            names=StringAgg('name', delimiter=', '),
+        ).values('names')
+        return [F('title'), Subquery(skill_names), issuer_name, F('description')]
+
+    def fallback_filter(self, query):
+        matching_skills = Certification.skills.through.objects.filter(
+            certification=OuterRef('pk'),
+            skill__name__icontains=query,
+        )
+        return (
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Exists(matching_skills) |
+            Q(issuer_other__icontains=query)
+        )
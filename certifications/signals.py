@@ -0,0 +1,94 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.caching import purge
+from core.related import schedule_refresh
+from .models import Certification, Skill
+from .search import CertificationIndex
+
+
+@receiver([post_save, post_delete], sender=Certification)
+@receiver([post_save, post_delete], sender=Skill)
+@receiver(m2m_changed, sender=Certification.skills.through)
+def certification_changed(sender, **kwargs):
+    # After the commit, or a request in between could cache the old rows again
+    transaction.on_commit(lambda: purge('certifications'))
+
+
+@receiver(post_save, sender=Certification)
+def index_certification(sender, instance, **kwargs):
+    CertificationIndex.update(instance)
+
+
+@receiver(post_delete, sender=Certification)
+def unindex_certification(sender, instance, **kwargs):
+    CertificationIndex.remove(instance.pk)
+
+
+@receiver(post_save, sender=Certification)
+def refresh_certification_relations(sender, instance, **kwargs):
+    schedule_refresh(Certification, [instance.pk])
+
+
+@receiver(pre_delete, sender=Certification)
+def remember_related_sources(sender, instance, **kwargs):
+    # The links pointing at the certification are about to cascade away
+    instance._related_sources = list(instance.related_to_links.values_list('source_id', flat=True))
+
+
+@receiver(post_delete, sender=Certification)
+def refresh_after_certification_delete(sender, instance, **kwargs):
+    schedule_refresh(Certification, [instance.pk], getattr(instance, '_related_sources', ()))
+
+
+def touch_certifications(queryset):
+    """Bump updated_at so API Last-Modified headers follow skill changes"""
+    queryset.update(updated_at=timezone.now())
+
+
+def certifications_updated(pks):
+    """What post_save does for certifications changed with QuerySet.update() (see core.actions)"""
+    transaction.on_commit(lambda: purge('certifications'))
+    schedule_refresh(Certification, pks)
+
+
+@receiver(post_save, sender=Skill)
+def index_skill_certifications(sender, instance, created, **kwargs):
+    if not created:
+        CertificationIndex.update_many(instance.certifications.all())
+        touch_certifications(instance.certifications.all())
+
+
+@receiver(pre_delete, sender=Skill)
+def remember_skill_certifications(sender, instance, **kwargs):
+    # The through rows are deleted without an m2m_changed signal
+    instance._certification_ids = list(instance.certifications.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def reindex_certifications_losing_skill(sender, instance, **kwargs):
+    pks = instance._certification_ids
+    CertificationIndex.update_many(Certification.objects.filter(pk__in=pks))
+    touch_certifications(Certification.objects.filter(pk__in=pks))
+    schedule_refresh(Certification, pks)
+
+
+@receiver(m2m_changed, sender=Certification.skills.through)
+def index_certification_skills(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # skill.certifications.clear(): remember who loses the skill
+        instance._cleared_certification_ids = list(instance.certifications.values_list('pk', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        pks = [instance.pk]
+    elif action == 'post_clear':
+        pks = instance._cleared_certification_ids
+    else:
+        pks = list(pk_set)
+    CertificationIndex.update_many(Certification.objects.filter(pk__in=pks))
+    touch_certifications(Certification.objects.filter(pk__in=pks))
+    schedule_refresh(Certification, pks)
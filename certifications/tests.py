@@ -1,3 +1,139 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from importlib import import_module
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.services import get_profile
+
+from .models import Certification, Skill, unique_slug
+
+
+def create_certification(title, skills='', **kwargs):
+    fields = {
+        'issuer': 'coursera', 'level': 'beginner', 'issue_date': date(2024, 1, 1),
+        'credential_url': 'https://example.com', 'description': 'd', **kwargs,
+    }
+    certification = Certification.objects.create(title=title, **fields)
+    certification.set_skills(skills)
+    return certification
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class SkillTests(TestCase):
+
+    def test_names_are_matched_case_insensitively(self):
+        first = create_certification('First', 'PyTorch, CNNs')
+        second = create_certification('Second', 'pytorch ,OpenCV, ')
+        self.assertEqual(Skill.objects.count(), 3)
+        self.assertEqual(second.skills_list, ['OpenCV', 'PyTorch'])
+        self.assertEqual(set(first.skills.all()) & set(second.skills.all()), {Skill.objects.get(slug='pytorch')})
+
+    def test_colliding_slugs_get_a_suffix(self):
+        create_certification('Languages', 'C++, C#')
+        self.assertEqual(sorted(Skill.objects.values_list('slug', flat=True)), ['c', 'c-2'])
+
+    def test_long_names_and_slugs_fit_their_columns(self):
+        certification = create_certification('Long', f"{'x' * 120}, {'X' * 110}")
+        self.assertEqual([skill.name for skill in certification.skills.all()], ['x' * 100])
+        self.assertEqual(unique_slug('a' * 150, {'a' * 100}), 'a' * 98 + '-2')
+
+        populate = import_module('certifications.migrations.0011_populate_skills')
+        self.assertEqual(populate.split_skills(f"{'y' * 120}, Y{'y' * 99}z"), ['y' * 100, 'Y' + 'y' * 99])
+        self.assertEqual(populate.unique_slug('a' * 150, {'a' * 100}), 'a' * 98 + '-2')
+
+    def test_skill_filter_is_exact(self):
+        react = create_certification('Frontend', 'React')
+        create_certification('Stats', 'R')
+        response = self.client.get(reverse('certifications:certification_list'), {'skill': 'r'})
+        self.assertNotIn(react, list(response.context['certifications']))
+        self.assertEqual(len(response.context['certifications']), 1)
+
+    def test_facets_count_within_the_other_filters(self):
+        create_certification('One', 'Python, SQL')
+        create_certification('Two', 'Python')
+        create_certification('Three', 'Python', issuer='aws')
+        response = self.client.get(reverse('certifications:certification_list'), {'issuer': 'coursera', 'skill': 'sql'})
+        facets = {facet['name']: facet for facet in response.context['facets']}
+        skills = {option['value']: option['count'] for option in facets['skill']['options']}
+        self.assertEqual(skills, {'python': 2, 'sql': 1})
+        issuers = {option['value']: option['count'] for option in facets['issuer']['options']}
+        self.assertEqual((issuers['coursera'], issuers['aws']), (1, 0))
+
+    def test_expired_certifications_can_be_filtered(self):
+        create_certification('Old', expiration_date=date(2020, 1, 1), issue_date=date(2019, 1, 1))
+        create_certification('Current')
+        response = self.client.get(reverse('certifications:certification_list'), {'validity': 'expired'})
+        self.assertEqual([c.title for c in response.context['certifications']], ['Old'])
+        validity = next(facet for facet in response.context['facets'] if facet['name'] == 'validity')
+        self.assertEqual({option['value']: option['count'] for option in validity['options']}, {'valid': 1, 'expired': 1})
+
+    def test_search_follows_skill_changes(self):
+        certification = create_certification('Course', 'Django')
+        url = reverse('certifications:certification_list')
+        self.assertEqual(len(self.client.get(url, {'q': 'djan'}).context['certifications']), 1)
+        certification.set_skills(['Flask'])
+        self.assertEqual(len(self.client.get(url, {'q': 'djan'}).context['certifications']), 0)
+        Skill.objects.filter(slug='flask').get().delete()
+        self.assertEqual(len(self.client.get(url, {'q': 'flask'}).context['certifications']), 0)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class RelatedCertificationTests(TestCase):
+
+    def create(self, title, issuer, level, skills, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_certification(title, skills, issuer=issuer, level=level, **kwargs)
+
+    def test_shared_skills_rank_first_and_inactive_rows_are_hidden(self):
+        deep_learning = self.create('Deep Learning', 'coursera', 'advanced', 'PyTorch, CNNs')
+        vision = self.create('Computer Vision', 'udacity', 'beginner', 'pytorch, OpenCV')
+        same_issuer = self.create('SQL Basics', 'coursera', 'beginner', 'SQL')
+        self.create('Hidden', 'coursera', 'advanced', 'PyTorch, CNNs', is_active=False)
+        self.create('Unrelated', 'aws', 'expert', 'Networking')
+
+        response = self.client.get(reverse('certifications:certification_detail', args=[deep_learning.slug]))
+        self.assertEqual(list(response.context['related_certifications']), [vision, same_issuer])
+
+
+class CertificationAdminTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        # Cached for the rest of the test, so every changelist costs the same
+        get_profile()
+
+    def changelist(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:certifications_certification_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return response, len(queries)
+
+    def test_changelist_shows_expiry_without_per_row_queries(self):
+        today = timezone.now().date()
+        create_certification('Expired', expiration_date=today - timedelta(days=1))
+        _, before = self.changelist()
+        create_certification('Soon', expiration_date=today + timedelta(days=10))
+        create_certification('Later', expiration_date=today + timedelta(days=100))
+        create_certification('Forever')
+        response, after = self.changelist()
+        self.assertEqual(before, after)
+        self.assertContains(response, 'EXPIRED')
+        self.assertContains(response, 'Expires in 10 days')
+        self.assertContains(response, 'Valid (100 days left)')
+        self.assertContains(response, 'No expiration')
+
+    def test_bulk_deactivate_updates_only_changed_rows(self):
+        active = create_certification('Active')
+        inactive = create_certification('Inactive', is_active=False)
+        data = {'action': 'deactivate', '_selected_action': [active.pk, inactive.pk]}
+        response = self.client.post(reverse('admin:certifications_certification_changelist'), data, follow=True)
+        self.assertContains(response, '1 Certification updated.')
+        active.refresh_from_db()
+        self.assertFalse(active.is_active)
+        self.assertGreater(active.updated_at, inactive.updated_at)
 
-# Create your tests here.
@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'certifications'
 
+# Public pages use their async views when served over ASGI (see settings.ASYNC_VIEWS)
 urlpatterns = [
-    path('', views.certification_list, name='certification_list'),
-    path('<slug:slug>/', views.certification_detail, name='certification_detail'),
+    path('', views.acertification_list if settings.ASYNC_VIEWS else views.certification_list, name='certification_list'),
+    path('<slug:slug>/', views.acertification_detail if settings.ASYNC_VIEWS else views.certification_detail, name='certification_detail'),
 ]
\ No newline at end of file
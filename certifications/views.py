@@ -1,73 +1,119 @@
+from django.conf import settings
+from django.db.models import Case, CharField, Value, When
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q
+from django.utils import timezone
+from asgiref.sync import sync_to_async
+from core.caching import cache_public_page
+from core.concurrency import gather_queries, load_queries
+from core.facets import Facet, FacetedFilter
+from core.pagination import KeysetPaginator, is_partial
 from .models import Certification
+from .search import CertificationIndex
 
-def certification_list(request):
+CERTIFICATIONS_PER_PAGE = 12
+
+# Keyset orderings; each ends with the primary key so the cursor is unique
+CERTIFICATION_ORDERING = ('-featured', '-issue_date', '-id')
+SEARCH_ORDERING = ('-search_rank', '-featured', '-issue_date', '-id')
+
+VALIDITY_CHOICES = [('valid', 'Valid'), ('expired', 'Expired')]
+
+def validity():
+    """'expired' once the expiration date has passed, as Certification.is_expired"""
+    return Case(
+        When(expiration_date__lt=timezone.now().date(), then=Value('expired')),
+        default=Value('valid'),
+        output_field=CharField(),
+    )
+
+CERTIFICATION_FACETS = (
+    Facet('issuer', 'issuer', 'Issuer', choices=Certification.ISSUER_CHOICES),
+    Facet('level', 'level', 'Level', choices=Certification.LEVEL_CHOICES),
+    Facet('skill', 'skills__slug', 'Skill', label_field='skills__name', many=True, limit=20),
+    Facet('validity', 'validity', 'Validity', choices=VALIDITY_CHOICES, expression=validity),
+)
+
+def certification_list_queries(request):
     """
-    Display all certifications with filtering options
+    The certification list's independent queries (the page and the facet
+    counts), plus the context that needs no query
     """
-    # Get filter parameters
-    issuer = request.GET.get('issuer')
-    level = request.GET.get('level')
     search_query = request.GET.get('q')
     
     # Start with all active certifications
     certifications = Certification.objects.filter(is_active=True)
     
-    # Apply filters
-    if issuer and issuer != 'all':
-        certifications = certifications.filter(issuer=issuer)
-    
-    if level and level != 'all':
-        certifications = certifications.filter(level=level)
-    
-    # Apply search
+    # Apply search, ranking matches by relevance
     if search_query:
-        certifications = certifications.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(skills__icontains=search_query) |
-            Q(issuer_other__icontains=search_query)
-        )
+        certifications = CertificationIndex.search(certifications, search_query)
+        ordering = SEARCH_ORDERING
+    else:
+        ordering = CERTIFICATION_ORDERING
     
-    # Order certifications
-    certifications = certifications.order_by('-featured', '-issue_date')
-    
-    # Get filter options
-    issuer_choices = Certification.ISSUER_CHOICES
-    level_choices = Certification.LEVEL_CHOICES
-    
-    context = {
-        'certifications': certifications,
-        'issuer_choices': issuer_choices,
-        'level_choices': level_choices,
-        'selected_issuer': issuer,
-        'selected_level': level,
-        'search_query': search_query or '',
-    }
+    # Apply the issuer/level/skill/validity filters
+    faceted = FacetedFilter(request, CERTIFICATION_FACETS, tags=('certifications',))
+    certifications = faceted.apply(certifications)
     
+    paginator = KeysetPaginator(certifications, ordering, CERTIFICATIONS_PER_PAGE)
+    if settings.STATIC_EXPORT:
+        # A static site can neither filter nor load more: every card on one page
+        return {'page': paginator.everything}, {'filtered': False, 'search_query': '', 'static_export': True}
+    queries = {'page': lambda: paginator.page(request.GET.get('cursor'))}
+    # "Load more" requests only need the next page's cards
+    if not is_partial(request):
+        queries['facets'] = faceted.facets_context
+    return queries, {'filtered': faceted.active, 'search_query': search_query or ''}
+
+def render_certification_list(request, context):
+    context['certifications'] = context['page']
+    if is_partial(request):
+        return render(request, 'certifications/includes/certification_page.html', context)
     return render(request, 'certifications/certification_list.html', context)
 
+@cache_public_page('profile', 'certifications', dated=True)
+def certification_list(request):
+    """
+    Display all certifications with filtering options
+    """
+    queries, context = certification_list_queries(request)
+    return render_certification_list(request, {**context, **load_queries(queries)})
+
+@cache_public_page('profile', 'certifications', dated=True)
+async def acertification_list(request):
+    """certification_list for the ASGI server, loading the page and facet counts concurrently"""
+    # Search may query while building the queryset (SQLite FTS)
+    queries, context = await sync_to_async(certification_list_queries)(request)
+    context.update(await gather_queries(queries))
+    return await sync_to_async(render_certification_list)(request, context)
+
+def certification_detail_queries(slug):
+    """The certification (with its skills) and related certifications, independent of each other"""
+    return {
+        'certification': lambda: get_object_or_404(
+            Certification.objects.prefetch_related('skills'), slug=slug, is_active=True,
+        ),
+        # Precomputed related certifications (see certifications.related), best match first
+        'related_certifications': lambda: list(
+            Certification.objects.filter(
+                related_to_links__source__slug=slug,
+                is_active=True
+            ).order_by('-related_to_links__score')[:4]
+        ),
+    }
+
+def render_certification_detail(request, context):
+    context['skills_list'] = context['certification'].skills_list
+    return render(request, 'certifications/certification_detail.html', context)
+
+@cache_public_page('profile', 'certifications', dated=True)
 def certification_detail(request, slug):
     """
     Display details of a specific certification
     """
-    certification = get_object_or_404(Certification, slug=slug, is_active=True)
-    
-    # Get related certifications (same issuer or level)
-    related_certifications = Certification.objects.filter(
-        is_active=True
-    ).exclude(id=certification.id).filter(
-        Q(issuer=certification.issuer) | Q(level=certification.level)
-    )[:4]
-    
-    # Parse skills into list
-    skills_list = certification.skills_list
-    
-    context = {
-        'certification': certification,
-        'related_certifications': related_certifications,
-        'skills_list': skills_list,
-    }
-    
-    return render(request, 'certifications/certification_detail.html', context)
\ No newline at end of file
+    return render_certification_detail(request, load_queries(certification_detail_queries(slug)))
+
+@cache_public_page('profile', 'certifications', dated=True)
+async def acertification_detail(request, slug):
+    """certification_detail for the ASGI server, loading the certification and related ones concurrently"""
+    context = await gather_queries(certification_detail_queries(slug))
+    return await sync_to_async(render_certification_detail)(request, context)
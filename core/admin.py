@@ -31,7 +31,7 @@ class ContactMessageAdmin(admin.ModelAdmin):
     list_display = ('name', 'email', 'subject', 'is_read', 'created_at')
     list_filter = ('is_read', 'created_at')
     search_fields = ('name', 'email', 'subject', 'message')
-    readonly_fields = ('name', 'email', 'subject', 'message', 'created_at')
+    readonly_fields = ('name', 'email', 'subject', 'message', 'ip_address', 'created_at')
     list_editable = ('is_read',)
     
 admin.site.unregister(User)
@@ -0,0 +1,129 @@
+"""
+Request benchmarks for the public URLs, used by the benchmark_urls command.
+
+Each URL is fetched with the test client and measured for query count,
+render time (p50/p95) and response size. compare() checks a run against a
+stored baseline so a regression fails the command.
+"""
+import statistics
+import time
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from certifications.models import Certification
+from projects.models import Project
+
+# Namespaces and routes that are not part of the public site's pages
+SKIPPED_NAMESPACES = {'admin'}
+SKIPPED_NAMES = {'media', 'metrics'}
+
+# Routes with URL parameters are benchmarked against a representative row
+SAMPLE_OBJECTS = {
+    'projects:project_detail': lambda: Project.objects.filter(published=True),
+    'certifications:certification_detail': lambda: Certification.objects.filter(is_active=True),
+    'api:project_detail': lambda: Project.objects.filter(published=True),
+    'api:certification_detail': lambda: Certification.objects.filter(is_active=True),
+}
+
+# Extra query strings worth measuring separately (search, filters)
+VARIANTS = {
+    'projects:project_list': [
+        '?q=vision', '?category=category-1', '?technology=Technology+1&technology=Technology+2&status=completed',
+    ],
+    'certifications:certification_list': [
+        '?q=model', '?issuer=aws&level=expert', '?skill=pytorch', '?skill=pytorch&skill=sql&validity=valid',
+    ],
+    'api:project_list': ['?fields=slug,title&limit=100', '?technology=Technology+1'],
+}
+
+# Allowed slack before a timing or size counts as a regression; p95 comes
+# from a handful of samples, so it gets more room than the median
+TIME_TOLERANCE = {'p50_ms': 0.5, 'p95_ms': 1.0}
+TIME_SLACK_MS = 10.0
+BYTES_TOLERANCE = 0.1
+
+
+def route_names(resolvers=None, namespace=''):
+    """Names of every named route in the URLconf, less SKIPPED_NAMESPACES and SKIPPED_NAMES"""
+    names = []
+    for pattern in resolvers if resolvers is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace in SKIPPED_NAMESPACES:
+                continue
+            prefix = f'{namespace}{pattern.namespace}:' if pattern.namespace else namespace
+            names.extend(route_names(pattern.url_patterns, prefix))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            name = f'{namespace}{pattern.name}'
+            if name not in SKIPPED_NAMES:
+                names.append(name)
+    return names
+
+
+def public_urls():
+    """Concrete URLs to benchmark, keyed by a stable label"""
+    urls = {}
+    for name in route_names():
+        if name in SAMPLE_OBJECTS:
+            queryset = SAMPLE_OBJECTS[name]().order_by('pk')
+            count = queryset.count()
+            if not count:
+                continue
+            # Pick a row from the middle rather than the cheapest first one
+            obj = queryset[count // 2]
+            url = reverse(name, kwargs={'slug': obj.slug})
+        else:
+            url = reverse(name)
+        urls[name] = url
+        for query in VARIANTS.get(name, []):
+            urls[f'{name}{query}'] = url + query
+    return urls
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def measure(client, url, repeat=20):
+    """Fetch a URL once to warm up, then `repeat` times for timings"""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    # Read now: the next request resets the connection's query log
+    query_count = len(queries)
+    if response.status_code != 200:
+        raise AssertionError(f'{url} returned {response.status_code}')
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client.get(url)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'url': url,
+        'queries': query_count,
+        'p50_ms': round(statistics.median(timings), 2),
+        'p95_ms': round(percentile(timings, 0.95), 2),
+        'bytes': len(response.content),
+    }
+
+
+def compare(results, baseline):
+    """Human-readable regressions of `results` against `baseline` (both keyed by label)"""
+    regressions = []
+    for label, result in results.items():
+        budget = baseline.get(label)
+        if budget is None:
+            continue
+        if result['queries'] > budget['queries']:
+            regressions.append(f"{label}: {result['queries']} queries (budget {budget['queries']})")
+        for metric, tolerance in TIME_TOLERANCE.items():
+            allowed_ms = budget[metric] * (1 + tolerance) + TIME_SLACK_MS
+            if result[metric] > allowed_ms:
+                regressions.append(f"{label}: {metric} {result[metric]} (budget {allowed_ms:.2f})")
+        allowed_bytes = budget['bytes'] * (1 + BYTES_TOLERANCE)
+        if result['bytes'] > allowed_bytes:
+            regressions.append(f"{label}: {result['bytes']} bytes (budget {allowed_bytes:.0f})")
+    return regressions
@@ -0,0 +1,269 @@
+import datetime
+import hashlib
+import time
+from functools import wraps
+from urllib.parse import urlencode
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from core.instrumentation import record_cache
+
+TAG_VERSION_KEY = 'cache:tag:{}'
+PAGE_CACHE_KEY = 'cache:page:{}'
+FRAGMENT_CACHE_KEY = 'cache:fragment:{}:{}'
+STATS_KEY = 'cache:stats:{}:{}'
+
+# Only these query parameters change what the public pages render
+CACHED_QUERY_PARAMS = (
+    'q', 'category', 'technology', 'status', 'issuer', 'level', 'skill', 'validity',
+    'cursor', 'partial',
+)
+
+
+def tag_versions(*tags):
+    """
+    Get the current version of each tag.
+
+    A version is the time (in ns) of the last change to content carrying that
+    tag; bumping it makes every key built from the old version unreachable.
+    """
+    keys = {tag: TAG_VERSION_KEY.format(tag) for tag in tags}
+    found = cache.get_many(keys.values())
+    versions = {}
+    for tag, key in keys.items():
+        version = found.get(key)
+        if version is None:
+            version = time.time_ns()
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        versions[tag] = version
+    return versions
+
+
+def purge(*tags):
+    """Invalidate every cached page that depends on any of the given tags"""
+    now = time.time_ns()
+    cache.set_many({TAG_VERSION_KEY.format(tag): now for tag in tags}, None)
+
+
+def content_etag(path, query, versions):
+    """
+    Strong validator for a response: the same URL rendered over the same tag
+    versions gives the same bytes. The date is part of it because pages show
+    things like days until expiry that change without any write.
+    """
+    raw = '|'.join([
+        path,
+        query,
+        datetime.date.today().isoformat(),
+        *(f'{tag}={versions[tag]}' for tag in sorted(versions)),
+    ])
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def versions_timestamp(versions):
+    """When the newest of the tags last changed, in whole seconds (for Last-Modified)"""
+    if not versions:
+        return None
+    return max(versions.values()) // 1_000_000_000
+
+
+def vary_key(value):
+    """Cache-key part for a value: model rows by pk and updated_at, anything else by str()"""
+    meta = getattr(value, '_meta', None)
+    if meta is not None:
+        updated_at = getattr(value, 'updated_at', None)
+        return f"{meta.label_lower}:{value.pk}:{updated_at.isoformat() if updated_at else ''}"
+    return str(value)
+
+
+def fragment_cache_key(name, vary_on):
+    """
+    Key for a rendered template fragment. Saving a row changes its updated_at
+    and so the key, which makes explicit purges unnecessary.
+    """
+    raw = '|'.join(vary_key(value) for value in vary_on)
+    return FRAGMENT_CACHE_KEY.format(name, hashlib.md5(raw.encode()).hexdigest())
+
+
+def record(name, hit):
+    """
+    Count a hit or miss for the named cache layer. During a request the
+    counts are kept in its metrics and written once when it ends (see
+    ServerTimingMiddleware.flush), not with a round trip per lookup.
+    """
+    if not record_cache(name, hit):
+        write_stats({name: (1, 0) if hit else (0, 1)})
+
+
+def write_stats(counts):
+    """Add {name: (hits, misses)} to the shared counters read by cache_stats()"""
+    for name, (hits, misses) in counts.items():
+        for kind, count in (('hits', hits), ('misses', misses)):
+            if not count:
+                continue
+            key = STATS_KEY.format(name, kind)
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                cache.add(key, 0, None)
+                cache.incr(key, count)
+
+
+def cache_stats(name):
+    """Return the hit/miss counters recorded for the named cache layer"""
+    hits_key = STATS_KEY.format(name, 'hits')
+    misses_key = STATS_KEY.format(name, 'misses')
+    found = cache.get_many([hits_key, misses_key])
+    hits = found.get(hits_key, 0)
+    misses = found.get(misses_key, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0.0,
+    }
+
+
+def normalized_query(request):
+    """Query string reduced to the parameters the views read, in a stable order"""
+    params = []
+    for name in CACHED_QUERY_PARAMS:
+        # Facets take several values (?technology=a&technology=b) in any order
+        values = {value.strip() for value in request.GET.getlist(name)}
+        params.extend((name, value) for value in sorted(values) if value and value != 'all')
+    return urlencode(params)
+
+
+def is_cacheable_request(request):
+    """Only anonymous GET/HEAD traffic without pending flash messages is shared"""
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if 'messages' in request.COOKIES:
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES and request.user.is_authenticated:
+        return False
+    return True
+
+
+def page_cache_key(request, versions):
+    # Dated like content_etag, so yesterday's expiry countdowns are not served today
+    raw = '|'.join([
+        request.path,
+        normalized_query(request),
+        datetime.date.today().isoformat(),
+        *(f'{tag}={versions[tag]}' for tag in sorted(versions)),
+    ])
+    return PAGE_CACHE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+class PageRequest:
+    """
+    What cache_public_page does around one view call, split so that sync and
+    async views share it: lookup() before the view, finish() after.
+    """
+
+    def __init__(self, request, tags, dated=False):
+        self.request = request
+        self.tags = tags
+        self.dated = dated
+        self.cacheable = False
+        self.key = None
+
+    def lookup(self):
+        """A 304 or a cached page when the view need not run, else None"""
+        request = self.request
+        self.cacheable = is_cacheable_request(request)
+        if not self.cacheable:
+            return None
+
+        versions = tag_versions(*self.tags)
+        self.etag = content_etag(request.path, normalized_query(request), versions)
+        # A page that changes with the date has no meaningful modification time
+        self.last_modified = None if self.dated else versions_timestamp(versions)
+        response = get_conditional_response(request, etag=self.etag, last_modified=self.last_modified)
+        if response is not None:
+            return _public(response, self.etag, self.last_modified)
+
+        if not getattr(settings, 'PAGE_CACHE_ENABLED', True):
+            return None
+        self.key = page_cache_key(request, versions)
+        cached = cache.get(self.key)
+        record('page', hit=cached is not None)
+        if cached is None:
+            return None
+        content, content_type = cached
+        response = HttpResponse(content, content_type=content_type)
+        response['X-Page-Cache'] = 'HIT'
+        return _public(response, self.etag, self.last_modified)
+
+    def finish(self, response):
+        """Store and mark up the response the view rendered"""
+        if not self.cacheable:
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+        if self.key is not None:
+            if response.status_code == 200 and not response.streaming and not response.cookies:
+                timeout = getattr(settings, 'PAGE_CACHE_TIMEOUT', 60 * 60)
+                cache.set(self.key, (response.content, response['Content-Type']), timeout)
+            response['X-Page-Cache'] = 'MISS'
+        if response.status_code != 200 or response.cookies:
+            return response
+        return _public(response, self.etag, self.last_modified)
+
+
+def cache_public_page(*tags, dated=False):
+    """
+    Cache a view's rendered HTML for anonymous visitors and let browsers and
+    CDNs revalidate it.
+
+    The tag versions act as the freshness fingerprint of everything the page
+    shows: saving or deleting a model bumps its tag. From them come a strong
+    ETag and a Last-Modified, so If-None-Match / If-Modified-Since are answered
+    with a 304 before the view runs a query or renders a template. Otherwise
+    the page is served from the page cache, keyed on the path, the normalized
+    filter parameters, the date and the same versions; a hit skips the view
+    entirely. Pages that change with the date alone (certification expiry,
+    the validity facet) pass dated=True and get no Last-Modified, as
+    If-Modified-Since could not tell the day has changed.
+
+    Works on async views too; the cache and session lookups then run in the
+    sync thread, as they may touch the database.
+    """
+    def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                page = PageRequest(request, tags, dated)
+                response = await sync_to_async(page.lookup)()
+                if response is None:
+                    response = await view_func(request, *args, **kwargs)
+                    response = await sync_to_async(page.finish)(response)
+                return response
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            page = PageRequest(request, tags, dated)
+            response = page.lookup()
+            if response is None:
+                response = page.finish(view_func(request, *args, **kwargs))
+            return response
+        return wrapper
+    return decorator
+
+
+def _public(response, etag, last_modified):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    # Browsers and CDNs may keep it but must revalidate (cheaply, see above)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'PAGE_MAX_AGE', 0), must_revalidate=True)
+    # Signed-in visitors get uncached pages, so shared caches must key on cookies
+    patch_vary_headers(response, ['Cookie'])
+    return response
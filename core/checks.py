@@ -0,0 +1,47 @@
+"""
+System checks for configuration the settings module no longer validates on
+import. They run with manage.py commands (migrate runs first on deploy, see
+procfile) and `manage.py check`.
+"""
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def database_password_check(app_configs, **kwargs):
+    return missing_database_passwords(settings.DATABASES)
+
+
+def missing_database_passwords(databases):
+    errors = []
+    for alias, database in databases.items():
+        if database['ENGINE'] == 'django.db.backends.postgresql' and not database.get('PASSWORD'):
+            errors.append(Error(
+                f'No password configured for the {alias!r} database.',
+                hint='Set DB_PASSWORD in the environment or .env, or USE_SQLITE=True for local development.',
+                id='core.E001',
+            ))
+    return errors
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    return process_local_caches(settings.CACHES, settings.WEB_CONCURRENCY)
+
+
+def process_local_caches(caches, workers):
+    """
+    Cached profiles and pages are invalidated by bumping versions in the
+    default cache, which other workers never see in a per-process cache.
+    """
+    backend = caches['default']['BACKEND']
+    if workers > 1 and backend == 'django.core.cache.backends.locmem.LocMemCache':
+        return [Error(
+            f'The default cache is local to each process but WEB_CONCURRENCY is {workers}.',
+            hint=(
+                'Set CACHE_BACKEND and CACHE_LOCATION to a shared cache (e.g. Redis or the database), '
+                'or run a single worker.'
+            ),
+            id='core.E002',
+        )]
+    return []
@@ -0,0 +1,100 @@
+"""
+Running a view's independent queries concurrently, for the async views.
+
+Django's async ORM methods (aget, acount, async for...) still run every
+query through sync_to_async on one shared thread, so awaiting several of
+them overlaps nothing. gather_queries() instead runs each loader in its own
+worker thread on its own database connection, so the round trips to the
+database overlap and a page costs roughly its slowest query.
+
+The workers are a small dedicated pool (ASYNC_QUERY_WORKERS threads) that
+lives as long as the process, so each thread keeps its persistent connection
+across requests like a sync worker does; close_old_connections() retires it
+once it outlives CONN_MAX_AGE or breaks, and hands it back under DB_POOL.
+
+Views describe their queries as {context name: loader} dicts, which the sync
+views evaluate one after another with load_queries().
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.shortcuts import render
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def load_queries(loaders):
+    """Context dict from {name: loader}, evaluated in order"""
+    return {name: loader() for name, loader in loaders.items()}
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'ASYNC_QUERY_WORKERS', 4),
+                thread_name_prefix='queries',
+            )
+        return _executor
+
+
+def _in_worker(loader):
+    def run():
+        # What request_started/request_finished do for a request thread
+        close_old_connections()
+        try:
+            return loader()
+        finally:
+            close_old_connections()
+    return run
+
+
+def shutdown():
+    """Stop the worker threads and close their connections; the next gather_queries() starts new ones"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is None:
+        return
+    # A connection can only be closed by its own thread: hold each thread at
+    # the barrier after its close so every one of them runs exactly one
+    threads = len(executor._threads)
+    if threads:
+        barrier = threading.Barrier(threads, timeout=10)
+
+        def close():
+            connection.close()
+            barrier.wait()
+
+        for _ in range(threads):
+            executor.submit(close)
+    executor.shutdown(wait=True)
+
+
+async def gather_queries(loaders):
+    """Context dict from {name: loader}, with the loaders run concurrently"""
+    def sequential():
+        # Other connections cannot see an open transaction's rows
+        if len(loaders) < 2 or connection.in_atomic_block or not settings.ASYNC_PARALLEL_QUERIES:
+            return load_queries(loaders)
+        return None
+
+    context = await sync_to_async(sequential)()
+    if context is not None:
+        return context
+    results = await asyncio.gather(*(
+        sync_to_async(_in_worker(loader), thread_sensitive=False, executor=_get_executor())()
+        for loader in loaders.values()
+    ))
+    return dict(zip(loaders, results))
+
+
+async def arender(request, template_name, context):
+    """render() for async views; context processors and templates may query"""
+    return await sync_to_async(render)(request, template_name, context)
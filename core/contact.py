@@ -0,0 +1,172 @@
+"""
+Contact form submissions, accepted without blocking the request.
+
+submit() checks the sender against sliding-window rate limits (per client
+IP and per email address) and drops identical resubmissions, then enqueues
+storing the message and emailing the site owner (core.tasks.enqueue). The
+POST is answered as soon as that work is queued.
+
+The rate limits and the duplicate check live in the cache, so they hold
+across workers when the cache is shared (Redis, Memcached); with the
+default per-process cache each worker counts on its own.
+"""
+import hashlib
+import ipaddress
+import logging
+import re
+import time
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.mail import EmailMessage
+from django.utils import timezone
+
+from core.metrics import count_contact
+from core.models import ContactMessage
+from core.services import get_profile
+from core.tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+RATE_KEY = 'contact:rate:{}:{}:{}'
+DUPLICATE_KEY = 'contact:duplicate:{}'
+
+ACCEPTED = 'accepted'
+DUPLICATE = 'duplicate'
+LIMITED = 'limited'
+
+
+@dataclass
+class Result:
+    status: str
+    # Seconds until a limited sender may try again
+    retry_after: int = 0
+
+
+def client_ip(request):
+    """
+    Address of the visitor. Behind proxies set CLIENT_IP_HEADER (e.g.
+    'HTTP_X_FORWARDED_FOR') and CLIENT_IP_PROXIES to how many of them append
+    to it: the entries further left come from the client and may be forged.
+    A missing or malformed hop falls back to REMOTE_ADDR.
+    """
+    hops = request.META.get(getattr(settings, 'CLIENT_IP_HEADER', 'REMOTE_ADDR'), '').split(',')
+    proxies = max(getattr(settings, 'CLIENT_IP_PROXIES', 1), 1)
+    trusted = hops[-proxies] if len(hops) >= proxies else ''
+    for value in (trusted, request.META.get('REMOTE_ADDR', '')):
+        try:
+            return str(ipaddress.ip_address(value.strip()))
+        except ValueError:
+            continue
+    return ''
+
+
+def fingerprint(data):
+    """Same sender, subject and text (ignoring case and spacing) give the same fingerprint"""
+    normalized = '|'.join(
+        re.sub(r'\s+', ' ', str(data[field])).strip().lower()
+        for field in ('email', 'subject', 'message')
+    )
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def rate_key(scope, identity, index):
+    identity = hashlib.md5(identity.lower().encode()).hexdigest()
+    return RATE_KEY.format(scope, identity, index)
+
+
+def hit(scope, identity, limit, window):
+    """
+    Count one attempt for `identity` and tell whether it is still within
+    `limit` per `window` seconds; returns (allowed, retry_after).
+
+    Sliding-window counter: the previous fixed window's count is weighted by
+    how much of it still overlaps the sliding window ending now. Two cache
+    keys per identity, no per-request history, and no burst at window edges.
+    """
+    now = time.time()
+    current = int(now // window)
+    elapsed = (now % window) / window
+    current_key = rate_key(scope, identity, current)
+    previous_key = rate_key(scope, identity, current - 1)
+
+    previous_count = cache.get(previous_key, 0)
+    # add() then incr() is atomic on every cache backend
+    cache.add(current_key, 0, window * 2)
+    count = cache.incr(current_key)
+
+    estimate = previous_count * (1 - elapsed) + count
+    if estimate <= limit:
+        return True, 0
+    # Undo the attempt so refused posts do not extend the lockout
+    cache.decr(current_key)
+    return False, max(int(window * (1 - elapsed)), 1)
+
+
+def undo_hit(scope, identity, window):
+    """Take back an attempt hit() allowed, for a post another limit refused"""
+    try:
+        cache.decr(rate_key(scope, identity, int(time.time() // window)))
+    except ValueError:
+        # The window just rolled over; the count is already behind us
+        pass
+
+
+def submit(data, ip):
+    """Queue a validated message (the form's cleaned_data) for delivery"""
+    limit = getattr(settings, 'CONTACT_RATE_LIMIT', 5)
+    window = getattr(settings, 'CONTACT_RATE_WINDOW', 60 * 60)
+    counted = []
+    for scope, identity in (('ip', ip), ('email', data['email'])):
+        allowed, retry_after = hit(scope, identity, limit, window)
+        if not allowed:
+            # A refused post counts against no limit, like hit() does for its own
+            for counted_scope, counted_identity in counted:
+                undo_hit(counted_scope, counted_identity, window)
+            logger.info('Contact message refused: rate limit on %s', scope)
+            count_contact(LIMITED)
+            return Result(LIMITED, retry_after)
+        counted.append((scope, identity))
+
+    key = fingerprint(data)
+    if not cache.add(DUPLICATE_KEY.format(key), 1, getattr(settings, 'CONTACT_DUPLICATE_WINDOW', 60 * 60 * 24)):
+        count_contact(DUPLICATE)
+        return Result(DUPLICATE)
+
+    enqueue(deliver, {field: data[field] for field in ('name', 'email', 'subject', 'message')}, ip, key)
+    count_contact(ACCEPTED)
+    return Result(ACCEPTED)
+
+
+def deliver(data, ip, key):
+    """Store a message and notify the owner (runs in the background)"""
+    window = getattr(settings, 'CONTACT_DUPLICATE_WINDOW', 60 * 60 * 24)
+    # The cache check can miss across workers with a per-process cache
+    recent = timezone.now() - timedelta(seconds=window)
+    if ContactMessage.objects.filter(fingerprint=key, created_at__gte=recent).exists():
+        return None
+    # Stored first: a failing mail server loses the email, not the message
+    try:
+        message = ContactMessage.objects.create(**data, ip_address=ip or None, fingerprint=key)
+    except Exception:
+        # Not stored, so a resubmission must not be dropped as a duplicate
+        cache.delete(DUPLICATE_KEY.format(key))
+        raise
+    notify(message)
+    return message
+
+
+def notify(message):
+    """Email a stored message to CONTACT_NOTIFY_EMAIL, or the profile's email"""
+    profile = get_profile()
+    recipient = getattr(settings, 'CONTACT_NOTIFY_EMAIL', '') or (profile.email if profile else '')
+    if not recipient:
+        return
+    EmailMessage(
+        subject=f'[Portfolio] {message.subject}',
+        body=f'From: {message.name} <{message.email}>\n\n{message.message}',
+        to=[recipient],
+        reply_to=[message.email],
+    ).send()
@@ -1,16 +1,16 @@
-from core.models import Profile
+import logging
+
+from core.services import get_profile
+
+logger = logging.getLogger(__name__)
+
 
 def profile_data(request):
     """Make profile data available across all templates"""
     try:
-        # Get the first profile (you might want to adjust this logic)
-        profile = Profile.objects.select_related('user').first()
-    except Profile.DoesNotExist:
-        profile = None
-    except Exception as e:
-        # Log error in development
-        if __debug__:
-            print(f"Error loading profile: {e}")
+        profile = get_profile()
+    except Exception:
+        logger.exception('Error loading profile')
         profile = None
     
-    return {'profile': profile}
\ No newline at end of file
+    return {'profile': profile}
@@ -0,0 +1,357 @@
+"""
+Static export of the whole site, used by the export_static command.
+
+Every public route is rendered through the test client into an output
+directory: HTML pages as ``<path>/index.html``, API responses as
+``<path>/index.json`` and query-string pages (API cursors) under
+``<path>/<query>/``, so a web server can map them with e.g. nginx's
+``try_files $uri/$args/index.html $uri/$args/index.json $uri/index.html $uri/index.json =404``.
+Static files and media (originals plus renditions) are copied alongside.
+
+Each page gets a fingerprint of the rows it displays, computed in a handful
+of bulk queries. manifest.json records the fingerprint and the sha256 of
+every file written, so an incremental export only re-renders pages whose
+fingerprint changed and only rewrites files whose bytes changed.
+"""
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.db.models import Count, Max
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from certifications.models import Certification, RelatedCertification
+from core.benchmark import route_names
+from core.models import Profile
+from projects.models import Project, ProjectCategory, ProjectImage, RelatedProject, Technology
+
+MANIFEST_NAME = 'manifest.json'
+
+# Routes that cannot work without a server (the contact form posts back)
+SKIPPED_ROUTES = {'core:contact'}
+
+
+@dataclass
+class Page:
+    url: str
+    fingerprint: str
+
+
+def digest(*parts):
+    return hashlib.sha256(json.dumps(parts, default=str, sort_keys=True).encode()).hexdigest()
+
+
+def output_path(url, content_type):
+    """Relative file for a rendered URL: <path>/[<query>/]index.html or .json"""
+    parts = urlsplit(url)
+    path = '/'.join(filter(None, [parts.path.strip('/'), parts.query]))
+    name = 'index.json' if content_type.startswith('application/json') else 'index.html'
+    return f'{path}/{name}' if path else name
+
+
+def templates_version():
+    """Changes to the site templates invalidate every page"""
+    sha = hashlib.sha256()
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for path in sorted(Path(directory).rglob('*')):
+            if path.is_file():
+                sha.update(str(path.relative_to(directory)).encode())
+                sha.update(path.read_bytes())
+    return sha.hexdigest()
+
+
+class Sources:
+    """Bulk-loaded freshness data the page fingerprints are built from"""
+
+    def __init__(self):
+        today = date.today()
+        profile = Profile.objects.select_related('user').first()
+        self.profile = (
+            profile and (profile.updated_at, profile.user.get_full_name(), profile.user.username),
+            today.year,
+            templates_version(),
+        )
+        self.today = today
+
+        projects = Project.objects.filter(published=True)
+        # Category and technology names show on project cards and detail pages
+        self.taxonomy = (
+            list(ProjectCategory.objects.order_by('pk').values_list()),
+            list(Technology.objects.order_by('pk').values_list()),
+        )
+        self.projects = (projects.aggregate(count=Count('pk'), latest=Max('updated_at')), self.taxonomy)
+        certifications = Certification.objects.filter(is_active=True)
+        self.certifications = (certifications.aggregate(count=Count('pk'), latest=Max('updated_at')), today)
+
+        self.project_rows = dict(projects.values_list('slug', 'updated_at'))
+        self.certification_rows = dict(certifications.values_list('slug', 'updated_at'))
+        self.related_projects = self._related(RelatedProject, 'published')
+        self.related_certifications = self._related(RelatedCertification, 'is_active')
+
+    def _related(self, link_model, visible):
+        related = defaultdict(list)
+        links = link_model.objects.filter(**{f'related__{visible}': True}).order_by('source_id', '-score')
+        for slug, related_pk, updated_at in links.values_list('source__slug', 'related_id', 'related__updated_at'):
+            related[slug].append((related_pk, updated_at))
+        return related
+
+
+def pages(sources):
+    """Every page to export with its fingerprint"""
+    result = []
+    for name in route_names():
+        if name in SKIPPED_ROUTES:
+            continue
+        result.extend(_route_pages(name, sources))
+    return result
+
+
+def _route_pages(name, sources):
+    profile, projects, certifications = sources.profile, sources.projects, sources.certifications
+    if name == 'projects:project_detail':
+        return [
+            Page(reverse(name, args=[slug]), digest(profile, updated_at, sources.taxonomy, sources.related_projects[slug]))
+            for slug, updated_at in sources.project_rows.items()
+        ]
+    if name == 'certifications:certification_detail':
+        return [
+            Page(reverse(name, args=[slug]), digest(profile, updated_at, sources.related_certifications[slug], sources.today))
+            for slug, updated_at in sources.certification_rows.items()
+        ]
+    if name == 'api:project_detail':
+        return [
+            Page(reverse(name, args=[slug]), digest(updated_at, sources.taxonomy))
+            for slug, updated_at in sources.project_rows.items()
+        ]
+    if name == 'api:certification_detail':
+        return [
+            Page(reverse(name, args=[slug]), digest(updated_at, sources.today))
+            for slug, updated_at in sources.certification_rows.items()
+        ]
+
+    url = reverse(name)
+    # List pages render every row without filters under STATIC_EXPORT
+    if name == 'projects:project_list':
+        return [Page(url, digest(profile, projects))]
+    if name == 'certifications:certification_list':
+        return [Page(url, digest(profile, certifications))]
+    if name == 'core:home':
+        return [Page(url, digest(profile, projects))]
+    if name == 'api:profile':
+        return [Page(url, digest(profile))]
+    if name.startswith('api:certification'):
+        return [Page(url, digest(certifications))]
+    if name.startswith('api:'):
+        return [Page(url, digest(projects))]
+    return [Page(url, digest(profile))]
+
+
+@contextmanager
+def quiet_request_log():
+    """Keep the per-request log line (core.instrumentation) out of the export"""
+    logger = logging.getLogger('portfolio.requests')
+    level = logger.level
+    logger.setLevel(logging.WARNING)
+    try:
+        yield
+    finally:
+        logger.setLevel(level)
+
+
+def render_pages(urls, output, base_url):
+    """
+    Render URLs into `output`, returning {url: {relative path: sha256}}.
+    API lists also write every following page. Runs in worker processes.
+    """
+    parts = urlsplit(base_url)
+    client = Client(HTTP_HOST=parts.netloc, **({'wsgi.url_scheme': 'https'} if parts.scheme == 'https' else {}))
+    results = {}
+    settings_override = override_settings(
+        ALLOWED_HOSTS=[parts.hostname], PAGE_CACHE_ENABLED=False, DEBUG=False, STATIC_EXPORT=True,
+    )
+    with settings_override, quiet_request_log():
+        for url in urls:
+            files = {}
+            next_url = url
+            while next_url:
+                response = client.get(next_url, secure=parts.scheme == 'https')
+                if response.status_code != 200:
+                    raise RuntimeError(f'{next_url} returned {response.status_code}')
+                content_type = response['Content-Type']
+                relative = output_path(next_url, content_type)
+                files[relative] = write_if_changed(Path(output) / relative, response.content)
+                next_url = None
+                if content_type.startswith('application/json'):
+                    following = json.loads(response.content).get('next')
+                    if following:
+                        found = urlsplit(following)
+                        next_url = f'{found.path}?{found.query}'
+            results[url] = files
+    return results
+
+
+def _render_in_worker(urls, output, base_url):
+    from django.apps import apps
+    if not apps.ready:
+        import django
+        django.setup()
+    return render_pages(urls, output, base_url)
+
+
+def write_if_changed(path, content):
+    """Write bytes unless the file already holds them; returns their sha256"""
+    sha = hashlib.sha256(content).hexdigest()
+    if path.exists() and path.stat().st_size == len(content) and hashlib.sha256(path.read_bytes()).hexdigest() == sha:
+        return sha
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(path.name + '.tmp')
+    temporary.write_bytes(content)
+    temporary.replace(path)
+    return sha
+
+
+def media_names():
+    """Every stored media file the pages can reference, renditions included"""
+    names = set()
+
+    def add(image, manifest=None):
+        if image:
+            names.add(image.name)
+        for entries in (manifest or {}).get('sources', {}).values():
+            names.update(name for _, name in entries)
+
+    for project in Project.objects.filter(published=True).only('image', 'image_renditions'):
+        add(project.image, project.image_renditions)
+    for image in ProjectImage.objects.filter(project__published=True).only('image', 'image_renditions'):
+        add(image.image, image.image_renditions)
+    for certification in Certification.objects.filter(is_active=True).only('image', 'image_renditions'):
+        add(certification.image, certification.image_renditions)
+    for profile in Profile.objects.all():
+        add(profile.profile_image, profile.profile_image_renditions)
+        add(profile.resume)
+    return sorted(names)
+
+
+def copy_file(source, path, previous_sha):
+    """Copy an open file unless the manifest says the output already matches"""
+    if previous_sha and path.exists():
+        return previous_sha
+    content = source.read()
+    return write_if_changed(path, content)
+
+
+def static_files():
+    """(relative path, storage) for every file the staticfiles finders know"""
+    seen = set()
+    for finder in finders.get_finders():
+        for relative, storage in finder.list(['CVS', '.*', '*~']):
+            if relative not in seen:
+                seen.add(relative)
+                yield relative, storage
+
+
+def chunked(items, count):
+    return [items[i::count] for i in range(count) if items[i::count]]
+
+
+class Exporter:
+    """Export the site into `output`, incrementally against its manifest"""
+
+    def __init__(self, output, base_url, workers=1, full=False):
+        self.output = Path(output)
+        self.base_url = base_url
+        self.workers = max(workers, 1)
+        self.full = full
+
+    def load_manifest(self):
+        path = self.output / MANIFEST_NAME
+        if self.full or not path.exists():
+            return {'pages': {}, 'files': {}}
+        return json.loads(path.read_text())
+
+    def run(self):
+        previous = self.load_manifest()
+        all_pages = pages(Sources())
+
+        stale = [
+            page for page in all_pages
+            if previous['pages'].get(page.url, {}).get('fingerprint') != page.fingerprint
+        ]
+        rendered = self.render([page.url for page in stale])
+
+        manifest = {'pages': {}, 'files': {}}
+        for page in all_pages:
+            if page.url in rendered:
+                manifest['pages'][page.url] = {'fingerprint': page.fingerprint, 'files': rendered[page.url]}
+            else:
+                manifest['pages'][page.url] = previous['pages'][page.url]
+
+        media_prefix = urlsplit(settings.MEDIA_URL).path.strip('/')
+        for name in media_names():
+            if not default_storage.exists(name):
+                continue
+            relative = f'{media_prefix}/{name}'
+            with default_storage.open(name, 'rb') as source:
+                manifest['files'][relative] = copy_file(source, self.output / relative, previous['files'].get(relative))
+
+        static_prefix = urlsplit(settings.STATIC_URL).path.strip('/')
+        for name, storage in static_files():
+            relative = f'{static_prefix}/{name}'
+            with storage.open(name) as source:
+                manifest['files'][relative] = write_if_changed(self.output / relative, source.read())
+
+        removed = self.remove_stale(previous, manifest)
+        self.output.mkdir(parents=True, exist_ok=True)
+        (self.output / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2, sort_keys=True) + '\n')
+        return {
+            'pages': len(all_pages),
+            'rendered': len(stale),
+            'files': len(manifest['files']),
+            'removed': removed,
+        }
+
+    def render(self, urls):
+        if not urls:
+            return {}
+        if self.workers == 1 or len(urls) < self.workers:
+            return render_pages(urls, self.output, self.base_url)
+        # Workers open their own database connections
+        connections.close_all()
+        rendered = {}
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            jobs = [
+                pool.submit(_render_in_worker, chunk, self.output, self.base_url)
+                for chunk in chunked(urls, self.workers)
+            ]
+            for job in jobs:
+                rendered.update(job.result())
+        return rendered
+
+    def remove_stale(self, previous, manifest):
+        """Delete files written by the last export that this one no longer has"""
+        old = set(previous['files'])
+        for page in previous['pages'].values():
+            old.update(page['files'])
+        new = set(manifest['files'])
+        for page in manifest['pages'].values():
+            new.update(page['files'])
+        removed = 0
+        for relative in sorted(old - new):
+            path = self.output / relative
+            if path.exists():
+                path.unlink()
+                removed += 1
+        return removed
+
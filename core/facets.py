@@ -0,0 +1,197 @@
+"""
+Multi-select faceted filtering for the list views.
+
+A Facet is one URL parameter (?technology=Django&technology=PyTorch) that
+filters the list and offers its values with counts. Values of one facet are
+OR-ed, different facets are AND-ed, and each facet is counted against the
+list filtered by every *other* facet, so ticking a value never hides the
+alternatives next to it.
+
+Counts take one grouped aggregate query per facet and are cached under the
+versions of the view's cache tags (see core.caching), so they are recomputed
+only after the underlying data changes.
+"""
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from core.caching import CACHED_QUERY_PARAMS, record, tag_versions
+
+FACET_CACHE_KEY = 'cache:facet:{}:{}'
+
+# Parameters dropped from a facet link: it starts again from the first page
+RESET_PARAMS = ('cursor', 'partial')
+
+
+class Facet:
+    """
+    A filterable field of a list view.
+
+    `field` is a lookup such as 'status' or 'technologies__name'; multi-valued
+    lookups (across a many-to-many) filter through a subquery so rows are not
+    repeated and annotations on the list are not narrowed by the join.
+    `expression` makes `field` a computed alias instead (a callable, as it may
+    depend on today's date). Options come from `choices` when given, otherwise
+    from the values present, labelled by `label_field` and capped at `limit`.
+    """
+
+    def __init__(self, name, field, label, label_field=None, choices=None,
+                 many=False, expression=None, limit=None):
+        self.name = name
+        self.field = field
+        self.label = label
+        self.label_field = label_field
+        self.choices = choices
+        self.many = many
+        self.expression = expression
+        self.limit = limit
+
+    def selected(self, request):
+        values = []
+        for value in request.GET.getlist(self.name):
+            value = value.strip()
+            if value and value != 'all' and value not in values:
+                values.append(value)
+        return values
+
+    def _prepare(self, queryset, select=False):
+        if self.expression is None:
+            return queryset
+        # values() can only group by an annotation, filter() is fine with an alias
+        add = queryset.annotate if select else queryset.alias
+        return add(**{self.field: self.expression()})
+
+    def filter(self, queryset, values):
+        if not values:
+            return queryset
+        lookup = {f'{self.field}__in': values}
+        if self.many:
+            matching = self._prepare(queryset.model._default_manager.all()).filter(**lookup)
+            return queryset.filter(pk__in=matching.values('pk'))
+        return self._prepare(queryset).filter(**lookup)
+
+    def counts(self, queryset):
+        """{value: (label, count)} in one grouped query"""
+        fields = [self.field] + ([self.label_field] if self.label_field else [])
+        rows = self._prepare(queryset, select=True).order_by().values(*fields).annotate(facet_count=Count('pk'))
+        return {
+            row[self.field]: (row.get(self.label_field, row[self.field]), row['facet_count'])
+            for row in rows if row[self.field] is not None
+        }
+
+    def options(self, counts, selected):
+        if self.choices is not None:
+            options = [(value, label, counts.get(value, (label, 0))[1]) for value, label in self.choices]
+        else:
+            options = sorted(
+                ((value, label, count) for value, (label, count) in counts.items()),
+                key=lambda option: (-option[2], str(option[1]).lower()),
+            )
+            if self.limit:
+                options = options[:self.limit]
+        # A selected value stays visible (to be unticked) even with no matches
+        shown = {value for value, _, _ in options}
+        options += [(value, value, 0) for value in selected if value not in shown]
+        return options
+
+
+class FacetedFilter:
+    """
+    Apply a set of facets to a list queryset and build the template context.
+
+        faceted = FacetedFilter(request, FACETS, tags=('projects',))
+        projects = faceted.apply(Project.objects.filter(published=True))
+        ...
+        context['facets'] = faceted.facets_context()
+    """
+
+    def __init__(self, request, facets, tags=()):
+        self.request = request
+        self.facets = facets
+        self.tags = tags
+        self.selected = {facet.name: facet.selected(request) for facet in facets}
+        self.base = None
+
+    @property
+    def active(self):
+        return any(self.selected.values())
+
+    def apply(self, queryset):
+        """Filter `queryset` by every selected facet, keeping it as the base for counts"""
+        self.base = queryset
+        return self._narrow(queryset)
+
+    def _narrow(self, queryset, exclude=None):
+        for facet in self.facets:
+            if facet.name != exclude:
+                queryset = facet.filter(queryset, self.selected[facet.name])
+        return queryset
+
+    def _cache_key(self, facet):
+        versions = tag_versions(*self.tags)
+        raw = '|'.join([
+            self.request.path,
+            facet.name,
+            # Everything but this facet's own selection shapes its counts
+            urlencode([
+                (name, value)
+                for name in CACHED_QUERY_PARAMS if name != facet.name and name not in RESET_PARAMS
+                for value in sorted(self.request.GET.getlist(name))
+            ]),
+            *(f'{tag}={versions[tag]}' for tag in sorted(versions)),
+        ])
+        return FACET_CACHE_KEY.format(facet.name, hashlib.md5(raw.encode()).hexdigest())
+
+    def counts(self, facet):
+        key = self._cache_key(facet)
+        counts = cache.get(key)
+        record('facet', hit=counts is not None)
+        if counts is None:
+            counts = facet.counts(self._narrow(self.base, exclude=facet.name))
+            cache.set(key, counts, getattr(settings, 'FACET_CACHE_TIMEOUT', 60 * 60))
+        return counts
+
+    def toggle_url(self, facet, value):
+        """Query string with `value` of `facet` switched on or off"""
+        params = [
+            (name, item) for name, items in self.request.GET.lists()
+            for item in items
+            if name not in RESET_PARAMS and not (name == facet.name and item == value)
+        ]
+        if value not in self.selected[facet.name]:
+            params.append((facet.name, value))
+        return '?' + urlencode(params)
+
+    def clear_url(self, facet):
+        params = [
+            (name, item) for name, items in self.request.GET.lists()
+            for item in items if name not in RESET_PARAMS and name != facet.name
+        ]
+        return '?' + urlencode(params)
+
+    def facets_context(self):
+        """Facets with their options for the facet_filters include"""
+        facets = []
+        for facet in self.facets:
+            selected = self.selected[facet.name]
+            options = facet.options(self.counts(facet), selected)
+            facets.append({
+                'name': facet.name,
+                'label': facet.label,
+                'selected': selected,
+                'clear_url': self.clear_url(facet),
+                'options': [
+                    {
+                        'value': value,
+                        'label': label,
+                        'count': count,
+                        'selected': value in selected,
+                        'url': self.toggle_url(facet, value),
+                    }
+                    for value, label, count in options
+                ],
+            })
+        return facets
@@ -0,0 +1,132 @@
+"""
+Bulk test data for benchmarks and query-plan tests.
+
+Rows are inserted with bulk_create, so model signals do not fire: callers
+that need search results or related items should rebuild those indexes
+afterwards (seed() does). Image fields point at names that need not exist
+on disk; templates only render their URLs.
+"""
+from datetime import date, timedelta
+
+from django.contrib.auth.models import User
+
+from certifications.models import Certification, Skill
+from core import related, search
+from core.models import Profile
+from projects.models import Project, ProjectCategory, ProjectImage, Technology
+
+BATCH_SIZE = 1000
+
+WORDS = (
+    'vision', 'language', 'model', 'pipeline', 'detection', 'forecast', 'django',
+    'dashboard', 'neural', 'network', 'cloud', 'analytics', 'segmentation', 'agent',
+)
+
+
+SKILLS = (
+    'Python', 'Deep Learning', 'MLOps', 'PyTorch', 'TensorFlow', 'SQL', 'Kubernetes',
+    'Computer Vision', 'NLP', 'Statistics', 'Cloud Architecture', 'Data Engineering',
+)
+
+
+def sentence(i, length=12):
+    return ' '.join(WORDS[(i * 7 + k) % len(WORDS)] for k in range(length)).capitalize()
+
+
+def create_profile():
+    user = User.objects.create_user('owner', first_name='Ada', last_name='Lovelace')
+    return Profile.objects.create(user=user, title='Full Stack AI Engineer', bio=sentence(0, 40))
+
+
+def create_categories(count=8):
+    return [
+        ProjectCategory.objects.create(name=f'Category {i}', order=i)
+        for i in range(count)
+    ]
+
+
+def create_technologies(count=30):
+    return Technology.objects.bulk_create(Technology(name=f'Technology {i}') for i in range(count))
+
+
+def create_projects(count, categories, technologies, per_project=5, gallery=3):
+    """Projects with technologies and gallery images; every 7th is unpublished"""
+    start = Project.objects.count()
+    projects = Project.objects.bulk_create(
+        (
+            Project(
+                title=f'Project {i}', slug=f'project-{i}',
+                description=sentence(i), detailed_description=sentence(i, 80),
+                category=categories[i % len(categories)],
+                featured=i % 10 == 0, published=i % 7 != 0,
+                github_url='https://github.com/example/project',
+                start_date=date(2020, 1, 1) + timedelta(days=i % 1500),
+            )
+            for i in range(start, start + count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    through = Project.technologies.through
+    through.objects.bulk_create(
+        (
+            through(project_id=project.pk, technology_id=technologies[(project.pk + k) % len(technologies)].pk)
+            for project in projects
+            for k in range(min(per_project, len(technologies)))
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    ProjectImage.objects.bulk_create(
+        (
+            ProjectImage(project=project, image=f'projects/gallery/project-{project.pk}-{k}.jpg', order=k)
+            for project in projects
+            for k in range(gallery)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return projects
+
+
+def create_certifications(count, per_certification=3):
+    """Certifications spread over every issuer, level and skill; every 6th is inactive"""
+    start = Certification.objects.count()
+    skills = Skill.objects.for_names(SKILLS)
+    certifications = Certification.objects.bulk_create(
+        (
+            Certification(
+                title=f'Certification {i}', slug=f'certification-{i}',
+                issuer=Certification.ISSUER_CHOICES[i % len(Certification.ISSUER_CHOICES)][0],
+                level=Certification.LEVEL_CHOICES[i % len(Certification.LEVEL_CHOICES)][0],
+                issue_date=date(2018, 1, 1) + timedelta(days=i % 2500),
+                credential_url='https://example.com/verify',
+                description=sentence(i, 30),
+                featured=i % 9 == 0, is_active=i % 6 != 0,
+            )
+            for i in range(start, start + count)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    through = Certification.skills.through
+    through.objects.bulk_create(
+        (
+            through(certification_id=certification.pk, skill_id=skills[(certification.pk + k) % len(skills)].pk)
+            for certification in certifications
+            for k in range(min(per_certification, len(skills)))
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    return certifications
+
+
+def seed(projects=10, certifications=None, gallery=3):
+    """Populate an empty database with a profile, projects and certifications"""
+    if certifications is None:
+        certifications = max(projects // 4, 1)
+    create_profile()
+    categories = create_categories()
+    technologies = create_technologies()
+    create_projects(projects, categories, technologies, gallery=gallery)
+    create_certifications(certifications)
+    for index in search.registry + related.registry:
+        index.rebuild()
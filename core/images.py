@@ -0,0 +1,168 @@
+"""
+Image processing shared by every model with an uploaded picture.
+
+Models call mark_pending() before saving and schedule() after; once the
+transaction commits, the image is resized off the request thread and the
+model's ``<field>_status`` column records the outcome. Processing is
+idempotent: an image that already fits is left untouched and marked done.
+
+A claim is stamped in ``<field>_claimed_at``; a row still 'processing'
+PROCESSING_TIMEOUT later belonged to a worker that died, and is claimed
+again like a pending one (the process_images command runs on every deploy).
+"""
+import logging
+import os
+import time
+from datetime import timedelta
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core import renditions
+from core.metrics import observe_image
+from core.tasks import enqueue
+
+logger = logging.getLogger(__name__)
+
+STATUS_NONE = ''
+STATUS_PENDING = 'pending'
+STATUS_PROCESSING = 'processing'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+IMAGE_STATUS_CHOICES = [
+    (STATUS_NONE, 'No image'),
+    (STATUS_PENDING, 'Pending'),
+    (STATUS_PROCESSING, 'Processing'),
+    (STATUS_DONE, 'Done'),
+    (STATUS_FAILED, 'Failed'),
+]
+
+JPEG_QUALITY = 85
+
+# Seconds after which a claim is considered abandoned
+PROCESSING_TIMEOUT = 15 * 60
+
+
+def status_field(field_name):
+    return f'{field_name}_status'
+
+
+def claimed_field(field_name):
+    return f'{field_name}_claimed_at'
+
+
+def claimable(field_name, statuses=(STATUS_PENDING,)):
+    """Rows in one of `statuses`, or left 'processing' past the timeout"""
+    status = status_field(field_name)
+    timeout = getattr(settings, 'IMAGE_PROCESSING_TIMEOUT', PROCESSING_TIMEOUT)
+    abandoned = Q(**{f'{claimed_field(field_name)}__lt': timezone.now() - timedelta(seconds=timeout)})
+    abandoned |= Q(**{f'{claimed_field(field_name)}__isnull': True})
+    return Q(**{f'{status}__in': statuses}) | (Q(**{status: STATUS_PROCESSING}) & abandoned)
+
+
+def mark_pending(instance, field_name):
+    """Flag a freshly uploaded (not yet stored) file for processing"""
+    image = getattr(instance, field_name)
+    if not image:
+        setattr(instance, status_field(field_name), STATUS_NONE)
+    elif not image._committed:
+        setattr(instance, status_field(field_name), STATUS_PENDING)
+
+
+def schedule(instance, field_name, max_size):
+    """Queue processing for after the surrounding transaction commits"""
+    if getattr(instance, status_field(field_name)) != STATUS_PENDING:
+        return
+    label = instance._meta.label
+    pk = instance.pk
+    transaction.on_commit(lambda: enqueue(process_image, label, pk, field_name, max_size))
+
+
+def process_image(model_label, pk, field_name, max_size, statuses=(STATUS_PENDING,)):
+    """
+    Resize one stored image to fit max_size, re-encoding it as JPEG, and
+    build its responsive renditions if the model stores them.
+
+    The row is claimed with a conditional UPDATE so two workers never process
+    the same upload, and the result is only saved if the row still holds the
+    claimed file: a re-upload in the meantime is processed on its own.
+    Returns the final status, or None if nothing was claimed or saved.
+    """
+    model = apps.get_model(model_label)
+    status = status_field(field_name)
+    claimed = model._default_manager.filter(claimable(field_name, statuses), pk=pk).update(
+        **{status: STATUS_PROCESSING, claimed_field(field_name): timezone.now()}
+    )
+    if not claimed:
+        return None
+
+    instance = model._default_manager.get(pk=pk)
+    image = getattr(instance, field_name)
+    claimed_name = image.name
+    manifest_field = renditions.renditions_field(field_name)
+    has_renditions = any(field.name == manifest_field for field in model._meta.concrete_fields)
+    update_fields = [status]
+    started = time.perf_counter()
+    try:
+        if image:
+            content = _resize(image, max_size)
+            if content is not None:
+                # The original stays until gc_media: another row may share it
+                image.save(f'{os.path.splitext(os.path.basename(claimed_name))[0]}.jpg', content, save=False)
+                update_fields.append(field_name)
+        if has_renditions:
+            setattr(instance, manifest_field, renditions.generate(image) if image else {})
+            update_fields.append(manifest_field)
+        setattr(instance, status, STATUS_DONE if image else STATUS_NONE)
+    except Exception:
+        logger.exception('Error processing %s.%s for pk=%s', model_label, field_name, pk)
+        setattr(instance, status, STATUS_FAILED)
+        update_fields = [status]
+
+    if any(field.name == 'updated_at' for field in model._meta.concrete_fields):
+        update_fields.append('updated_at')
+    with transaction.atomic(using=instance._state.db):
+        # Locked until the save, so a re-upload cannot slip in between
+        stored = model._default_manager.select_for_update().filter(pk=pk).values_list(field_name, flat=True)
+        if [name or '' for name in stored] != [claimed_name or '']:
+            # Replaced or deleted meanwhile; files written here are left to gc_media
+            observe_image(model_label, field_name, 'superseded', time.perf_counter() - started)
+            return None
+        instance.save(update_fields=update_fields)
+    observe_image(model_label, field_name, getattr(instance, status), time.perf_counter() - started)
+    return getattr(instance, status)
+
+
+def _resize(image, max_size):
+    """JPEG bytes for the resized image, or None if it already fits"""
+    from PIL import Image
+
+    with image.storage.open(image.name, 'rb') as stored:
+        img = Image.open(stored)
+        img.load()
+
+    if img.width <= max_size[0] and img.height <= max_size[1]:
+        return None
+
+    if img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    img.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+    output = BytesIO()
+    img.save(output, format='JPEG', quality=JPEG_QUALITY, optimize=True)
+    return ContentFile(output.getvalue())
+
+
+def processed_image_fields():
+    """(model, field name) for every ImageField that has a status column"""
+    for model in apps.get_models():
+        names = {field.name for field in model._meta.concrete_fields}
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.ImageField) and status_field(field.name) in names:
+                yield model, field.name
@@ -0,0 +1,262 @@
+"""
+Per-request performance instrumentation.
+
+ServerTimingMiddleware measures every request: wall time, database queries
+and their total time, template rendering time and cache hits/misses. The
+numbers go out as a ``Server-Timing`` header (visible in the browser's
+network panel) and as one JSON log line on ``portfolio.requests``. Requests
+slower than SLOW_REQUEST_MS are also logged, sampled at
+SLOW_REQUEST_SAMPLE_RATE, on ``portfolio.slow`` with their slowest SQL.
+
+The metrics of the current request live in a context variable, which
+follows the request into sync_to_async threads (core.concurrency), so
+queries run concurrently are counted too. Their database times add up, so
+``db`` can exceed the wall time of an async view.
+
+Latency, status and query counts also feed the Prometheus metrics
+(core.metrics), and the queries the N+1 detector (core.nplusone).
+"""
+import json
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+from core import metrics as prometheus
+from core import nplusone
+
+request_logger = logging.getLogger('portfolio.requests')
+slow_logger = logging.getLogger('portfolio.slow')
+
+# Queries kept per request for the slow-request log
+MAX_CAPTURED_QUERIES = 200
+SLOW_QUERIES_LOGGED = 10
+SQL_LOG_LENGTH = 1000
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class Metrics:
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache = {}
+        self.captured = []
+        self.detector = nplusone.detector()
+        self._lock = threading.Lock()
+
+    def add_query(self, sql, duration):
+        with self._lock:
+            self.queries += 1
+            self.db_time += duration
+            if len(self.captured) < MAX_CAPTURED_QUERIES:
+                self.captured.append((duration, sql))
+            if self.detector is not None:
+                self.detector.add(sql)
+
+    def add_cache(self, name, hit):
+        with self._lock:
+            hits, misses = self.cache.get(name, (0, 0))
+            self.cache[name] = (hits + 1, misses) if hit else (hits, misses + 1)
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def current():
+    """Metrics of the request being handled, or None outside a request"""
+    return _current.get()
+
+
+@contextmanager
+def measure():
+    """
+    Collect Metrics for the block, as the middleware does for a request.
+    Cache hit/miss counts are only kept in them: the caller writes them with
+    core.caching.write_stats() (off the event loop in async code).
+    """
+    install()
+    metrics = Metrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+def record_cache(name, hit):
+    """Count a cache lookup towards the current request; False outside one"""
+    metrics = _current.get()
+    if metrics is None:
+        return False
+    metrics.add_cache(name, hit)
+    return True
+
+
+def _time_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - start)
+
+
+def _install_on(connection, **kwargs):
+    if _time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_time_query)
+
+
+def install():
+    """Time the queries of every database connection, current and future"""
+    connection_created.connect(_install_on, dispatch_uid='core.instrumentation')
+    for connection in connections.all(initialized_only=True):
+        _install_on(connection)
+
+
+class TimedTemplate:
+    """A backend template whose render() counts towards the request's template time"""
+
+    def __init__(self, template):
+        self._template = template
+
+    def __getattr__(self, name):
+        return getattr(self._template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None:
+            return self._template.render(context, request)
+        # Templates rendered from inside another one are already being timed
+        metrics.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return self._template.render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            if not metrics.template_depth:
+                metrics.template_time += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """DjangoTemplates with render time recorded for ServerTimingMiddleware"""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def server_timing(metrics, total):
+    parts = [
+        f'app;dur={total * 1000:.1f}',
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'tpl;dur={metrics.template_time * 1000:.1f}',
+    ]
+    for name, (hits, misses) in sorted(metrics.cache.items()):
+        parts.append(f'cache-{name};desc="{hits} hit {misses} miss"')
+    return ', '.join(parts)
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the record's `data`"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            **getattr(record, 'data', {}),
+        }
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class ServerTimingMiddleware:
+    """Measure each request; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with measure() as metrics:
+            try:
+                response = self.get_response(request)
+                self.finish(request, response, metrics)
+            finally:
+                self.flush(metrics)
+        return response
+
+    async def __acall__(self, request):
+        with measure() as metrics:
+            try:
+                response = await self.get_response(request)
+                self.finish(request, response, metrics)
+            finally:
+                # A blocking cache write, kept off the event loop
+                await sync_to_async(self.flush)(metrics)
+        return response
+
+    def flush(self, metrics):
+        """Write the hit/miss counters of every cache lookup, in one go"""
+        from core.caching import write_stats
+
+        write_stats(metrics.cache)
+
+    def finish(self, request, response, metrics):
+        total = metrics.elapsed()
+        if getattr(settings, 'SERVER_TIMING', True):
+            response['Server-Timing'] = server_timing(metrics, total)
+
+        match = request.resolver_match
+        data = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'total_ms': round(total * 1000, 1),
+            'db_ms': round(metrics.db_time * 1000, 1),
+            'queries': metrics.queries,
+            'template_ms': round(metrics.template_time * 1000, 1),
+            'cache': {name: {'hits': hits, 'misses': misses} for name, (hits, misses) in metrics.cache.items()},
+        }
+        request_logger.info('%s %s %s', request.method, request.path, response.status_code, extra={'data': data})
+        prometheus.observe_request(data['view'], request.method, response.status_code, total, metrics.queries)
+
+        slow_ms = getattr(settings, 'SLOW_REQUEST_MS', 500)
+        if total * 1000 >= slow_ms and random.random() < getattr(settings, 'SLOW_REQUEST_SAMPLE_RATE', 1.0):
+            slowest = sorted(metrics.captured, key=lambda query: query[0], reverse=True)[:SLOW_QUERIES_LOGGED]
+            data['slowest_queries'] = [
+                {'ms': round(duration * 1000, 1), 'sql': sql[:SQL_LOG_LENGTH]} for duration, sql in slowest
+            ]
+            slow_logger.warning(
+                'Slow request: %s %s took %.0f ms', request.method, request.path, total * 1000,
+                extra={'data': data},
+            )
+
+        if metrics.detector is not None:
+            metrics.detector.report(f'{request.method} {request.path}', nplusone.mode())
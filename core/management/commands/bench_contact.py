@@ -0,0 +1,133 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.core import mail
+from django.core.cache import cache
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from core import benchmark, factories, tasks
+from core.models import ContactMessage
+
+
+class SlowEmailBackend(EmailBackend):
+    """In-memory outbox that takes as long as a real SMTP exchange"""
+    latency = 0.2
+
+    def send_messages(self, messages):
+        time.sleep(self.latency)
+        return super().send_messages(messages)
+
+
+class Command(BaseCommand):
+    help = (
+        'Fire a burst of concurrent contact form POSTs at a throwaway test database and '
+        'report POST latency, how many were accepted or rate limited, and how many messages '
+        'were stored and emailed. Runs with background delivery and, for comparison, inline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200, help='POSTs in the burst')
+        parser.add_argument('--clients', type=int, default=20, help='Concurrent senders')
+        parser.add_argument('--ips', type=int, default=50, help='Distinct client addresses the posts come from')
+        parser.add_argument(
+            '--unique', type=int, default=100,
+            help='Distinct messages; the rest of the burst resubmits them',
+        )
+        parser.add_argument('--smtp-latency', type=float, default=200, help='Simulated mail server time (ms)')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        test_settings = connection.settings_dict.setdefault('TEST', {})
+        saved_test_name = test_settings.get('NAME')
+        if connection.vendor == 'sqlite':
+            # Background threads need a database other connections can see
+            handle, path = tempfile.mkstemp(suffix='.sqlite3')
+            os.close(handle)
+            test_settings['NAME'] = path
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        SlowEmailBackend.latency = options['smtp_latency'] / 1000
+        try:
+            profile = factories.create_profile()
+            profile.email = 'owner@example.com'
+            profile.save()
+            self.stdout.write(
+                f"{options['posts']} POSTs from {options['clients']} clients, {options['ips']} addresses, "
+                f"{options['unique']} distinct messages, {options['smtp_latency']:.0f} ms mail server"
+            )
+            self.stdout.write(
+                f'{"delivery":<12} {"p50 ms":>8} {"p95 ms":>8} {"accepted":>9} {"limited":>8} '
+                f'{"stored":>7} {"emailed":>8} {"drain s":>8}'
+            )
+            for mode, tasks_setting in (('background', 'thread'), ('inline', 'sync')):
+                with override_settings(
+                    BACKGROUND_TASKS=tasks_setting,
+                    EMAIL_BACKEND=f'{SlowEmailBackend.__module__}.SlowEmailBackend',
+                ):
+                    self._report(mode, self._burst(options))
+        finally:
+            tasks.shutdown()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = saved_test_name
+            teardown_test_environment()
+
+    def _burst(self, options):
+        cache.clear()
+        ContactMessage.objects.all().delete()
+        mail.outbox = []
+        url = reverse('core:contact')
+        timings, statuses = [], []
+        lock = threading.Lock()
+        counter = iter(range(options['posts']))
+
+        def sender():
+            client = Client()
+            while True:
+                with lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                n = i % options['unique']
+                data = {
+                    'name': f'Sender {n}', 'email': f'sender{n}@example.com',
+                    'subject': f'Hello {n}', 'message': f'Message number {n}',
+                }
+                start = time.perf_counter()
+                address = i % options['ips']
+                response = client.post(url, data, REMOTE_ADDR=f'10.0.{address // 256}.{address % 256}')
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    timings.append(elapsed)
+                    statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=sender) for _ in range(options['clients'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # Wait for the queued deliveries
+        start = time.perf_counter()
+        tasks.shutdown()
+        drain = time.perf_counter() - start
+        return {
+            'p50_ms': benchmark.percentile(timings, 0.5),
+            'p95_ms': benchmark.percentile(timings, 0.95),
+            'accepted': statuses.count(302),
+            'limited': statuses.count(429),
+            'stored': ContactMessage.objects.count(),
+            'emailed': len(mail.outbox),
+            'drain_s': drain,
+        }
+
+    def _report(self, mode, result):
+        self.stdout.write(
+            f'{mode:<12} {result["p50_ms"]:>8.1f} {result["p95_ms"]:>8.1f} {result["accepted"]:>9} '
+            f'{result["limited"]:>8} {result["stored"]:>7} {result["emailed"]:>8} {result["drain_s"]:>8.2f}'
+        )
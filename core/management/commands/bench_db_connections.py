@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connections
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure per-request database latency with a fresh connection per request '
+        'versus the configured connection reuse. Point DB_HOST/DB_PORT at a local '
+        'Postgres (e.g. docker run -p 5432:5432 postgres) to compare safely.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Simulated requests per mode')
+        parser.add_argument('--database', default='default', help='Database alias to benchmark')
+        parser.add_argument(
+            '--query', default='SELECT 1',
+            help='SQL each simulated request runs (use a real page query for a fuller picture)',
+        )
+
+    def handle(self, *args, **options):
+        alias = options['database']
+        connection = connections[alias]
+        configured_max_age = connection.settings_dict['CONN_MAX_AGE']
+        pooled = 'pool' in connection.settings_dict.get('OPTIONS', {})
+
+        modes = [('fresh connection', 0)]
+        if pooled:
+            modes.append(('connection pool', 0))
+        else:
+            modes.append((f'CONN_MAX_AGE={configured_max_age or 600}', configured_max_age or 600))
+
+        self.stdout.write(f'{connection.vendor} at {connection.settings_dict.get("HOST") or "local"}, '
+                          f'{options["requests"]} requests per mode')
+        try:
+            for label, max_age in modes:
+                if pooled and label == 'fresh connection':
+                    # A pool has no per-request mode; bypass it for the baseline
+                    timings = self._run(connection, options, max_age, without_pool=True)
+                else:
+                    timings = self._run(connection, options, max_age)
+                self._report(label, timings)
+        finally:
+            connection.settings_dict['CONN_MAX_AGE'] = configured_max_age
+            connection.close()
+
+    def _run(self, connection, options, max_age, without_pool=False):
+        connection.close()
+        connection.settings_dict['CONN_MAX_AGE'] = max_age
+        saved_options = connection.settings_dict.get('OPTIONS', {})
+        if without_pool:
+            connection.settings_dict['OPTIONS'] = {k: v for k, v in saved_options.items() if k != 'pool'}
+
+        timings = []
+        try:
+            for _ in range(options['requests']):
+                start = time.perf_counter()
+                # Same lifecycle Django runs around every view
+                request_started.send(sender=self.__class__)
+                with connection.cursor() as cursor:
+                    cursor.execute(options['query'])
+                    cursor.fetchall()
+                request_finished.send(sender=self.__class__)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            connection.close()
+            connection.settings_dict['OPTIONS'] = saved_options
+        return timings
+
+    def _report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        self.stdout.write(
+            f'{label:>22}: mean {statistics.mean(timings):7.2f} ms  '
+            f'p50 {statistics.median(timings):7.2f} ms  p95 {p95:7.2f} ms'
+        )
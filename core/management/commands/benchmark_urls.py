@@ -0,0 +1,101 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from core import benchmark, factories
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database at one or more volumes, request every public URL '
+        'and report query count, p50/p95 time and response size. Exits non-zero when a '
+        'result exceeds the stored baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--projects', type=int, nargs='+', default=[10, 1000],
+            help='Project volumes to seed, e.g. --projects 10 1000 50000',
+        )
+        parser.add_argument('--certifications', type=int, help='Certifications per volume (default: projects / 4)')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed requests per URL')
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='Baseline JSON file')
+        parser.add_argument(
+            '--update-baseline', action='store_true',
+            help='Write this run as the new baseline instead of comparing against it',
+        )
+        parser.add_argument(
+            '--page-cache', action='store_true',
+            help='Leave the full-page cache on (by default every request renders)',
+        )
+
+    def handle(self, *args, **options):
+        baseline_path = Path(options['baseline'])
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(PAGE_CACHE_ENABLED=options['page_cache'], DEBUG=False):
+                runs = {
+                    self._volume_key(projects, options): self._run(projects, options)
+                    for projects in options['projects']
+                }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['update_baseline']:
+            baseline.update(runs)
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f'Baseline written to {baseline_path}'))
+            return
+
+        regressions = []
+        for key, results in runs.items():
+            if key not in baseline:
+                self.stdout.write(self.style.WARNING(f'No baseline for {key}; run with --update-baseline'))
+                continue
+            regressions.extend(f'[{key}] {line}' for line in benchmark.compare(results, baseline[key]))
+
+        if regressions:
+            for line in regressions:
+                self.stderr.write(line)
+            raise CommandError(f'{len(regressions)} benchmark budget(s) regressed')
+        self.stdout.write(self.style.SUCCESS('All benchmarks within budget'))
+
+    def _volume_key(self, projects, options):
+        certifications = options['certifications']
+        if certifications is None:
+            certifications = max(projects // 4, 1)
+        return f'projects={projects},certifications={certifications}'
+
+    def _run(self, projects, options):
+        call_command('flush', interactive=False, verbosity=0)
+        cache.clear()
+        factories.seed(projects=projects, certifications=options['certifications'])
+
+        key = self._volume_key(projects, options)
+        self.stdout.write(f'\n{key}')
+        self.stdout.write(f'{"url":<50} {"queries":>7} {"p50 ms":>8} {"p95 ms":>8} {"bytes":>9}')
+
+        client = Client()
+        results = {}
+        for label, url in benchmark.public_urls().items():
+            result = benchmark.measure(client, url, options['repeat'])
+            results[label] = result
+            self.stdout.write(
+                f'{url:<50} {result["queries"]:>7} {result["p50_ms"]:>8.2f} '
+                f'{result["p95_ms"]:>8.2f} {result["bytes"]:>9}'
+            )
+        return results
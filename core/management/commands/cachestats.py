@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from core.caching import cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Show hit/miss counters for the page, fragment and facet caches (needs a shared CACHE_BACKEND)'
+
+    def handle(self, *args, **options):
+        for name in ('page', 'fragment', 'facet'):
+            stats = cache_stats(name)
+            self.stdout.write(
+                f"{name}: {stats['hits']} hits, {stats['misses']} misses "
+                f"({stats['hit_rate']:.1%} hit rate)"
+            )
@@ -0,0 +1,41 @@
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.export import Exporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Pre-render every public page, API response, static and media file into a directory '
+        'that any static host can serve. Pages with a query string are written to '
+        '<path>/<query>/index.html (or index.json); with nginx serve them through '
+        '"try_files $uri/$args/index.html $uri/$args/index.json $uri/index.html $uri/index.json =404".'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=str(settings.BASE_DIR / 'export'), help='Target directory')
+        parser.add_argument(
+            '--base-url', default='https://localhost',
+            help='Public origin of the export, used for absolute URLs in the API responses',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Processes rendering pages in parallel (default: one per CPU)',
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Re-render every page instead of only those whose content changed',
+        )
+
+    def handle(self, *args, **options):
+        exporter = Exporter(
+            options['output'], options['base_url'], workers=options['workers'], full=options['full'],
+        )
+        stats = exporter.run()
+        self.stdout.write(
+            f"{stats['rendered']} of {stats['pages']} pages rendered, "
+            f"{stats['files']} static/media files, {stats['removed']} stale files removed "
+            f"-> {options['output']}"
+        )
@@ -0,0 +1,37 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from core.storage import orphaned_names, rehash_files
+
+
+class Command(BaseCommand):
+    help = 'Delete stored media files that no model row references (uploads are shared, so rows never delete them)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='List the orphans without deleting them')
+        parser.add_argument(
+            '--grace', type=int, default=60 * 60,
+            help='Keep orphans younger than this many seconds (uploads in progress)',
+        )
+        parser.add_argument(
+            '--rehash', action='store_true',
+            help='First move files stored under pre-hash names to content-hashed ones, merging duplicates',
+        )
+
+    def handle(self, *args, **options):
+        if options['rehash']:
+            if options['dry_run']:
+                self.stdout.write('--rehash is skipped in a dry run')
+            else:
+                self.stdout.write(f'{rehash_files()} rows moved to content-hashed names')
+
+        removed = size = 0
+        for name in orphaned_names(default_storage, options['grace']):
+            size += default_storage.size(name)
+            removed += 1
+            if options['dry_run']:
+                self.stdout.write(f'orphan: {name}')
+            else:
+                default_storage.delete(name)
+        verb = 'would free' if options['dry_run'] else 'freed'
+        self.stdout.write(f'{removed} orphaned files, {verb} {size / 1024:.0f} KB')
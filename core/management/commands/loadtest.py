@@ -0,0 +1,153 @@
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the public pages with concurrent keep-alive clients and report throughput '
+        'and latency percentiles. --server wsgi|asgi|both starts gunicorn with that profile '
+        '(see gunicorn.conf.py) against the configured database; --url targets a running '
+        'server instead. Async views only pay off when queries wait on the network, so '
+        'compare against a real Postgres rather than SQLite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=['wsgi', 'asgi', 'both'], default='both')
+        parser.add_argument('--url', help='Base URL of an already running server (skips --server)')
+        parser.add_argument('--port', type=int, default=8765, help='Port for the servers started here')
+        parser.add_argument('--workers', type=int, default=2, help='Gunicorn workers for the servers started here')
+        parser.add_argument('--concurrency', type=int, default=32, help='Simultaneous clients')
+        parser.add_argument('--duration', type=float, default=10.0, help='Seconds of load per server')
+        parser.add_argument(
+            '--path', action='append', dest='paths',
+            help='Path to request (repeatable); default: every public page and filter variant',
+        )
+        parser.add_argument(
+            '--page-cache', action='store_true',
+            help='Leave the full-page cache on in the servers started here (by default every request renders)',
+        )
+
+    def handle(self, *args, **options):
+        paths = options['paths'] or [
+            url for label, url in benchmark.public_urls().items() if not label.startswith('api:')
+        ]
+        if not paths:
+            raise CommandError('No pages to request; seed some content first')
+
+        if options['url']:
+            results = {options['url']: self._load(options['url'], paths, options)}
+        else:
+            modes = ['wsgi', 'asgi'] if options['server'] == 'both' else [options['server']]
+            results = {}
+            for mode in modes:
+                with self._server(mode, options) as base_url:
+                    results[mode] = self._load(base_url, paths, options)
+
+        self.stdout.write(f'{len(paths)} paths, {options["concurrency"]} clients, {options["duration"]:.0f}s each')
+        self.stdout.write(f'{"target":<28} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8} {"errors":>7}')
+        for target, result in results.items():
+            self.stdout.write(
+                f'{target:<28} {result["rps"]:>8.1f} {result["p50_ms"]:>8.1f} '
+                f'{result["p95_ms"]:>8.1f} {result["p99_ms"]:>8.1f} {result["errors"]:>7}'
+            )
+
+    @contextmanager
+    def _server(self, mode, options):
+        """Run gunicorn with the given profile for the duration of the block"""
+        env = {**os.environ, 'WEB_SERVER': mode}
+        if not options['page_cache']:
+            env['PAGE_CACHE_ENABLED'] = 'False'
+        process = subprocess.Popen(
+            [
+                sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                '--bind', f'127.0.0.1:{options["port"]}', '--workers', str(options['workers']),
+            ],
+            cwd=settings.BASE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            self._wait_for_port(options['port'], process)
+            yield f'http://127.0.0.1:{options["port"]}'
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+
+    def _wait_for_port(self, port, process, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f'Server exited with code {process.returncode}')
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f'Server did not start listening on port {port}')
+
+    def _load(self, base_url, paths, options):
+        parts = urlsplit(base_url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        timings, errors = [], []
+        lock = threading.Lock()
+
+        def client(offset):
+            connection = connection_class(parts.netloc, timeout=30)
+            local_timings, local_errors = [], 0
+            i = offset
+            while time.monotonic() < deadline:
+                path = parts.path.rstrip('/') + paths[i % len(paths)]
+                i += 1
+                start = time.perf_counter()
+                try:
+                    connection.request('GET', path)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        local_errors += 1
+                        continue
+                except (OSError, http.client.HTTPException):
+                    local_errors += 1
+                    connection.close()
+                    continue
+                local_timings.append((time.perf_counter() - start) * 1000)
+            connection.close()
+            with lock:
+                timings.extend(local_timings)
+                errors.append(local_errors)
+
+        # Warm every page once so first renders and cold caches are not measured
+        warm = connection_class(parts.netloc, timeout=30)
+        for path in paths:
+            warm.request('GET', parts.path.rstrip('/') + path)
+            warm.getresponse().read()
+        warm.close()
+
+        started = time.monotonic()
+        deadline = started + options['duration']
+        threads = [threading.Thread(target=client, args=(n,)) for n in range(options['concurrency'])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        if not timings:
+            raise CommandError(f'No successful requests against {base_url}')
+        return {
+            'rps': len(timings) / elapsed,
+            'p50_ms': benchmark.percentile(timings, 0.5),
+            'p95_ms': benchmark.percentile(timings, 0.95),
+            'p99_ms': benchmark.percentile(timings, 0.99),
+            'errors': sum(errors),
+        }
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core import images
+
+
+class Command(BaseCommand):
+    help = (
+        'Process uploaded images that are still pending or whose processing was abandoned '
+        '(and failed ones, with --retry-failed)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Also retry images whose processing failed or is still running',
+        )
+
+    def handle(self, *args, **options):
+        statuses = [images.STATUS_PENDING]
+        if options['retry_failed']:
+            statuses += [images.STATUS_FAILED, images.STATUS_PROCESSING]
+
+        for model, field_name in images.processed_image_fields():
+            pks = model._default_manager.filter(images.claimable(field_name, statuses)).values_list('pk', flat=True)
+            results = {}
+            for pk in pks:
+                result = images.process_image(
+                    model._meta.label, pk, field_name, model.IMAGE_MAX_SIZE, statuses=statuses,
+                )
+                results[result] = results.get(result, 0) + 1
+            summary = ', '.join(f'{count} {result}' for result, count in results.items()) or 'nothing to do'
+            self.stdout.write(f'{model._meta.label}.{field_name}: {summary}')
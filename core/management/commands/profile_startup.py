@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from core import startup
+
+
+class Command(BaseCommand):
+    help = (
+        'Boot the web application in a fresh interpreter under -X importtime and report the '
+        'total import time and module count against their budgets, the slowest modules, and any '
+        'module that should be imported lazily but was not. Exits non-zero when over budget.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--asgi', action='store_true', help='Profile porfolio.asgi instead of porfolio.wsgi')
+        parser.add_argument('--limit', type=int, default=25, help='Modules to list')
+        parser.add_argument('--budget', type=float, default=startup.BUDGET_MS, help='Budget in ms')
+
+    def handle(self, *args, **options):
+        target = 'porfolio.asgi' if options['asgi'] else 'porfolio.wsgi'
+        imports = startup.profile(target)
+        total = startup.total_ms(imports)
+
+        self.stdout.write(
+            f'{target}: {len(imports)} modules (budget {startup.MODULE_BUDGET}), '
+            f'{total:.0f} ms (budget {options["budget"]:.0f} ms)'
+        )
+        self.stdout.write(f'\n{"cumulative ms":>14} {"self ms":>8}  module')
+        heaviest = sorted(imports, key=lambda item: item.cumulative_us, reverse=True)[:options['limit']]
+        for item in heaviest:
+            self.stdout.write(f'{item.cumulative_us / 1000:>14.1f} {item.self_us / 1000:>8.1f}  {item.module}')
+
+        eager = startup.eager_lazy_modules(imports)
+        if eager:
+            self.stdout.write('\nImported eagerly but listed in LAZY_MODULES:')
+            for module in eager:
+                if '.' not in module or module in startup.LAZY_MODULES:
+                    self.stdout.write(f'  {" <- ".join(startup.importers(imports, module))}')
+
+        if total > options['budget'] or len(imports) > startup.MODULE_BUDGET or eager:
+            raise CommandError('Startup is over budget')
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from core.related import registry
+
+
+class Command(BaseCommand):
+    help = 'Recompute the related projects and certifications shown on detail pages'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--if-empty', action='store_true',
+            help='Only rebuild indexes with no stored links yet (safe to run on every deploy)',
+        )
+
+    def handle(self, *args, **options):
+        for index in registry:
+            label = index.model._meta.label
+            if options['if_empty'] and index.link_model.objects.exists():
+                self.stdout.write(f'{label}: already built, skipping')
+                continue
+            count = index.rebuild()
+            self.stdout.write(f'{label}: stored {count} links')
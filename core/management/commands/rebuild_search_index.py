@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.search import registry
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index for projects and certifications'
+
+    def handle(self, *args, **options):
+        for index in registry:
+            count = index.rebuild()
+            self.stdout.write(f'{index.model._meta.label}: indexed {count} rows')
@@ -0,0 +1,93 @@
+"""
+Prometheus metrics, exposed on /metrics (see core.views.metrics).
+
+Requests are labelled with their URL name (``core:home``,
+``projects:project_detail``, ...), never the raw path, and with their
+method, any outside METHODS counting as ``other``, so the number of series
+stays bounded. Under gunicorn each worker writes its samples to
+PROMETHEUS_MULTIPROC_DIR (set up in gunicorn.conf.py) and a scrape adds
+up all of them; without that variable the metrics are this process's own.
+
+prometheus_client is imported on the first observation rather than with
+the models, so management commands and worker boot don't pay for it.
+"""
+import os
+import threading
+from types import SimpleNamespace
+
+UNRESOLVED = '<unresolved>'
+
+METHODS = frozenset({'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'})
+
+_lock = threading.Lock()
+_registered = None
+
+
+def _metrics():
+    global _registered
+    if _registered is None:
+        # Registering a metric twice raises, so threads racing here take turns
+        with _lock:
+            if _registered is None:
+                _registered = _create()
+    return _registered
+
+
+def _create():
+    from prometheus_client import Counter, Histogram
+
+    return SimpleNamespace(
+        request_latency=Histogram(
+            'portfolio_http_request_duration_seconds', 'Time to answer a request',
+            ['view', 'method'],
+            buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+        ),
+        requests=Counter(
+            'portfolio_http_requests', 'Requests answered',
+            ['view', 'method', 'status'],
+        ),
+        request_queries=Histogram(
+            'portfolio_http_request_db_queries', 'Database queries per request',
+            ['view'],
+            buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89),
+        ),
+        image_processing=Histogram(
+            'portfolio_image_processing_seconds', 'Time to resize an upload and build its renditions',
+            ['model', 'field', 'status'],
+            buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+        ),
+        contact_submissions=Counter(
+            'portfolio_contact_submissions', 'Contact form submissions by outcome',
+            ['status'],
+        ),
+    )
+
+
+def observe_request(view, method, status, duration, queries):
+    metrics = _metrics()
+    view = view or UNRESOLVED
+    method = method if method in METHODS else 'other'
+    metrics.request_latency.labels(view, method).observe(duration)
+    metrics.requests.labels(view, method, str(status)).inc()
+    metrics.request_queries.labels(view).observe(queries)
+
+
+def observe_image(model_label, field_name, status, duration):
+    _metrics().image_processing.labels(model_label, field_name, status).observe(duration)
+
+
+def count_contact(status):
+    _metrics().contact_submissions.labels(status).inc()
+
+
+def exposition():
+    """(body, content type) in the text exposition format"""
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+
+    _metrics()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
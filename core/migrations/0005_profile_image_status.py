@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+def mark_existing_images_pending(apps, schema_editor):
+    # Images uploaded before the pipeline existed were never resized
+    apps.get_model('core', 'Profile').objects.exclude(profile_image='').exclude(profile_image__isnull=True).update(profile_image_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_alter_profile_profile_image'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_status',
+            field=models.CharField(blank=True, choices=[('', 'No image'), ('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(mark_existing_images_pending, migrations.RunPython.noop),
+    ]
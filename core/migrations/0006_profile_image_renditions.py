@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:29
+
+from django.db import migrations, models
+
+
+def queue_rendition_builds(apps, schema_editor):
+    # Re-run the image pipeline so existing images get their renditions
+    apps.get_model('core', 'Profile').objects.exclude(profile_image='').exclude(profile_image__isnull=True).update(profile_image_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_profile_image_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='profile_image_renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.RunPython(queue_rendition_builds, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-17 23:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_profile_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='fingerprint',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='ip_address',
+            field=models.GenericIPAddressField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,11 +1,11 @@
 from django.db import models
 from django.contrib.auth.models import User
-import os
-from django.core.files.storage import default_storage
-from io import BytesIO
-from django.core.files.uploadedfile import InMemoryUploadedFile
+from core import images
 
 class Profile(models.Model):
+    # Uploaded images are resized to fit within this box (see core.images)
+    IMAGE_MAX_SIZE = (400, 400)
+    
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     title = models.CharField(max_length=250, help_text='Your professional title', blank=True, default='Full Stack AI Engineer')
     bio = models.TextField(help_text='A short bio about yourself', blank=True, default='Passionate about building intelligent solutions that solve real-world problems.')
@@ -18,6 +18,11 @@ class Profile(models.Model):
         null=True,
         help_text='Upload a professional profile picture (will be resized to 400x400)'
     )
+    profile_image_status = models.CharField(
+        max_length=20, choices=images.IMAGE_STATUS_CHOICES, default='', blank=True, editable=False
+    )
+    profile_image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    profile_image_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     
     resume = models.FileField(upload_to='resume/', blank=True, null=True)
     
@@ -49,43 +54,10 @@ class Profile(models.Model):
         return f"{self.user.username}'s Profile"
 
     def save(self, *args, **kwargs):
-        # Resize profile image before saving
-        if self.profile_image and not self._state.adding:
-            try:
-                from PIL import Image
-                
-                # Open the image
-                img = Image.open(self.profile_image)
-                
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Resize to professional size (400x400)
-                if img.height > 400 or img.width > 400:
-                    output_size = (400, 400)
-                    img.thumbnail(output_size, Image.Resampling.LANCZOS)
-                    
-                    # Save the resized image
-                    img_io = BytesIO()
-                    img.save(img_io, format='JPEG', quality=85, optimize=True)
-                    img_io.seek(0)
-                    
-                    # Replace the image field
-                    self.profile_image = InMemoryUploadedFile(
-                        img_io,
-                        'ImageField',
-                        f"{os.path.splitext(self.profile_image.name)[0]}.jpg",
-                        'image/jpeg',
-                        img_io.getbuffer().nbytes,
-                        None
-                    )
-            except Exception as e:
-                # If there's an error with image processing, continue without resizing
-                print(f"Error processing image: {e}")
-                pass
-        
+        # Resize profile image to 400x400 once the upload is stored (see core.images)
+        images.mark_pending(self, 'profile_image')
         super().save(*args, **kwargs)
+        images.schedule(self, 'profile_image', self.IMAGE_MAX_SIZE)
 
     @property
     def get_profile_image_url(self):
@@ -111,6 +83,9 @@ class ContactMessage(models.Model):
     subject = models.CharField(max_length=200)
     message = models.TextField()
     is_read = models.BooleanField(default=False)
+    ip_address = models.GenericIPAddressField(null=True, blank=True, editable=False)
+    # Hash of email, subject and text; identical resubmissions are dropped (core.contact)
+    fingerprint = models.CharField(max_length=64, blank=True, default='', editable=False, db_index=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
@@ -0,0 +1,139 @@
+"""
+N+1 query detection.
+
+A SELECT that differs only in its parameters, run NPLUSONE_THRESHOLD times
+or more in one request, is almost always a relation walked per row in a
+loop (``project.category.icon`` in a card, ``obj.projects.count()`` in an
+admin column) that select_related, prefetch_related or an annotation should
+load at once. ServerTimingMiddleware feeds every query of a request to a
+Detector (core.instrumentation); what happens when one repeats is set by
+NPLUSONE:
+
+    'raise'  raise NPlusOneError after the response (set by core.testing)
+    'warn'   log a warning on portfolio.nplusone with the Python and
+             template call site (the DEBUG default)
+    'off'    nothing is tracked
+
+Queries matching one of the NPLUSONE_ALLOW regular expressions are
+expected to repeat and never reported.
+"""
+import logging
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+
+from django.conf import settings
+from django.template.base import TokenType
+
+logger = logging.getLogger('portfolio.nplusone')
+
+RAISE = 'raise'
+WARN = 'warn'
+OFF = 'off'
+
+STACK_FRAMES = 8
+
+_IN_LIST = re.compile(r'\bIN \((?:%s, )*%s\)')
+_NUMBER = re.compile(r'\b\d+\b')
+_QUOTED_NAME = re.compile(r'"s\d+_x\d+"')
+
+
+class NPlusOneError(Exception):
+    pass
+
+
+def shape(sql):
+    """The query with everything that varies between the rows of a loop collapsed"""
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _QUOTED_NAME.sub('"savepoint"', sql)
+    return _NUMBER.sub('N', sql)
+
+
+def mode():
+    return getattr(settings, 'NPLUSONE', OFF)
+
+
+def _project_frame(filename):
+    path = Path(filename)
+    return (
+        path.is_relative_to(settings.BASE_DIR)
+        and 'site-packages' not in path.parts
+        and path.name not in ('instrumentation.py', 'nplusone.py')
+    )
+
+
+def _source(token):
+    """A template token as written: {{ variable }} or {% tag %}"""
+    if token.token_type == TokenType.VAR:
+        return f'{{{{ {token.contents} }}}}'
+    return f'{{% {token.contents} %}}'
+
+
+def callsite():
+    """Where the current query comes from: project code frames and the template line being rendered"""
+    frames, template = [], None
+    frame = sys._getframe(1)
+    while frame is not None:
+        code = frame.f_code
+        if template is None and code.co_name == 'render_annotated':
+            node = frame.f_locals.get('self')
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                template = f'{origin.template_name}, line {token.lineno}: {_source(token)}'
+        if len(frames) < STACK_FRAMES and _project_frame(code.co_filename):
+            frames.append(f'{code.co_filename}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    return {'template': template, 'stack': frames}
+
+
+class Detector:
+    """Counts the SELECT shapes of one request"""
+
+    def __init__(self, threshold, allow=()):
+        self.threshold = threshold
+        self.allow = [re.compile(pattern) for pattern in allow]
+        self.counts = Counter()
+        self.callsites = {}
+
+    def add(self, sql):
+        if not sql.lstrip().upper().startswith('SELECT'):
+            return
+        key = shape(sql)
+        self.counts[key] += 1
+        # The call site of the repeat that makes it a problem
+        if self.counts[key] == self.threshold and not any(pattern.search(sql) for pattern in self.allow):
+            self.callsites[key] = callsite()
+
+    def repeated(self):
+        """[(shape, times run, call site)], most repeated first"""
+        return sorted(
+            ((key, self.counts[key], site) for key, site in self.callsites.items()),
+            key=lambda item: item[1], reverse=True,
+        )
+
+    def report(self, label, action):
+        repeated = self.repeated()
+        if not repeated:
+            return
+        lines = [f'N+1 queries in {label}:']
+        for sql, count, site in repeated:
+            lines.append(f'  {count}x {sql}')
+            if site['template']:
+                lines.append(f'    template {site["template"]}')
+            lines.extend(f'    {frame}' for frame in site['stack'])
+        message = '\n'.join(lines)
+        if action == RAISE:
+            raise NPlusOneError(message)
+        logger.warning(message, extra={'data': {
+            'where': label,
+            'queries': [{'sql': sql, 'count': count, **site} for sql, count, site in repeated],
+        }})
+
+
+def detector():
+    """A Detector for a new request, or None when NPLUSONE is 'off'"""
+    if mode() == OFF:
+        return None
+    return Detector(getattr(settings, 'NPLUSONE_THRESHOLD', 3), getattr(settings, 'NPLUSONE_ALLOW', ()))
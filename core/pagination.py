@@ -0,0 +1,109 @@
+"""
+Keyset (cursor) pagination.
+
+Instead of OFFSET, each page remembers the sort key of its last row and the
+next page asks for rows that sort after it. The database can then walk an
+index from that point, so page 50 costs the same as page 1.
+"""
+import base64
+import datetime
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+def is_partial(request):
+    """Whether a list view should return just the next page's cards"""
+    return request.GET.get('partial') == '1'
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, next_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by a fixed ordering such as ('-featured', '-created_at', '-id').
+
+    The ordering must end with a unique field and its columns must not be
+    NULL. Annotations (e.g. a search rank) can be part of the ordering.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.per_page = per_page
+
+    def page(self, cursor=None):
+        queryset = self.queryset
+        values = self.decode(cursor) if cursor else None
+        if values is not None:
+            queryset = queryset.filter(self._after(values))
+
+        rows = list(queryset[:self.per_page + 1])
+        next_cursor = None
+        if len(rows) > self.per_page:
+            rows = rows[:self.per_page]
+            next_cursor = self.encode(rows[-1])
+        return KeysetPage(rows, next_cursor)
+
+    def everything(self):
+        """Every row as a single page, for the static export"""
+        return KeysetPage(list(self.queryset), None)
+
+    def _after(self, values):
+        """
+        Rows sorting strictly after the given key, i.e. for (a, b, c):
+        a after | (a tie & b after) | (a tie & b tie & c after)
+        """
+        condition = Q()
+        for i, (name, descending) in enumerate(self.ordering):
+            ties = {field: value for (field, _), value in zip(self.ordering[:i], values)}
+            step = Q(**ties, **{f'{name}__{"lt" if descending else "gt"}': values[i]})
+            condition |= step
+        return condition
+
+    def encode(self, obj):
+        values = [_jsonable(getattr(obj, name)) for name, _ in self.ordering]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip('=')
+
+    def decode(self, cursor):
+        """Key values from a cursor, or None if it is malformed"""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(self.ordering):
+                return None
+            return [self._to_python(name, value) for (name, _), value in zip(self.ordering, values)]
+        except (ValueError, TypeError, ValidationError):
+            return None
+
+    def _to_python(self, name, value):
+        try:
+            field = self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations such as search_rank are plain numbers
+            if not isinstance(value, (int, float)):
+                raise ValueError(f'Invalid cursor value for {name}')
+            return value
+        return field.to_python(value)
+
+
+def _jsonable(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return value
@@ -0,0 +1,223 @@
+"""
+Precomputed related items for the detail pages.
+
+Each registered RelatedIndex scores pairs of rows by the features they share
+(technologies, category, skills... defined per app) plus how close they are in
+time, and stores the best few neighbours of every row in a link table
+(source, related, score). Detail pages then read them with one indexed query.
+
+Rows only need scoring against rows sharing at least one feature key, so an
+inverted index of keys keeps both the full rebuild and the incremental refresh
+after a change far below comparing every pair. A key shared by very many rows
+(a big category) only offers the CANDIDATES_PER_KEY rows closest in time,
+which are the ones recency would favour anyway.
+
+Refreshes run on the background workers, so two saves close together can
+refresh overlapping neighbourhoods at once. Each rebuild or refresh of an
+index holds its lock from reading the stored links to writing the new ones:
+a thread lock, plus a transaction-level advisory lock on PostgreSQL for the
+other worker processes.
+"""
+import bisect
+import heapq
+import threading
+import zlib
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.db import connections, transaction
+from django.db.models import Q
+
+from core.caching import purge
+from core.tasks import enqueue
+
+# Neighbours stored per row; the detail pages show fewer
+LIMIT = 6
+
+# Weight of the recency bonus next to the shared-feature similarity
+RECENCY_WEIGHT = 0.5
+
+# Rows nearest in time taken from each key's posting list
+CANDIDATES_PER_KEY = 200
+
+registry = []
+
+
+def register(index_class):
+    """Class decorator adding a RelatedIndex to the registry"""
+    index = index_class()
+    registry.append(index)
+    return index
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def recency(a, b):
+    """1.0 for the same day, falling off over a year or so"""
+    return 1 / (1 + abs((a - b).days) / 365)
+
+
+class RelatedIndex:
+    model = None
+    # Link model with source, related and score fields
+    link_model = None
+    # Cache tag (core.caching) of the pages showing the links
+    tag = None
+    limit = LIMIT
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def features(self, condition=Q()):
+        """{pk: features} for every row matching `condition` that may be shown; features include a 'date'"""
+        raise NotImplementedError
+
+    def keys(self, features):
+        """(kind, value) keys of one row; rows sharing none are unrelated"""
+        raise NotImplementedError
+
+    def sharing(self, keys):
+        """Condition matching the rows with any of `keys`, given as {kind: {values}}"""
+        raise NotImplementedError
+
+    def similarity(self, a, b):
+        """Score from shared features, 0 when unrelated"""
+        raise NotImplementedError
+
+    def score(self, a, b):
+        shared = self.similarity(a, b)
+        if not shared:
+            return 0.0
+        return round(shared + RECENCY_WEIGHT * recency(a['date'], b['date']), 6)
+
+    def _postings(self, features):
+        """{key: [(date ordinal, pk), ...]} sorted by date"""
+        postings = defaultdict(list)
+        for pk, row in features.items():
+            for key in self.keys(row):
+                postings[key].append((row['date'].toordinal(), pk))
+        for entries in postings.values():
+            entries.sort()
+        return postings
+
+    def _candidates(self, pk, features, postings):
+        position = (features[pk]['date'].toordinal(), pk)
+        half = CANDIDATES_PER_KEY // 2
+        found = set()
+        for key in self.keys(features[pk]):
+            entries = postings[key]
+            middle = bisect.bisect_left(entries, position)
+            start = max(0, min(middle - half, len(entries) - CANDIDATES_PER_KEY))
+            found.update(other for _, other in entries[start:start + CANDIDATES_PER_KEY + 1])
+        found.discard(pk)
+        return found
+
+    def _neighbours(self, pk, features, postings):
+        source = features[pk]
+        scored = (
+            (self.score(source, features[other]), other)
+            for other in self._candidates(pk, features, postings)
+        )
+        # Highest score first, older rows (lower pk) winning ties
+        best = heapq.nlargest(self.limit, scored, key=lambda item: (item[0], -item[1]))
+        return [
+            self.link_model(source_id=pk, related_id=other, score=score)
+            for score, other in best if score > 0
+        ]
+
+    def _links(self, sources, features, postings):
+        return [
+            link for pk in sources if pk in features
+            for link in self._neighbours(pk, features, postings)
+        ]
+
+    def _neighbourhood(self, pks):
+        """
+        Features of `pks` and of every row sharing a key with one of them:
+        their posting lists are then complete, so their candidates are the
+        same as over the whole table.
+        """
+        keys = defaultdict(set)
+        for row in self.features(Q(pk__in=pks)).values():
+            for kind, value in self.keys(row):
+                keys[kind].add(value)
+        return self.features(Q(pk__in=pks) | self.sharing(keys))
+
+    @contextmanager
+    def _exclusive(self):
+        """A transaction no other rebuild or refresh of this index runs alongside"""
+        using = self.link_model.objects.db
+        with self._lock, transaction.atomic(using=using):
+            connection = connections[using]
+            if connection.vendor == 'postgresql':
+                with connection.cursor() as cursor:
+                    key = zlib.crc32(self.link_model._meta.db_table.encode())
+                    cursor.execute('SELECT pg_advisory_xact_lock(%s)', [key])
+            yield
+
+    def _store(self, delete, links):
+        """Replace links inside _exclusive()"""
+        delete.delete()
+        self.link_model.objects.bulk_create(links, batch_size=1000)
+        transaction.on_commit(lambda: purge(self.tag), using=self.link_model.objects.db)
+
+    def rebuild(self):
+        """Recompute every neighbour list, returning the number of links stored"""
+        with self._exclusive():
+            features = self.features()
+            links = self._links(features, features, self._postings(features))
+            self._store(self.link_model.objects.all(), links)
+        return len(links)
+
+    def refresh(self, pks, sources=()):
+        """
+        Update the neighbour lists after some rows were saved, hidden or deleted.
+
+        The changed rows' own lists are recomputed, as is the list of every
+        row they were listed in (passed as `sources` when the rows are already
+        gone) or would now enter because they beat that list's weakest entry.
+        Only the rows sharing a key with those are loaded.
+        """
+        with self._exclusive():
+            features = self._neighbourhood(pks)
+            postings = self._postings(features)
+
+            links = self.link_model.objects.all()
+            affected = {*pks, *sources, *links.filter(related_id__in=pks).values_list('source_id', flat=True)}
+            for pk in pks:
+                if pk not in features:
+                    continue
+                stored = defaultdict(list)
+                candidates = self._candidates(pk, features, postings) - affected
+                for source_id, score in links.filter(source_id__in=candidates).values_list('source_id', 'score'):
+                    stored[source_id].append(score)
+                for other in candidates:
+                    scores = stored[other]
+                    if len(scores) < self.limit or self.score(features[other], features[pk]) > min(scores):
+                        affected.add(other)
+
+            features = self._neighbourhood(affected)
+            new_links = self._links(affected, features, self._postings(features))
+            self._store(links.filter(source_id__in=affected), new_links)
+        return affected
+
+
+def get_index(model_label):
+    model = apps.get_model(model_label)
+    return next(index for index in registry if index.model is model)
+
+
+def refresh_related(model_label, pks, sources=()):
+    get_index(model_label).refresh(pks, sources)
+
+
+def schedule_refresh(model, pks, sources=()):
+    """Refresh the neighbours of changed rows once the transaction commits"""
+    label = model._meta.label
+    pks = tuple(pks)
+    sources = tuple(sources)
+    if pks:
+        transaction.on_commit(lambda: enqueue(refresh_related, label, pks, sources))
@@ -0,0 +1,78 @@
+"""
+Responsive renditions for uploaded images.
+
+generate() writes each image at several widths in every modern format the
+installed Pillow can encode (AVIF, WebP) plus a JPEG fallback. Files are
+named after a hash of the source bytes, e.g. ``renditions/3f2a.../640.webp``,
+so re-processing unchanged content reuses the existing files. The returned
+manifest is stored next to the image (``<field>_renditions``) and read by the
+``responsive_image`` template tag without touching storage.
+"""
+import hashlib
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+
+RENDITION_WIDTHS = (320, 640, 960, 1280)
+
+# (format key, Pillow encoder, file extension, MIME type, encoder options)
+FORMATS = (
+    ('avif', 'AVIF', 'avif', 'image/avif', {'quality': 60}),
+    ('webp', 'WEBP', 'webp', 'image/webp', {'quality': 80, 'method': 4}),
+    ('jpeg', 'JPEG', 'jpg', 'image/jpeg', {'quality': 82, 'optimize': True, 'progressive': True}),
+)
+
+MIME_TYPES = {key: mime for key, _, _, mime, _ in FORMATS}
+
+
+def supported_formats():
+    """Rendition formats the installed Pillow build can encode"""
+    from PIL import features
+
+    formats = []
+    for key, encoder, extension, mime, options in FORMATS:
+        if key == 'jpeg' or features.check(key):
+            formats.append((key, encoder, extension, options))
+    return formats
+
+
+def renditions_field(field_name):
+    return f'{field_name}_renditions'
+
+
+def generate(image):
+    """Create (or reuse) every rendition of a stored image and return its manifest"""
+    from PIL import Image
+
+    with image.storage.open(image.name, 'rb') as stored:
+        data = stored.read()
+
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    with Image.open(BytesIO(data)) as source:
+        source.load()
+    if source.mode not in ('RGB', 'RGBA'):
+        source = source.convert('RGBA' if 'A' in source.getbands() else 'RGB')
+
+    widths = sorted({width for width in RENDITION_WIDTHS if width < source.width} | {source.width})
+    storage = image.storage
+    sources = {}
+    for key, encoder, extension, options in supported_formats():
+        frame = source.convert('RGB') if encoder == 'JPEG' else source
+        entries = []
+        for width in widths:
+            name = f'renditions/{digest}/{width}.{extension}'
+            if not storage.exists(name):
+                height = round(source.height * width / source.width)
+                resized = frame if width == source.width else frame.resize((width, height), Image.Resampling.LANCZOS)
+                output = BytesIO()
+                resized.save(output, format=encoder, **options)
+                name = storage.save(name, ContentFile(output.getvalue()))
+            entries.append([width, name])
+        sources[key] = entries
+
+    return {
+        'source': image.name,
+        'width': source.width,
+        'height': source.height,
+        'sources': sources,
+    }
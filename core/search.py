@@ -0,0 +1,182 @@
+"""
+Full-text search shared by the projects and certifications apps.
+
+Each searchable model registers a SearchIndex describing its weighted
+columns. On PostgreSQL the index is a ``search_vector`` tsvector column with a
+GIN index; on SQLite it is an FTS5 virtual table keyed by the row's primary
+key. Other backends fall back to ``icontains`` filtering. Both real backends
+return the queryset annotated with ``search_rank`` (higher is better) and
+``search_snippet`` (text with highlight markers, see the ``highlight`` filter).
+"""
+import re
+
+from django.contrib.postgres.search import SearchHeadline, SearchQuery, SearchRank, SearchVector
+from django.db import connections, router, transaction
+from django.db.models import F, FloatField, TextField, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Coalesce
+
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_STOP = '\x03'
+
+# bm25() column weights matching the PostgreSQL A-D weight classes
+WEIGHTS = {'A': 10.0, 'B': 5.0, 'C': 2.0, 'D': 1.0}
+
+registry = []
+
+
+def register(index_class):
+    """Class decorator adding a SearchIndex to the rebuild registry"""
+    index = index_class()
+    registry.append(index)
+    return index
+
+
+def search_terms(query):
+    """Split a user query into lowercase word tokens, dropping FTS operators"""
+    return re.findall(r'\w+', query.lower())
+
+
+class SearchIndex:
+    model = None
+    # Ordered (column, weight) pairs; weights are PostgreSQL classes A-D
+    columns = ()
+    # Column used for the highlighted snippet
+    snippet_field = 'description'
+
+    @property
+    def fts_table(self):
+        return f'{self.model._meta.db_table}_fts'
+
+    def get_queryset(self):
+        """Rows to index, with everything documents() needs preloaded"""
+        return self.model._default_manager.all()
+
+    def document(self, obj):
+        """Text for each column of one object, in columns order"""
+        raise NotImplementedError
+
+    def vector_expressions(self):
+        """SQL expressions for each column, used to build the tsvector in one UPDATE"""
+        raise NotImplementedError
+
+    def fallback_filter(self, query):
+        """Q object used on backends without full-text support"""
+        raise NotImplementedError
+
+    def _connection(self):
+        return connections[router.db_for_write(self.model)]
+
+    def _vendor(self):
+        return self._connection().vendor
+
+    def _search_vector(self):
+        vector = None
+        for expression, (column, weight) in zip(self.vector_expressions(), self.columns):
+            part = SearchVector(Coalesce(expression, Value('')), weight=weight, config='english')
+            vector = part if vector is None else vector + part
+        return vector
+
+    def update(self, obj):
+        """Re-index a single object after it changed"""
+        self.update_many(self.model._default_manager.filter(pk=obj.pk))
+
+    def update_many(self, queryset):
+        """Re-index every object in a queryset"""
+        vendor = self._vendor()
+        if vendor == 'postgresql':
+            queryset.update(search_vector=self._search_vector())
+        elif vendor == 'sqlite':
+            pks = list(queryset.values_list('pk', flat=True))
+            objects = self.get_queryset().filter(pk__in=pks)
+            with transaction.atomic(using=queryset.db), self._connection().cursor() as cursor:
+                cursor.executemany(
+                    f'DELETE FROM {self.fts_table} WHERE rowid = %s', [(pk,) for pk in pks]
+                )
+                self._insert(cursor, objects)
+
+    def remove(self, pk):
+        if self._vendor() == 'sqlite':
+            with self._connection().cursor() as cursor:
+                cursor.execute(f'DELETE FROM {self.fts_table} WHERE rowid = %s', [pk])
+
+    def rebuild(self):
+        """Rebuild the whole index in bulk, returning the number of rows indexed"""
+        vendor = self._vendor()
+        if vendor == 'postgresql':
+            return self.model._default_manager.update(search_vector=self._search_vector())
+        if vendor == 'sqlite':
+            connection = self._connection()
+            with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+                cursor.execute(f'DELETE FROM {self.fts_table}')
+                return self._insert(cursor, self.get_queryset())
+        return 0
+
+    def _insert(self, cursor, objects):
+        placeholders = ', '.join(['%s'] * (len(self.columns) + 1))
+        names = ', '.join(['rowid'] + [column for column, _ in self.columns])
+        rows = [[obj.pk, *self.document(obj)] for obj in objects.iterator(chunk_size=500)]
+        cursor.executemany(
+            f'INSERT INTO {self.fts_table} ({names}) VALUES ({placeholders})', rows
+        )
+        return len(rows)
+
+    def search(self, queryset, query):
+        """
+        Filter a queryset down to rows matching every term of the query (each
+        as a prefix), annotated with search_rank and search_snippet.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return self._no_results(queryset)
+
+        vendor = connections[queryset.db].vendor
+        if vendor == 'postgresql':
+            return self._search_postgresql(queryset, terms)
+        if vendor == 'sqlite':
+            return self._search_sqlite(queryset, terms)
+        return self._annotate_blank(queryset.filter(self.fallback_filter(query)))
+
+    def _annotate_blank(self, queryset):
+        return queryset.annotate(
+            search_rank=Value(0.0, output_field=FloatField()),
+            search_snippet=Value('', output_field=TextField()),
+        )
+
+    def _no_results(self, queryset):
+        # Keep the annotations so callers can still order by search_rank
+        return self._annotate_blank(queryset).none()
+
+    def _search_postgresql(self, queryset, terms):
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), search_type='raw', config='english')
+        return queryset.filter(search_vector=query).annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+            search_snippet=SearchHeadline(
+                self.snippet_field, query, config='english',
+                start_sel=HIGHLIGHT_START, stop_sel=HIGHLIGHT_STOP,
+                max_words=30, min_words=15,
+            ),
+        )
+
+    def _search_sqlite(self, queryset, terms):
+        match = ' '.join(f'"{term}"*' for term in terms)
+        weights = ', '.join(str(WEIGHTS[weight]) for _, weight in self.columns)
+        snippet_column = [column for column, _ in self.columns].index(self.snippet_field)
+        table = self.fts_table
+        meta = queryset.model._meta
+        quote = connections[queryset.db].ops.quote_name
+        # Joined rather than looked up beforehand, so the caller's filters,
+        # facets and pagination see every hit. bm25() and snippet() only work
+        # on the query holding the MATCH: keep the result the outer query
+        # (no GROUP BY, not nested as a subquery).
+        return queryset.extra(
+            tables=[table],
+            where=[f'{table}.rowid = {quote(meta.db_table)}.{quote(meta.pk.column)}', f'{table} MATCH %s'],
+            params=[match],
+        ).annotate(
+            search_rank=RawSQL(f'-bm25({table}, {weights})', [], output_field=FloatField()),
+            search_snippet=RawSQL(
+                f"snippet({table}, {snippet_column}, %s, %s, '…', 24)", [HIGHLIGHT_START, HIGHLIGHT_STOP],
+                output_field=TextField(),
+            ),
+        )
@@ -0,0 +1,61 @@
+import threading
+import time
+
+from django.core.cache import cache
+
+from core.models import Profile
+
+PROFILE_CACHE_KEY = 'core:profile:{version}'
+PROFILE_VERSION_KEY = 'core:profile:version'
+PROFILE_CACHE_TIMEOUT = 60 * 60 * 24
+
+_MISSING = object()
+
+# Process-local copy of the profile, tagged with the shared version it was loaded for
+_local_lock = threading.Lock()
+_local_profile = {'version': None, 'profile': None}
+
+
+def _current_version():
+    """Get the shared profile version, creating one if the cache is cold"""
+    version = cache.get(PROFILE_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        # add() keeps the first writer's version if several workers race here
+        if not cache.add(PROFILE_VERSION_KEY, version, None):
+            version = cache.get(PROFILE_VERSION_KEY, version)
+    return version
+
+
+def get_profile():
+    """
+    Return the site owner's profile (with its user) or None.
+
+    Lookups go through three tiers: a process-local copy, the shared cache and
+    finally the database. The shared version key lets every worker notice an
+    invalidation made by another process.
+    """
+    version = _current_version()
+
+    with _local_lock:
+        if _local_profile['version'] == version:
+            return _local_profile['profile']
+
+    key = PROFILE_CACHE_KEY.format(version=version)
+    profile = cache.get(key, _MISSING)
+    if profile is _MISSING:
+        profile = Profile.objects.select_related('user').first()
+        cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
+
+    with _local_lock:
+        _local_profile['version'] = version
+        _local_profile['profile'] = profile
+    return profile
+
+
+def invalidate_profile():
+    """Drop cached profile copies in this process and every other worker"""
+    cache.set(PROFILE_VERSION_KEY, time.time_ns(), None)
+    with _local_lock:
+        _local_profile['version'] = None
+        _local_profile['profile'] = None
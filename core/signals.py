@@ -0,0 +1,20 @@
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.caching import purge
+from core.models import Profile
+from core.services import invalidate_profile
+
+
+@receiver([post_save, post_delete], sender=Profile)
+@receiver([post_save, post_delete], sender=User)
+def profile_changed(sender, update_fields=None, **kwargs):
+    """Profile pages embed the owner's name, so user edits invalidate too"""
+    # Logging in only touches last_login, which no page displays
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    # After the commit, or another request could cache the old profile again
+    transaction.on_commit(invalidate_profile)
+    transaction.on_commit(lambda: purge('profile'))
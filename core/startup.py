@@ -0,0 +1,92 @@
+"""
+Cold-start profile of the web process, read from ``python -X importtime``.
+
+profile() imports the WSGI (or ASGI) application and the URLconf in a fresh
+interpreter, which is what a gunicorn worker does before its first request,
+and returns the time spent on every module. LAZY_MODULES must not appear
+there: each is needed by few requests or commands and is imported where it
+is used. Timings vary too much from one machine or run to the next for a
+unit test, so StartupTests holds boot to MODULE_BUDGET modules, which only
+changes with the code and its dependencies; the profile_startup command
+checks both budgets and prints the breakdown.
+"""
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+
+from django.conf import settings
+
+# Generous for a small VM: Django itself accounts for most of a cold start
+BUDGET_MS = 1000
+
+# Modules imported at boot, interpreter start-up included (624 on Python 3.11
+# with requirements.txt), with room for ordinary growth
+MODULE_BUDGET = 750
+
+LAZY_MODULES = (
+    'PIL',  # core.images and core.renditions, once an upload is processed
+    'prometheus_client',  # core.metrics, on the first observation
+    'django.contrib.postgres.aggregates',  # search indexing on PostgreSQL
+    'django.test',  # core.export and the benchmarks
+)
+
+BOOT = 'import {target}; from django.urls import get_resolver; get_resolver().url_patterns'
+
+
+@dataclass
+class Import:
+    module: str
+    depth: int
+    self_us: int
+    cumulative_us: int
+
+
+def parse(output):
+    imports = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports.append(Import(name.strip(), depth, int(self_us), int(cumulative_us)))
+    return imports
+
+
+def profile(target='porfolio.wsgi'):
+    """Every module imported while booting `target`, in import-completion order"""
+    env = {**os.environ, 'DJANGO_SETTINGS_MODULE': settings.SETTINGS_MODULE}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT.format(target=target)],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise RuntimeError(f'Importing {target} failed:\n{result.stderr[-2000:]}')
+    return parse(result.stderr)
+
+
+def total_ms(imports):
+    return sum(item.cumulative_us for item in imports if item.depth == 0) / 1000
+
+
+def eager_lazy_modules(imports):
+    """LAZY_MODULES (or their submodules) that were imported anyway"""
+    return sorted({
+        item.module for item in imports
+        if any(item.module == name or item.module.startswith(f'{name}.') for name in LAZY_MODULES)
+    })
+
+
+def importers(imports, module):
+    """The chain of modules that led to importing `module`, innermost first"""
+    for index, item in enumerate(imports):
+        if item.module != module:
+            continue
+        chain, depth = [item.module], item.depth
+        # importtime lists a module after everything it imported
+        for parent in imports[index + 1:]:
+            if parent.depth < depth:
+                chain.append(parent.module)
+                depth = parent.depth
+        return chain
+    return []
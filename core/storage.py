@@ -0,0 +1,142 @@
+"""
+Content-addressed storage for uploaded files.
+
+ContentHashedStorage (STORAGES['default']) names every upload after the
+sha256 of its bytes, keeping the upload_to directory and the extension:
+``profile/img.jpg`` is stored as ``profile/3f2a…9c.jpg``. Uploading bytes
+that are already stored returns the existing name instead of writing a
+copy, and since a name can never point at different bytes, media URLs are
+served as immutable (see core.views.media).
+
+Files are never deleted when a row stops referencing them, as another row
+may share them; the gc_media command removes files nothing references.
+"""
+import hashlib
+import os
+import re
+from datetime import timedelta
+
+from django.apps import apps
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import models
+from django.utils import timezone
+
+from core.renditions import renditions_field
+
+HASH_LENGTH = 32
+HASHED_NAME = re.compile(rf'(^|/)[0-9a-f]{{{HASH_LENGTH}}}\.[0-9a-z]+$')
+
+# Directories whose names are already derived from content (core.renditions)
+CONTENT_NAMED_PREFIXES = ('renditions/',)
+
+
+def content_hash(content):
+    # chunks() rewinds first, so the file can still be saved afterwards
+    sha = hashlib.sha256()
+    for chunk in content.chunks():
+        sha.update(chunk)
+    return sha.hexdigest()
+
+
+def is_hashed_name(name):
+    return bool(HASHED_NAME.search(name)) or name.startswith(CONTENT_NAMED_PREFIXES)
+
+
+class ContentHashedStorage(FileSystemStorage):
+
+    def hashed_name(self, name, content):
+        directory, basename = os.path.split(name)
+        extension = os.path.splitext(basename)[1].lower()
+        return os.path.join(directory, f'{content_hash(content)[:HASH_LENGTH]}{extension}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        if not name.startswith(CONTENT_NAMED_PREFIXES):
+            name = self.hashed_name(name, content)
+            if self.exists(name):
+                # Same name, same bytes: share the stored file
+                return name
+        return super().save(name, content, max_length)
+
+
+def file_fields():
+    """(model, field) for every FileField and ImageField in the project"""
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def _rendition_names(manifest):
+    for entries in (manifest or {}).get('sources', {}).values():
+        for _, name in entries:
+            yield name
+
+
+def referenced_names():
+    """Every stored name a row points at, renditions included"""
+    names = set()
+    for model, field in file_fields():
+        manifest_field = renditions_field(field.name)
+        has_renditions = any(f.name == manifest_field for f in model._meta.concrete_fields)
+        columns = [field.name] + ([manifest_field] if has_renditions else [])
+        for row in model._default_manager.exclude(**{field.name: ''}).values_list(*columns):
+            if row[0]:
+                names.add(row[0])
+            if has_renditions:
+                names.update(_rendition_names(row[1]))
+    return names
+
+
+def stored_names(storage, path=''):
+    if not path and not storage.exists(''):
+        # Nothing uploaded yet
+        return
+    directories, files = storage.listdir(path)
+    for name in files:
+        yield f'{path}/{name}' if path else name
+    for directory in directories:
+        yield from stored_names(storage, f'{path}/{directory}' if path else directory)
+
+
+def orphaned_names(storage, grace=60 * 60):
+    """
+    Stored files no row references. Files younger than `grace` seconds are
+    left alone: an upload is written before the row pointing at it is saved.
+    """
+    referenced = referenced_names()
+    cutoff = timezone.now() - timedelta(seconds=grace)
+    for name in stored_names(storage):
+        if name not in referenced and storage.get_modified_time(name) < cutoff:
+            yield name
+
+
+def rehash_files():
+    """
+    Move rows still pointing at pre-hash names onto content-hashed ones,
+    sharing identical files. Returns the number of rows updated; the old
+    files become orphans for gc_media.
+    """
+    updated = 0
+    for model, field in file_fields():
+        manifest_field = renditions_field(field.name)
+        has_renditions = any(f.name == manifest_field for f in model._meta.concrete_fields)
+        for instance in model._default_manager.exclude(**{field.name: ''}).exclude(**{f'{field.name}__isnull': True}):
+            stored = getattr(instance, field.name)
+            if is_hashed_name(stored.name) or not stored.storage.exists(stored.name):
+                continue
+            with stored.storage.open(stored.name, 'rb') as content:
+                name = stored.storage.save(stored.name, content)
+            update_fields = [field.name]
+            if has_renditions and (getattr(instance, manifest_field) or {}).get('source') == stored.name:
+                # The manifest describes the same bytes under the new name
+                getattr(instance, manifest_field)['source'] = name
+                update_fields.append(manifest_field)
+            stored.name = name
+            instance.save(update_fields=update_fields)
+            updated += 1
+    return updated
@@ -0,0 +1,56 @@
+"""
+Minimal background task runner.
+
+Work is handed to a small in-process thread pool so the request that
+triggered it can return immediately. Set BACKGROUND_TASKS = 'sync' to run
+tasks inline (useful in tests and management commands).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'BACKGROUND_WORKERS', 2),
+                thread_name_prefix='background',
+            )
+        return _executor
+
+
+def _run(func, args, kwargs):
+    close_old_connections()
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background task %s failed', func.__qualname__)
+    finally:
+        # Worker threads own their connection; don't leave it open between tasks
+        connection.close()
+
+
+def enqueue(func, *args, **kwargs):
+    """Run func(*args, **kwargs) off the request thread"""
+    if getattr(settings, 'BACKGROUND_TASKS', 'thread') == 'sync':
+        return func(*args, **kwargs)
+    return _get_executor().submit(_run, func, args, kwargs)
+
+
+def shutdown(wait=True):
+    """Stop the worker threads, by default after the queued tasks finish; the next enqueue() starts new ones"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
@@ -0,0 +1,112 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.html import escape, format_html, format_html_join
+from django.utils.safestring import mark_safe
+
+from core.caching import fragment_cache_key, record
+from core.renditions import MIME_TYPES, renditions_field
+from core.search import HIGHLIGHT_START, HIGHLIGHT_STOP
+
+register = template.Library()
+
+DEFAULT_SIZES = '100vw'
+
+
+@register.filter
+def highlight(snippet):
+    """Render a search snippet with its matched terms wrapped in <mark>"""
+    html = escape(snippet or '')
+    return mark_safe(html.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_STOP, '</mark>'))
+
+
+@register.filter(name='abs')
+def absolute(value):
+    """Absolute value of a number, e.g. days since a certification expired"""
+    try:
+        return abs(value)
+    except TypeError:
+        return value
+
+
+@register.simple_tag
+def responsive_image(obj, field_name, sizes=DEFAULT_SIZES, **attrs):
+    """
+    Render an image field as a <picture> with AVIF/WebP/JPEG srcsets and
+    explicit dimensions, using the renditions manifest stored on the object.
+
+    Usage: {% responsive_image project 'image' sizes='(min-width: 992px) 25vw, 100vw' alt=project.title class='project-image' %}
+
+    Falls back to a plain <img> while the renditions are still being built.
+    """
+    image = getattr(obj, field_name)
+    if not image:
+        return ''
+
+    attrs.setdefault('loading', 'lazy')
+    attrs.setdefault('decoding', 'async')
+    manifest = getattr(obj, renditions_field(field_name), None) or {}
+    if manifest.get('source') != image.name:
+        return format_html('<img src="{}"{}>', image.url, _attributes(attrs))
+
+    def srcset(entries):
+        return ', '.join(f'{image.storage.url(name)} {width}w' for width, name in entries)
+
+    sources = manifest['sources']
+    fallback = sources['jpeg']
+    source_tags = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        ((MIME_TYPES[key], srcset(entries), sizes) for key, entries in sources.items() if key != 'jpeg'),
+    )
+    return format_html(
+        '<picture class="responsive-picture">{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}"{}></picture>',
+        source_tags,
+        image.storage.url(fallback[-1][1]),
+        srcset(fallback),
+        sizes,
+        manifest['width'],
+        manifest['height'],
+        _attributes(attrs),
+    )
+
+
+def _attributes(attrs):
+    return format_html_join('', ' {}="{}"', sorted(attrs.items()))
+
+
+class CachedFragmentNode(template.Node):
+
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = fragment_cache_key(
+            self.name.resolve(context), [var.resolve(context) for var in self.vary_on]
+        )
+        content = cache.get(key)
+        record('fragment', hit=content is not None)
+        if content is None:
+            content = self.nodelist.render(context)
+            cache.set(key, content, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60 * 24))
+        return content
+
+
+@register.tag
+def cachedfragment(parser, token):
+    """
+    Cache the enclosed block, keyed by a name and the values it depends on.
+    Model instances contribute their pk and updated_at, so edits show up
+    without purging anything.
+
+    Usage: {% cachedfragment 'project_card' project project.search_snippet %}...{% endcachedfragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires at least a fragment name")
+    nodelist = parser.parse(('endcachedfragment',))
+    parser.delete_first_token()
+    return CachedFragmentNode(
+        nodelist, parser.compile_filter(bits[1]), [parser.compile_filter(bit) for bit in bits[2:]]
+    )
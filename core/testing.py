@@ -0,0 +1,50 @@
+"""Test runner for the project (settings.TEST_RUNNER)"""
+import logging
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner
+from django.test.signals import setting_changed
+
+from core import concurrency, nplusone
+
+STATIC_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+
+
+class TestRunner(DiscoverRunner):
+    """
+    The default runner, with N+1 queries failing the test that runs them,
+    background tasks run inline, inside the test's transaction, instead of on
+    pool threads racing it, no per-request log line in the output, and static
+    files found without running collectstatic first.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        # Like DEBUG, set for the run and put back afterwards
+        self._nplusone = settings.NPLUSONE
+        settings.NPLUSONE = nplusone.RAISE
+        self._background_tasks = settings.BACKGROUND_TASKS
+        settings.BACKGROUND_TASKS = 'sync'
+        request_logger = logging.getLogger('portfolio.requests')
+        self._request_log_level = request_logger.level
+        request_logger.setLevel(logging.WARNING)
+        # Tests do not run collectstatic, so there is no manifest of hashed names
+        self._storages = settings.STORAGES
+        self._set_storages({**self._storages, 'staticfiles': {'BACKEND': STATIC_STORAGE}})
+
+    def teardown_databases(self, old_config, **kwargs):
+        # The query workers' persistent connections would keep the test database open
+        concurrency.shutdown()
+        super().teardown_databases(old_config, **kwargs)
+
+    def teardown_test_environment(self, **kwargs):
+        settings.NPLUSONE = self._nplusone
+        settings.BACKGROUND_TASKS = self._background_tasks
+        logging.getLogger('portfolio.requests').setLevel(self._request_log_level)
+        self._set_storages(self._storages)
+        super().teardown_test_environment(**kwargs)
+
+    def _set_storages(self, storages):
+        settings.STORAGES = storages
+        # Drops the storages already built, as override_settings does
+        setting_changed.send(sender=type(self), setting='STORAGES', value=storages, enter=True)
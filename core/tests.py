@@ -1,3 +1,989 @@
-from django.test import TestCase
+import re
+import shutil
+import tempfile
+import threading
+import time
+import json
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser, User
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection, connections
+from django.template import Context, Template
+from asgiref.sync import async_to_sync
+from django.http import Http404, HttpResponse
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase, override_settings
+from django.urls import path, reverse
+from django.utils import timezone
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from certifications.models import Certification
+from certifications import views as certification_views
+from core import benchmark, factories, images, related, views as core_views
+from core import checks, concurrency, contact, metrics, nplusone, startup
+from core.concurrency import gather_queries
+from core.export import Exporter
+from core.instrumentation import ServerTimingMiddleware, measure
+from core.caching import cache_stats, record
+from core.models import ContactMessage, Profile
+from core.services import get_profile
+from core.storage import is_hashed_name
+from projects import views as project_views
+from projects.models import Project, ProjectCategory, Technology
+from projects.search import ProjectIndex
+
+
+class ProfileCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('owner', first_name='Ada', last_name='Lovelace')
+        self.profile = Profile.objects.create(user=self.user, title='Engineer')
+
+    def test_steady_state_does_no_profile_queries(self):
+        get_profile()
+        with self.assertNumQueries(0):
+            profile = get_profile()
+            self.assertEqual(profile.user.get_full_name(), 'Ada Lovelace')
+
+    def test_profile_save_invalidates(self):
+        get_profile()
+        self.profile.title = 'Architect'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.profile.save()
+            # Not before the commit, when other requests would reload the old row
+            self.assertEqual(get_profile().title, 'Engineer')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(get_profile().title, 'Architect')
+
+    def test_user_save_invalidates(self):
+        get_profile()
+        self.user.first_name = 'Grace'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        self.assertEqual(get_profile().user.first_name, 'Grace')
+
+    def test_profile_delete_invalidates(self):
+        get_profile()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.profile.delete()
+        self.assertIsNone(get_profile())
+
+    def test_about_page_reuses_cached_profile(self):
+        get_profile()
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:about'))
+        self.assertContains(response, 'Ada Lovelace')
+
+
+class PageCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = ProjectCategory.objects.create(name='Machine Learning')
+        self.project = Project.objects.create(
+            title='CrackVision', description='Crack detection', detailed_description='CNN',
+            category=self.category,
+        )
+        self.certification = Certification.objects.create(
+            title='Deep Learning', issuer='coursera', issue_date=date(2024, 1, 1),
+            credential_url='https://example.com', description='Neural networks',
+        )
+
+    def test_second_request_is_served_without_queries(self):
+        url = reverse('projects:project_list')
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertContains(response, 'CrackVision')
+        self.assertEqual(cache_stats('page')['hits'], 1)
+
+    def test_irrelevant_query_parameters_share_an_entry(self):
+        url = reverse('projects:project_list')
+        self.client.get(url, {'category': 'all', 'utm_source': 'x'})
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+        self.assertEqual(self.client.get(url, {'q': 'crack'})['X-Page-Cache'], 'MISS')
+
+    def test_saving_a_project_purges_only_project_pages(self):
+        projects_url = reverse('projects:project_list')
+        certifications_url = reverse('certifications:certification_list')
+        self.client.get(projects_url)
+        self.client.get(certifications_url)
+
+        self.project.title = 'CrackVision 2'
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.project.save()
+            # Until the commit other requests must not see (and cache) a purge
+            self.assertEqual(self.client.get(projects_url)['X-Page-Cache'], 'HIT')
+        for callback in callbacks:
+            callback()
+
+        response = self.client.get(projects_url)
+        self.assertEqual(response['X-Page-Cache'], 'MISS')
+        self.assertContains(response, 'CrackVision 2')
+        self.assertEqual(self.client.get(certifications_url)['X-Page-Cache'], 'HIT')
+
+    def test_cached_pages_do_not_outlive_the_day(self):
+        url = reverse('certifications:certification_list')
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)['X-Page-Cache'], 'HIT')
+        with mock.patch('core.caching.datetime') as clock:
+            clock.date.today.return_value = date(2099, 1, 1)
+            self.assertEqual(self.client.get(url)['X-Page-Cache'], 'MISS')
+
+    def test_authenticated_and_post_requests_bypass_the_cache(self):
+        url = reverse('core:about')
+        self.client.force_login(User.objects.create_user('staff'))
+        self.assertNotIn('X-Page-Cache', self.client.get(url))
+        self.assertNotIn('X-Page-Cache', self.client.post(reverse('core:contact'), {}))
+
+
+class InstrumentationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        factories.seed(projects=3)
+
+    def timing(self, response):
+        entries = {}
+        for entry in response['Server-Timing'].split(', '):
+            name, *params = entry.split(';')
+            entries[name] = dict(param.split('=', 1) for param in params)
+        return entries
+
+    def test_server_timing_reports_queries_templates_and_cache(self):
+        url = reverse('projects:project_list')
+        with self.assertLogs('portfolio.requests', 'INFO') as logs:
+            response = self.client.get(url)
+        timing = self.timing(response)
+        self.assertGreater(int(timing['db']['desc'].strip('"').split()[0]), 0)
+        self.assertGreater(float(timing['tpl']['dur']), 0)
+        self.assertGreaterEqual(float(timing['app']['dur']), float(timing['tpl']['dur']))
+        self.assertEqual(timing['cache-page']['desc'], '"0 hit 1 miss"')
+
+        record = logs.records[0]
+        self.assertEqual(record.data['view'], 'projects:project_list')
+        self.assertEqual(record.data['status'], 200)
+        self.assertEqual(record.data['queries'], int(timing['db']['desc'].strip('"').split()[0]))
+
+        timing = self.timing(self.client.get(url))
+        self.assertEqual(timing['db']['desc'], '"0 queries"')
+        self.assertEqual(timing['cache-page']['desc'], '"1 hit 0 miss"')
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_SAMPLE_RATE=1.0, PAGE_CACHE_ENABLED=False)
+    def test_slow_requests_are_logged_with_their_sql(self):
+        with self.assertLogs('portfolio.slow', 'WARNING') as logs:
+            self.client.get(reverse('projects:project_list'))
+        queries = logs.records[0].data['slowest_queries']
+        self.assertTrue(queries)
+        self.assertTrue(any('projects_project' in query['sql'] for query in queries))
+
+    def test_fragment_cache_counts_are_written_once_per_request(self):
+        template = Template(
+            '{% load portfolio_tags %}'
+            '{% for key in keys %}{% cachedfragment "stats" key %}{{ key }}{% endcachedfragment %}{% endfor %}'
+        )
+
+        def view(request):
+            template.render(Context({'keys': range(5)}))
+            template.render(Context({'keys': range(5)}))
+            self.assertEqual(cache_stats('fragment')['misses'], 0)
+            return HttpResponse()
+
+        with mock.patch.object(cache, 'incr', wraps=cache.incr) as incr:
+            ServerTimingMiddleware(view)(RequestFactory().get('/'))
+        stats = cache_stats('fragment')
+        self.assertEqual((stats['hits'], stats['misses']), (5, 5))
+        # One write per counter (plus a retry each when it did not exist yet)
+        self.assertLessEqual(incr.call_count, 4)
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'test_cache',
+    }})
+    def test_async_requests_write_cache_counts_off_the_event_loop(self):
+        call_command('createcachetable', verbosity=0)
+
+        async def view(request):
+            record('fragment', hit=False)
+            return HttpResponse()
+
+        response = async_to_sync(ServerTimingMiddleware(view))(RequestFactory().get('/'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(cache_stats('fragment')['misses'], 1)
+
+    @override_settings(SLOW_REQUEST_MS=0, SLOW_REQUEST_SAMPLE_RATE=0.0)
+    def test_slow_request_log_is_sampled(self):
+        with self.assertNoLogs('portfolio.slow', 'WARNING'):
+            self.client.get(reverse('core:about'))
+
+
+@override_settings(METRICS_TOKEN='scrape-token')
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_metrics_are_created_once_under_concurrent_first_use(self):
+        created = []
+
+        def create():
+            created.append(threading.get_ident())
+            time.sleep(0.01)
+            return object()
+
+        with mock.patch.object(metrics, '_registered', None), mock.patch.object(metrics, '_create', create):
+            threads = [threading.Thread(target=metrics._metrics) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(created), 1)
+
+    def test_endpoint_requires_the_token_or_a_staff_user(self):
+        url = reverse('metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer wrông').status_code, 403)
+        response = self.client.get(url, HTTP_AUTHORIZATION='Bearer scrape-token')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_an_empty_token_does_not_open_the_endpoint(self):
+        self.assertEqual(self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer ').status_code, 403)
+
+    def test_requests_are_counted_per_url_name(self):
+        before = self.sample('portfolio_http_requests_total', view='core:about', method='GET', status='200')
+        self.client.get(reverse('core:about'))
+        self.client.get('/no-such-page/')
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer scrape-token')
+        body = response.content.decode()
+        self.assertIn('portfolio_http_requests_total{method="GET",status="200",view="core:about"}', body)
+        self.assertIn('status="404",view="<unresolved>"', body)
+        self.assertIn('portfolio_http_request_duration_seconds_bucket{le="0.005",method="GET",view="core:about"}', body)
+        self.assertEqual(
+            self.sample('portfolio_http_requests_total', view='core:about', method='GET', status='200'),
+            before + 1,
+        )
+
+    def test_unknown_methods_share_one_label(self):
+        url = reverse('core:about')
+        status = self.client.generic('PROPFIND', url).status_code
+        labels = {'view': 'core:about', 'method': 'other', 'status': str(status)}
+        before = self.sample('portfolio_http_requests_total', **labels)
+        self.client.generic('BREW', url)
+        self.assertEqual(self.sample('portfolio_http_requests_total', **labels), before + 1)
+        self.assertIsNone(REGISTRY.get_sample_value('portfolio_http_requests_total', {**labels, 'method': 'BREW'}))
+
+    def test_contact_submissions_are_counted_by_outcome(self):
+        before = self.sample('portfolio_contact_submissions_total', status='accepted')
+        invalid = self.sample('portfolio_contact_submissions_total', status='invalid')
+        data = {'name': 'Ada', 'email': 'ada@example.com', 'subject': 'Hi', 'message': 'Hello there'}
+        self.client.post(reverse('core:contact'), data)
+        self.client.post(reverse('core:contact'), {})
+        self.assertEqual(self.sample('portfolio_contact_submissions_total', status='accepted'), before + 1)
+        self.assertEqual(self.sample('portfolio_contact_submissions_total', status='invalid'), invalid + 1)
+
+
+def category_walk(request):
+    """Looks up each project's category separately: a textbook N+1"""
+    template = Template('{% for project in projects %}{{ project.category.name }}{% endfor %}')
+    return HttpResponse(template.render(Context({'projects': Project.objects.all()})))
+
+
+urlpatterns = [path('walk/', category_walk)]
+
+
+@override_settings(ROOT_URLCONF='core.tests')
+class NPlusOneTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        for n in range(4):
+            category = ProjectCategory.objects.create(name=f'Category {n}')
+            Project.objects.create(title=f'Project {n}', description='d', detailed_description='d', category=category)
+
+    def test_query_shapes_ignore_parameters(self):
+        self.assertEqual(
+            nplusone.shape('SELECT * FROM t WHERE id IN (%s, %s, %s) LIMIT 21'),
+            nplusone.shape('SELECT * FROM t WHERE id IN (%s) LIMIT 1'),
+        )
+
+    def test_relation_walk_in_a_template_is_reported_with_its_line(self):
+        template = Template('{% for project in projects %}\n{{ project.category.name }}{% endfor %}')
+        with measure() as measured:
+            template.render(Context({'projects': Project.objects.all()}))
+        [(sql, count, site)] = measured.detector.repeated()
+        self.assertIn('projects_projectcategory', sql)
+        self.assertEqual(count, 4)
+        self.assertIn('line 2: {{ project.category.name }}', site['template'])
+
+    def test_repeated_queries_fail_the_request(self):
+        with self.assertRaises(nplusone.NPlusOneError) as raised:
+            self.client.get('/walk/')
+        self.assertIn('core/tests.py', str(raised.exception))
+
+    @override_settings(NPLUSONE='warn')
+    def test_warn_mode_logs_the_call_site(self):
+        with self.assertLogs('portfolio.nplusone', 'WARNING') as logs:
+            response = self.client.get('/walk/')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('in category_walk', logs.output[0])
+
+    @override_settings(NPLUSONE_ALLOW=[r'FROM "projects_projectcategory"'])
+    def test_allowed_queries_are_not_reported(self):
+        self.assertEqual(self.client.get('/walk/').status_code, 200)
+
+
+class StartupTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.imports = startup.profile()
+
+    def test_optional_modules_are_imported_lazily(self):
+        self.assertEqual(startup.eager_lazy_modules(self.imports), [])
+
+    def test_boot_is_within_the_module_budget(self):
+        self.assertLessEqual(len(self.imports), startup.MODULE_BUDGET)
+
+    def test_missing_database_password_is_a_check_error(self):
+        databases = {'default': {'ENGINE': 'django.db.backends.postgresql', 'PASSWORD': ''}}
+        self.assertEqual([error.id for error in checks.missing_database_passwords(databases)], ['core.E001'])
+        self.assertEqual(checks.database_password_check(None), [])
+
+    def test_several_workers_need_a_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        self.assertEqual([error.id for error in checks.process_local_caches(locmem, 4)], ['core.E002'])
+        self.assertEqual(checks.process_local_caches(locmem, 1), [])
+        self.assertEqual(checks.process_local_caches(redis, 4), [])
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ConditionalGetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        category = ProjectCategory.objects.create(name='Vision')
+        self.project = Project.objects.create(
+            title='CrackVision', description='d', detailed_description='d', category=category,
+        )
+        get_profile()
+
+    def test_matching_etag_is_answered_without_queries(self):
+        url = reverse('projects:project_detail', args=[self.project.slug])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('must-revalidate', response['Cache-Control'])
+        self.assertIn('public', response['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            revalidated = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated.content, b'')
+
+        with self.assertNumQueries(0):
+            revalidated = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_validators_follow_content_changes_and_filters(self):
+        url = reverse('projects:project_list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, {'utm_source': 'x'})['ETag'], etag)
+        self.assertNotEqual(self.client.get(url, {'q': 'crack'})['ETag'], etag)
+        # Certifications are not shown on the project list
+        with self.captureOnCommitCallbacks(execute=True):
+            Certification.objects.create(
+                title='AWS', issuer='aws', issue_date=date(2024, 1, 1), credential_url='https://example.com',
+                description='d',
+            )
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_date_dependent_pages_have_no_last_modified(self):
+        url = reverse('certifications:certification_list')
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertNotIn('Last-Modified', response)
+        # Only the ETag, which carries the date, can revalidate them
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 31 Dec 2099 00:00:00 GMT').status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_signed_in_visitors_get_private_pages(self):
+        self.client.force_login(User.objects.create_user('staff'))
+        response = self.client.get(reverse('core:about'))
+        self.assertNotIn('ETag', response)
+        self.assertIn('private', response['Cache-Control'])
+
+
+def make_image(size, fmt='PNG', name='upload.png'):
+    buffer = BytesIO()
+    Image.new('RGBA' if fmt == 'PNG' else 'RGB', size, 'navy').save(buffer, format=fmt)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{fmt.lower()}')
+
+
+@override_settings(CONTACT_RATE_LIMIT=3, CONTACT_NOTIFY_EMAIL='owner@example.com')
+class ContactTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse('core:contact')
+
+    def post(self, n=0, ip='10.0.0.1', forwarded=None, **overrides):
+        data = {
+            'name': 'Grace', 'email': f'grace{n}@example.com', 'subject': f'Hello {n}', 'message': 'Hi there',
+            **overrides,
+        }
+        if forwarded is not None:
+            return self.client.post(self.url, data, REMOTE_ADDR=ip, HTTP_X_FORWARDED_FOR=forwarded)
+        return self.client.post(self.url, data, REMOTE_ADDR=ip)
+
+    def test_message_is_stored_and_emailed(self):
+        response = self.post()
+        self.assertRedirects(response, self.url)
+        message = ContactMessage.objects.get()
+        self.assertEqual(message.ip_address, '10.0.0.1')
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['owner@example.com'])
+        self.assertEqual(mail.outbox[0].reply_to, ['grace0@example.com'])
+
+    def test_identical_resubmission_is_dropped(self):
+        self.post()
+        response = self.post(message='  HI   there ')
+        self.assertRedirects(response, self.url)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+
+        # Caught by the stored fingerprint when the cache has forgotten it
+        cache.clear()
+        self.post()
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_rate_limited_per_ip_and_email(self):
+        for n in range(3):
+            self.assertEqual(self.post(n).status_code, 302)
+        response = self.post(3)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+        self.assertEqual(ContactMessage.objects.count(), 3)
+
+        # Another address is fine, but not with an email that used its quota
+        self.assertEqual(self.post(4, ip='10.0.0.2').status_code, 302)
+        for n in range(2):
+            self.post(ip=f'10.0.1.{n}', subject=f'Again {n}')
+        self.assertEqual(self.post(ip='10.0.2.1', subject='Once more').status_code, 429)
+
+    def test_posts_refused_by_the_email_limit_do_not_count_against_the_ip(self):
+        for n in range(3):
+            self.post(ip=f'10.0.1.{n}', subject=f'Spread {n}')
+        for n in range(4):
+            self.assertEqual(self.post(subject=f'Refused {n}').status_code, 429)
+        self.assertEqual(self.post(1).status_code, 302)
+
+    def test_failed_delivery_can_be_resubmitted(self):
+        data = {'name': 'Grace', 'email': 'grace@example.com', 'subject': 'Hello', 'message': 'Hi'}
+        with mock.patch.object(ContactMessage.objects, 'create', side_effect=DatabaseError):
+            with self.assertRaises(DatabaseError):
+                contact.submit(data, '10.0.0.1')
+        self.assertEqual(contact.submit(data, '10.0.0.1').status, contact.ACCEPTED)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_sliding_window_weights_the_previous_window(self):
+        window = 100
+        with mock.patch('core.contact.time.time', return_value=1050.0):
+            for _ in range(3):
+                self.assertTrue(contact.hit('test', 'a', 3, window)[0])
+            self.assertEqual(contact.hit('test', 'a', 3, window), (False, 50))
+        # Early in the next window most of the previous count still applies
+        with mock.patch('core.contact.time.time', return_value=1110.0):
+            self.assertFalse(contact.hit('test', 'a', 3, window)[0])
+        # Later on it has mostly slid out: 3 * 0.3 + 1 <= 3
+        with mock.patch('core.contact.time.time', return_value=1170.0):
+            self.assertTrue(contact.hit('test', 'a', 3, window)[0])
+
+    def test_client_ip_behind_proxy(self):
+        request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR='1.1.1.1, 2.2.2.2', REMOTE_ADDR='10.0.0.9')
+        self.assertEqual(contact.client_ip(request), '10.0.0.9')
+        with override_settings(CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR'):
+            self.assertEqual(contact.client_ip(request), '2.2.2.2')
+        with override_settings(CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR', CLIENT_IP_PROXIES=2):
+            self.assertEqual(contact.client_ip(request), '1.1.1.1')
+
+    @override_settings(CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_spoofed_forwarded_hops_share_the_proxy_limit(self):
+        # Whatever the client writes in front of the proxy's hop, and however
+        # that address is spelled, it is one client
+        spellings = ['2001:db8::7', '2001:DB8::7', '2001:db8:0::7', '2001:0db8::0:7']
+        for n, address in enumerate(spellings[:3]):
+            self.assertEqual(self.post(n, forwarded=f'10.9.9.{n}, {address}').status_code, 302)
+        self.assertEqual(self.post(3, forwarded=f'10.9.9.3,{spellings[3]}').status_code, 429)
+        self.assertEqual(set(ContactMessage.objects.values_list('ip_address', flat=True)), {'2001:db8::7'})
+
+    @override_settings(CLIENT_IP_HEADER='HTTP_X_FORWARDED_FOR')
+    def test_malformed_forwarded_header_falls_back_to_the_peer(self):
+        for header in ('not-an-ip', '', '203.0.113.7, <script>', '999.1.1.1'):
+            request = RequestFactory().get('/', HTTP_X_FORWARDED_FOR=header, REMOTE_ADDR='10.0.0.9')
+            self.assertEqual(contact.client_ip(request), '10.0.0.9')
+
+        self.assertEqual(self.post(ip='10.0.0.9', forwarded='unknown').status_code, 302)
+        self.assertEqual(ContactMessage.objects.get().ip_address, '10.0.0.9')
+
+
+class StaticExportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        factories.seed(projects=8)
+        self.output = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.output)
+
+    def export(self, **kwargs):
+        return Exporter(self.output, 'https://example.com', workers=1, **kwargs).run()
+
+    def test_export_writes_pages_and_manifest(self):
+        stats = self.export()
+        self.assertEqual(stats['rendered'], stats['pages'])
+
+        project = Project.objects.filter(published=True).first()
+        self.assertTrue((self.output / 'index.html').exists())
+        self.assertIn(project.title, (self.output / f'projects/{project.slug}/index.html').read_text())
+        self.assertFalse((self.output / 'contact/index.html').exists())
+
+        data = json.loads((self.output / 'api/v1/projects/index.json').read_text())
+        self.assertTrue(data['results'][0]['url'].startswith('https://example.com/'))
+
+        manifest = json.loads((self.output / 'manifest.json').read_text())
+        self.assertIn(reverse('projects:project_detail', args=[project.slug]), manifest['pages'])
+
+    def test_incremental_export_only_renders_changed_pages(self):
+        first = self.export()
+        self.assertEqual(self.export()['rendered'], 0)
+
+        project = Project.objects.filter(published=True).last()
+        project.title = 'Renamed project'
+        project.save()
+        second = self.export()
+        self.assertGreater(second['rendered'], 0)
+        self.assertLess(second['rendered'], first['pages'])
+        self.assertIn('Renamed project', (self.output / f'projects/{project.slug}/index.html').read_text())
+
+        Project.objects.filter(pk=project.pk).update(published=False)
+        third = self.export()
+        self.assertFalse((self.output / f'projects/{project.slug}/index.html').exists())
+        self.assertLess(third['pages'], first['pages'])
+
+        self.assertEqual(self.export(full=True)['rendered'], third['pages'])
+
+    def test_list_pages_hold_every_row_without_filters(self):
+        factories.create_projects(22, list(ProjectCategory.objects.all()), list(Technology.objects.all()), gallery=0)
+        with self.assertNoLogs('portfolio.requests', 'INFO'):
+            self.export()
+
+        page = (self.output / 'projects/index.html').read_text()
+        for title in Project.objects.filter(published=True).values_list('title', flat=True):
+            self.assertIn(title, page)
+        self.assertNotIn('cursor=', page)
+        self.assertNotIn('technology=', page)
+        self.assertFalse(list(self.output.glob('projects/*=*')))
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class AsyncViewTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        factories.seed(projects=8)
+        for index in related.registry:
+            index.rebuild()
+        self.factory = RequestFactory()
+        self.project = Project.objects.filter(published=True).first()
+        self.certification = Certification.objects.filter(is_active=True).first()
+
+    def render_both(self, sync_view, async_view, url, *args):
+        request = self.factory.get(url)
+        request.user = AnonymousUser()
+        expected = sync_view(request, *args)
+        response = async_to_sync(async_view)(request, *args)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, expected.content)
+        self.assertEqual(response['ETag'], expected['ETag'])
+
+    def test_async_views_render_like_the_sync_views(self):
+        self.render_both(core_views.home, core_views.ahome, '/')
+        self.render_both(core_views.about, core_views.aabout, '/about/')
+        self.render_both(project_views.project_list, project_views.aproject_list, '/projects/?technology=Technology+1')
+        self.render_both(project_views.project_list, project_views.aproject_list, '/projects/?partial=1')
+        self.render_both(project_views.project_detail, project_views.aproject_detail, '/p/', self.project.slug)
+        self.render_both(
+            certification_views.certification_list, certification_views.acertification_list,
+            '/certifications/?q=vision',
+        )
+        self.render_both(
+            certification_views.certification_detail, certification_views.acertification_detail,
+            '/c/', self.certification.slug,
+        )
+
+    def test_missing_object_raises_404(self):
+        request = self.factory.get('/p/')
+        request.user = AnonymousUser()
+        with self.assertRaises(Http404):
+            async_to_sync(project_views.aproject_detail)(request, 'missing')
+
+
+class ConcurrentQueryTests(TransactionTestCase):
+
+    def test_loaders_run_concurrently_outside_transactions(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def loader(name):
+            def load():
+                # Only returns if the other loader is running at the same time
+                barrier.wait()
+                return name, threading.get_ident()
+            return load
+
+        context = async_to_sync(gather_queries)({'a': loader('a'), 'b': loader('b')})
+        self.assertEqual([value[0] for value in context.values()], ['a', 'b'])
+        self.assertNotEqual(context['a'][1], context['b'][1])
+
+    def test_loaders_query_on_their_own_connections(self):
+        ProjectCategory.objects.create(name='Vision')
+        context = async_to_sync(gather_queries)({
+            'categories': lambda: list(ProjectCategory.objects.values_list('name', flat=True)),
+            'projects': lambda: Project.objects.count(),
+        })
+        self.assertEqual(context, {'categories': ['Vision'], 'projects': 0})
+
+    @override_settings(ASYNC_QUERY_WORKERS=2)
+    def test_worker_connections_persist_until_they_age_out(self):
+        # A pool of exactly two fresh threads, both used by every gather
+        concurrency.shutdown()
+        self.addCleanup(concurrency.shutdown)
+        barrier = threading.Barrier(2, timeout=5)
+
+        def loader():
+            barrier.wait()
+            Project.objects.count()
+            return connections['default']
+
+        loaders = {'a': loader, 'b': loader}
+        wrapper = type(connections['default'])
+        # Persistent connections, kept between requests
+        with mock.patch.dict(connections.settings['default'], CONN_MAX_AGE=600):
+            with mock.patch.object(wrapper, 'close', autospec=True) as close:
+                first = async_to_sync(gather_queries)(loaders)
+                second = async_to_sync(gather_queries)(loaders)
+                self.assertEqual(set(first.values()), set(second.values()))
+                self.assertFalse(close.called)
+
+                for worker in first.values():
+                    worker.close_at = 0
+                async_to_sync(gather_queries)(loaders)
+        self.assertEqual({call.args[0] for call in close.call_args_list}, set(first.values()))
+
+
+class ImagePipelineTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.category = ProjectCategory.objects.create(name='Vision')
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root, ignore_errors=True)
+
+    def create_project(self, image):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Project.objects.create(
+                title='CrackVision', description='d', detailed_description='d',
+                category=self.category, image=image,
+            )
+
+    def test_new_upload_is_resized_after_commit(self):
+        labels = {'model': 'projects.Project', 'field': 'image', 'status': images.STATUS_DONE}
+        processed = REGISTRY.get_sample_value('portfolio_image_processing_seconds_count', labels) or 0
+        project = self.create_project(make_image((1600, 900)))
+        project.refresh_from_db()
+        self.assertEqual(project.image_status, images.STATUS_DONE)
+        self.assertEqual(REGISTRY.get_sample_value('portfolio_image_processing_seconds_count', labels), processed + 1)
+        self.assertTrue(project.image.name.endswith('.jpg'))
+        with Image.open(project.image.path) as img:
+            self.assertEqual((img.format, img.size), ('JPEG', (800, 450)))
+        # The original may be shared, so it waits for gc_media
+        self.assertEqual(len(list((Path(self.media_root) / 'projects/main').iterdir())), 2)
+        call_command('gc_media', grace=0, stdout=StringIO())
+        self.assertEqual(list((Path(self.media_root) / 'projects/main').iterdir()), [Path(project.image.path)])
+        self.assertTrue(all(project.image.storage.exists(name) for _, name in project.image_renditions['sources']['jpeg']))
+
+    def test_renditions_are_built_and_rendered(self):
+        project = self.create_project(make_image((1600, 900)))
+        project.refresh_from_db()
+        manifest = project.image_renditions
+        self.assertEqual((manifest['width'], manifest['height']), (800, 450))
+        self.assertEqual([width for width, _ in manifest['sources']['webp']], [320, 640, 800])
+        for entries in manifest['sources'].values():
+            for _, name in entries:
+                self.assertTrue(project.image.storage.exists(name))
+
+        html = Template(
+            "{% load portfolio_tags %}{% responsive_image project 'image' sizes='50vw' alt='Crack' %}"
+        ).render(Context({'project': project}))
+        self.assertIn('type="image/webp"', html)
+        self.assertIn('320w', html)
+        self.assertIn('width="800" height="450"', html)
+        self.assertIn('alt="Crack"', html)
+
+    def test_renditions_are_shared_by_identical_uploads(self):
+        first = self.create_project(make_image((700, 500)))
+        second = Project.objects.create(
+            title='Copy', description='d', detailed_description='d', category=self.category,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image = make_image((700, 500))
+            second.save()
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.image_renditions['sources'], second.image_renditions['sources'])
+
+    def test_processing_is_idempotent(self):
+        project = self.create_project(make_image((300, 200)))
+        project.refresh_from_db()
+        self.assertEqual(project.image_status, images.STATUS_DONE)
+        self.assertTrue(project.image.name.endswith('.png'))
+        self.assertIsNone(images.process_image('projects.Project', project.pk, 'image', (800, 600)))
+
+    def test_saving_without_a_new_upload_does_not_reprocess(self):
+        project = self.create_project(make_image((300, 200)))
+        project.refresh_from_db()
+        with mock.patch('core.images.enqueue') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                project.title = 'Renamed'
+                project.save()
+        enqueue.assert_not_called()
+
+    def test_broken_upload_is_marked_failed(self):
+        broken = SimpleUploadedFile('broken.png', b'not an image', content_type='image/png')
+        with self.assertLogs('core.images', 'ERROR'):
+            project = self.create_project(broken)
+        project.refresh_from_db()
+        self.assertEqual(project.image_status, images.STATUS_FAILED)
+
+    def test_upload_replaced_during_processing_is_kept(self):
+        resize = images._resize
+
+        def replaced_meanwhile(image, max_size):
+            Project.objects.filter(image=image.name).update(image='projects/main/new.png', image_status='pending')
+            return resize(image, max_size)
+
+        with mock.patch('core.images._resize', side_effect=replaced_meanwhile):
+            project = self.create_project(make_image((1600, 900)))
+        project.refresh_from_db()
+        self.assertEqual((project.image.name, project.image_status), ('projects/main/new.png', 'pending'))
+        self.assertEqual(project.image_renditions, {})
+
+    def test_abandoned_processing_is_claimed_again(self):
+        with mock.patch('core.images.enqueue'):
+            project = self.create_project(make_image((1600, 900)))
+        started = timezone.now() - timedelta(seconds=images.PROCESSING_TIMEOUT - 60)
+        Project.objects.filter(pk=project.pk).update(image_status='processing', image_claimed_at=started)
+        call_command('process_images', stdout=StringIO())
+        project.refresh_from_db()
+        self.assertEqual(project.image_status, images.STATUS_PROCESSING)
+
+        Project.objects.filter(pk=project.pk).update(image_claimed_at=started - timedelta(seconds=120))
+        call_command('process_images', stdout=StringIO())
+        project.refresh_from_db()
+        self.assertEqual(project.image_status, images.STATUS_DONE)
+
+
+class MediaStorageTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.addCleanup(self.settings_override.disable)
+
+    def write_legacy(self, name, content):
+        path = Path(self.media_root) / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return name
+
+    def create_certification(self, slug, image):
+        return Certification.objects.create(
+            title=slug, slug=slug, issuer='aws', level='associate', issue_date=date(2024, 1, 1), image=image,
+        )
+
+    def test_identical_uploads_share_one_file(self):
+        first = default_storage.save('resume/cv.pdf', SimpleUploadedFile('cv.pdf', b'%PDF same'))
+        second = default_storage.save('resume/cv.pdf', SimpleUploadedFile('copy.PDF', b'%PDF same'))
+        other = default_storage.save('resume/cv.pdf', SimpleUploadedFile('cv.pdf', b'%PDF other'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(is_hashed_name(first))
+        self.assertTrue(first.startswith('resume/') and first.endswith('.pdf'))
+        self.assertEqual(len(list((Path(self.media_root) / 'resume').iterdir())), 2)
+
+    def test_hashed_files_are_served_as_immutable(self):
+        name = default_storage.save('resume/cv.pdf', SimpleUploadedFile('cv.pdf', b'%PDF'))
+        self.write_legacy('resume/old.pdf', b'%PDF')
+
+        response = self.client.get(f'/media/{name}')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+        self.assertIn('no-cache', self.client.get('/media/resume/old.pdf')['Cache-Control'])
+        self.assertEqual(self.client.get('/media/resume/missing.pdf').status_code, 404)
+
+    def test_gc_removes_only_old_unreferenced_files(self):
+        kept = default_storage.save('certifications/a.png', SimpleUploadedFile('a.png', b'kept'))
+        self.create_certification('kept', kept)
+        orphan = default_storage.save('certifications/b.png', SimpleUploadedFile('b.png', b'orphan'))
+
+        call_command('gc_media', stdout=StringIO())
+        self.assertTrue(default_storage.exists(orphan))
+
+        out = StringIO()
+        call_command('gc_media', grace=0, dry_run=True, stdout=out)
+        self.assertIn(orphan, out.getvalue())
+        self.assertTrue(default_storage.exists(orphan))
+
+        call_command('gc_media', grace=0, stdout=StringIO())
+        self.assertFalse(default_storage.exists(orphan))
+        self.assertTrue(default_storage.exists(kept))
+
+    def test_rehash_merges_legacy_duplicates(self):
+        first = self.create_certification('first', self.write_legacy('certifications/img.png', b'same bytes'))
+        second = self.create_certification('second', self.write_legacy('certifications/img_x1.png', b'same bytes'))
+
+        call_command('gc_media', rehash=True, grace=0, stdout=StringIO())
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertTrue(is_hashed_name(first.image.name))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(
+            [path.name for path in (Path(self.media_root) / 'certifications').iterdir()],
+            [Path(first.image.name).name],
+        )
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class QueryPlanTests(TestCase):
+    """Every query behind the public views should be answered from an index"""
+
+    @classmethod
+    def setUpTestData(cls):
+        categories = factories.create_categories(8)
+        technologies = factories.create_technologies(20)
+        factories.create_projects(1000, categories, technologies, per_project=4, gallery=1)
+        factories.create_certifications(300)
+        ProjectIndex.rebuild()
+        for index in related.registry:
+            index.rebuild()
+
+    def capture(self, url):
+        queries = []
+
+        def wrapper(execute, sql, params, many, context):
+            queries.append((sql, params))
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(wrapper):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return queries
+
+    def full_scans(self, sql, params):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET LOCAL enable_seqscan = off')
+                cursor.execute('EXPLAIN ' + sql, params)
+                return [row[0] for row in cursor.fetchall() if 'Seq Scan on' in row[0]]
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+            # "SCAN <table>" without "USING ..." reads the whole table; subquery
+            # co-routines are scanned the same way but are not tables
+            tables = set(connection.introspection.table_names(cursor))
+            return [
+                row[3] for row in cursor.fetchall()
+                if re.fullmatch(r'SCAN (\w+)', row[3]) and row[3].split()[1] in tables
+            ]
+
+    def test_public_views_do_not_scan_tables(self):
+        get_profile()
+        urls = [
+            reverse('core:home'),
+            reverse('projects:project_list'),
+            reverse('projects:project_list') + '?category=category-1',
+            reverse('projects:project_list') + '?q=vision',
+            reverse('projects:project_list') + '?technology=Technology+1&technology=Technology+2&status=completed',
+            reverse('projects:project_detail', args=['project-1']),
+            reverse('certifications:certification_list'),
+            reverse('certifications:certification_list') + '?issuer=aws&level=expert',
+            reverse('certifications:certification_list') + '?skill=pytorch',
+            reverse('certifications:certification_list') + '?skill=pytorch&skill=sql&validity=valid',
+            reverse('certifications:certification_detail', args=['certification-1']),
+            reverse('api:project_list'),
+            reverse('api:project_list') + '?category=category-1',
+            reverse('api:certification_list'),
+            reverse('api:category_list'),
+        ]
+        for url in urls:
+            for sql, params in self.capture(url):
+                with self.subTest(url=url, sql=sql[:80]):
+                    self.assertEqual(self.full_scans(sql, params), [])
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class BenchmarkTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def test_every_public_route_is_benchmarked(self):
+        factories.seed(projects=10)
+        labels = set(benchmark.public_urls())
+        self.assertTrue(set(benchmark.route_names()) <= labels)
+        self.assertFalse(any(label.startswith('admin') for label in labels))
+
+    def test_query_counts_match_the_baseline(self):
+        factories.seed(projects=10)
+        baseline = json.loads((Path(__file__).parent.parent / 'benchmarks/baseline.json').read_text())
+        budgets = baseline['projects=10,certifications=2']
+        client = Client()
+        for label, url in benchmark.public_urls().items():
+            with self.subTest(url=url):
+                result = benchmark.measure(client, url, repeat=1)
+                self.assertLessEqual(result['queries'], budgets[label]['queries'])
+
+    def test_compare_reports_regressions(self):
+        budget = {'/': {'queries': 3, 'p50_ms': 5.0, 'p95_ms': 10.0, 'bytes': 1000}}
+        within = {'queries': 3, 'p50_ms': 6.0, 'p95_ms': 12.0, 'bytes': 1050}
+        self.assertEqual(benchmark.compare({'/': within}, budget), [])
+        regressions = benchmark.compare(
+            {'/': {'queries': 4, 'p50_ms': 20.0, 'p95_ms': 40.0, 'bytes': 2000}}, budget
+        )
+        self.assertEqual(len(regressions), 4)
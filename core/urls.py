@@ -1,10 +1,12 @@
+from django.conf import settings
 from django.urls import path
 from core import views
 
 app_name = 'core'
 
+# Public pages use their async views when served over ASGI (see settings.ASYNC_VIEWS)
 urlpatterns = [
-    path('', views.home, name='home'),
-    path('about/', views.about, name='about'),
+    path('', views.ahome if settings.ASYNC_VIEWS else views.home, name='home'),
+    path('about/', views.aabout if settings.ASYNC_VIEWS else views.about, name='about'),
     path('contact/', views.contact, name='contact'),
 ]
\ No newline at end of file
@@ -1,54 +1,72 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.shortcuts import render, redirect
 from django.contrib import messages
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
 from core.forms import ContactForm
 from projects.models import Project
-from certifications.models import Certification
-from core.models import Profile
+from core.services import get_profile
+from core.storage import is_hashed_name
+from core.caching import cache_public_page
+from core.concurrency import arender, gather_queries, load_queries
+from core.contact import LIMITED, client_ip, submit
+from core.metrics import count_contact, exposition
+
+def home_queries():
+    """The home page's independent queries"""
+    return {
+        'profile': get_profile,
+        # Top 6 featured and published projects
+        'featured_projects': lambda: list(
+            Project.objects.filter(featured=True, published=True).for_cards()[:6]
+        ),
+    }
 
+@cache_public_page('profile', 'projects')
 def home(request):
     """Home page view"""
-    try:
-        profile = Profile.objects.first()
-    except Profile.DoesNotExist:
-        profile = None
-    
-    # Get top 6 featured and published projects ordered by published date
-    featured_projects = Project.objects.filter(featured=True, published=True).select_related('category')[:6] 
-    
-    # Get top 3 featured and active certifications ordered by issue date
-    certifications = Certification.objects.filter(featured=True, is_active=True).order_by('-issue_date')[:3]
-    
-    context = {
-        'profile': profile,
-        'featured_projects': featured_projects,
-        'certifications': certifications,
-    }
-    return render(request, 'core/home.html', context)
+    return render(request, 'core/home.html', load_queries(home_queries()))
+
+@cache_public_page('profile', 'projects')
+async def ahome(request):
+    """Home page view for the ASGI server, running its queries concurrently"""
+    return await arender(request, 'core/home.html', await gather_queries(home_queries()))
 
+@cache_public_page('profile')
 def about(request):
     """About page view"""
-    try:
-        profile = Profile.objects.first()
-    except Profile.DoesNotExist:
-        profile = None
+    profile = get_profile()
     
     context = {'profile': profile}
     return render(request, 'core/about.html', context)
 
+@cache_public_page('profile')
+async def aabout(request):
+    """About page view for the ASGI server"""
+    return await arender(request, 'core/about.html', await gather_queries({'profile': get_profile}))
+
 def contact(request):
     """Contact page view"""
-    try:
-        profile = Profile.objects.first()
-    except Profile.DoesNotExist:
-        profile = None
+    profile = get_profile()
+    status = 200
         
     if request.method == 'POST':
         form = ContactForm(request.POST)
         if form.is_valid():
-            form.save()
-            messages.success(request, 'Your message has been sent successfully!')
-            return redirect('core:contact')
+            # Stored and emailed in the background (see core.contact)
+            result = submit(form.cleaned_data, client_ip(request))
+            if result.status == LIMITED:
+                messages.error(request, 'Too many messages sent. Please try again later.')
+                status = 429
+            else:
+                # A duplicate was already received; confirm it the same way
+                messages.success(request, 'Your message has been sent successfully!')
+                return redirect('core:contact')
         else:
+            count_contact('invalid')
             messages.error(request, 'Please correct the errors below.')
     else:
         form = ContactForm()
@@ -57,4 +75,37 @@ def contact(request):
         'form': form,
         'profile': profile
     }
-    return render(request, 'core/contact.html', context)
\ No newline at end of file
+    response = render(request, 'core/contact.html', context, status=status)
+    if status == 429:
+        response['Retry-After'] = str(result.retry_after)
+    return response
+
+# A content-hashed name never changes meaning (see core.storage)
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+def media(request, path):
+    """
+    Uploaded files, served by the app (also with DEBUG off). Browsers and
+    CDNs may keep content-hashed files for a year without revalidating;
+    files stored under older names are revalidated on every use.
+    """
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    if is_hashed_name(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+def metrics(request):
+    """
+    Prometheus metrics (core.metrics), for staff users or a scraper sending
+    `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+    if not (request.user.is_staff or (token and hmac.compare_digest(supplied.encode(), token.encode()))):
+        return HttpResponseForbidden()
+    body, content_type = exposition()
+    response = HttpResponse(body, content_type=content_type)
+    patch_cache_control(response, private=True, no_store=True)
+    return response
@@ -0,0 +1,47 @@
+"""
+Gunicorn settings for the two deployment profiles, picked by WEB_SERVER:
+
+    wsgi (default)  sync workers serving porfolio.wsgi
+    asgi            uvicorn workers serving porfolio.asgi; the public pages
+                    then use their async views (settings.ASYNC_VIEWS)
+
+Worker count and bind address keep gunicorn's defaults (WEB_CONCURRENCY,
+PORT). Compare the two with `python manage.py loadtest --server both`.
+
+The application is imported once in the master and forked into each
+worker (preload_app), so booting or recycling a worker costs no imports;
+code changes need a restart rather than a HUP. `manage.py profile_startup`
+shows what that import costs.
+
+Workers write their Prometheus samples to PROMETHEUS_MULTIPROC_DIR so
+/metrics reports all of them (core.metrics). The directory is emptied when
+gunicorn starts; give each server on a host its own.
+"""
+import os
+import shutil
+import tempfile
+
+if os.environ.get('WEB_SERVER', 'wsgi') == 'asgi':
+    wsgi_app = 'porfolio.asgi:application'
+    worker_class = 'uvicorn_worker.UvicornWorker'
+else:
+    wsgi_app = 'porfolio.wsgi:application'
+
+preload_app = True
+
+# Set before the workers import prometheus_client, which reads it on import
+metrics_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'portfolio-metrics'),
+)
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to this one's
+    shutil.rmtree(metrics_dir, ignore_errors=True)
+    os.makedirs(metrics_dir)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
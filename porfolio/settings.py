@@ -3,15 +3,15 @@ Django settings for portfolio project.
 """
 
 from pathlib import Path
-import os
-from dotenv import load_dotenv
-from decouple import config
+from decouple import AutoConfig
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-# Load environmental variable
-load_dotenv()
+# Settings come from the environment, then BASE_DIR/.env. Importing this
+# module has no other side effects: anything that needs the outside world
+# is a system check (core.checks)
+config = AutoConfig(search_path=BASE_DIR)
 
 # SECRET KEY - Use default for local development
 SECRET_KEY = config('SECRET_KEY', default='django-insecure-local-development-key-change-in-production')
@@ -39,12 +39,15 @@ INSTALLED_APPS = [
     'core',
     'projects',
     'certifications',
+    'api',
     'whitenoise.runserver_nostatic',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
         'whitenoise.middleware.WhiteNoiseMiddleware', # new
+    # Times everything below it; static files served by WhiteNoise are not measured
+    'core.instrumentation.ServerTimingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -58,10 +61,18 @@ ROOT_URLCONF = 'porfolio.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that records render time for ServerTimingMiddleware
+        'BACKEND': 'core.instrumentation.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Compile each template once per process; Django still reloads
+            # changed templates under runserver
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -76,9 +87,19 @@ TEMPLATES = [
 # Use 'porfolio' to match your actual project name
 WSGI_APPLICATION = 'porfolio.wsgi.application'
 
+# 'wsgi' (gunicorn sync workers) or 'asgi' (uvicorn workers), see gunicorn.conf.py.
+# ASGI routes the public pages to their async views, which run independent
+# queries concurrently (core.concurrency)
+WEB_SERVER = config('WEB_SERVER', default='wsgi')
+ASYNC_VIEWS = config('ASYNC_VIEWS', default=WEB_SERVER == 'asgi', cast=bool)
+# Each concurrent query takes its own connection: with DB_POOL, size the pool
+# for it (up to 3 per request)
+ASYNC_PARALLEL_QUERIES = config('ASYNC_PARALLEL_QUERIES', default=True, cast=bool)
+# Threads running those queries, per process; each keeps a persistent connection
+ASYNC_QUERY_WORKERS = config('ASYNC_QUERY_WORKERS', default=4, cast=int)
+
 #Database configuration - SQLite for local development
-import os
-if os.environ.get("USE_SQLITE", "False") == "True":
+if config('USE_SQLITE', default=False, cast=bool):
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
@@ -89,13 +110,120 @@ else:
     DATABASES = {
         'default': {
             'ENGINE': 'django.db.backends.postgresql',
-            'NAME': 'railway',
-            'USER': 'postgres',
-            'PASSWORD': os.environ['DB_PASSWORD'],
-            'HOST': 'gondola.proxy.rlwy.net',
-            'PORT': '15090',
+            'NAME': config('DB_NAME', default='railway'),
+            'USER': config('DB_USER', default='postgres'),
+            # Required; checked by core.checks rather than failing every import
+            'PASSWORD': config('DB_PASSWORD', default=''),
+            'HOST': config('DB_HOST', default='gondola.proxy.rlwy.net'),
+            'PORT': config('DB_PORT', default='15090'),
+            # Reuse each worker's connection across requests instead of paying a
+            # TCP + TLS + auth handshake to the proxy every time; health checks
+            # replace connections the proxy has silently dropped
+            'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+            'CONN_HEALTH_CHECKS': config('DB_CONN_HEALTH_CHECKS', default=True, cast=bool),
+            'OPTIONS': {
+                'connect_timeout': config('DB_CONNECT_TIMEOUT', default=5, cast=int),
+                'keepalives': 1,
+                'keepalives_idle': 30,
+                'keepalives_interval': 10,
+                'keepalives_count': 3,
+            },
+        }
+    }
+    # Optional psycopg 3 connection pool (pip install "psycopg[binary,pool]").
+    # Pooling replaces persistent connections, so CONN_MAX_AGE must be 0.
+    if config('DB_POOL', default=False, cast=bool):
+        from psycopg_pool import ConnectionPool
+
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+            'max_size': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+            'timeout': config('DB_POOL_TIMEOUT', default=10, cast=int),
+            # Validate connections on checkout, like CONN_HEALTH_CHECKS
+            'check': ConnectionPool.check_connection,
         }
+
+# Cache configuration - local memory by default, point CACHE_BACKEND/CACHE_LOCATION
+# at a shared cache (Redis, Memcached) so all gunicorn workers see the same entries
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='portfolio'),
     }
+}
+
+# Gunicorn workers (gunicorn reads the same variable). Invalidation goes
+# through the cache, so more than one needs a shared backend (core.checks)
+WEB_CONCURRENCY = config('WEB_CONCURRENCY', default=1, cast=int)
+
+# Full-page cache for anonymous visitors (see core.caching)
+PAGE_CACHE_ENABLED = config('PAGE_CACHE_ENABLED', default=True, cast=bool)
+PAGE_CACHE_TIMEOUT = config('PAGE_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Seconds browsers/CDNs may reuse a public page before revalidating it with
+# its ETag; 0 revalidates every time (a 304 costs no queries)
+PAGE_MAX_AGE = config('PAGE_MAX_AGE', default=0, cast=int)
+
+# Rendered card/navbar/footer fragments ({% cachedfragment %}); keys include
+# each object's updated_at, so the timeout only bounds memory use
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Facet counts on the list pages (core.facets); keyed on the same tag versions
+# as the pages, the timeout bounds date-based facets such as expired/valid
+FACET_CACHE_TIMEOUT = config('FACET_CACHE_TIMEOUT', default=60 * 60, cast=int)
+
+# Background work (image processing) - 'thread' runs it in a local worker pool,
+# 'sync' runs it inline (as the test runner, core.testing, does)
+BACKGROUND_TASKS = config('BACKGROUND_TASKS', default='thread')
+BACKGROUND_WORKERS = config('BACKGROUND_WORKERS', default=2, cast=int)
+
+# Set by the export_static command while rendering (core.export): list pages
+# show every row and no filters, since a static site cannot query
+STATIC_EXPORT = False
+
+# Per-request instrumentation (core.instrumentation): a Server-Timing header
+# with view, database, template and cache figures, one JSON log line per
+# request, and SLOW_REQUEST_SAMPLE_RATE of the requests slower than
+# SLOW_REQUEST_MS logged with their slowest SQL
+SERVER_TIMING = config('SERVER_TIMING', default=True, cast=bool)
+SLOW_REQUEST_MS = config('SLOW_REQUEST_MS', default=500, cast=int)
+SLOW_REQUEST_SAMPLE_RATE = config('SLOW_REQUEST_SAMPLE_RATE', default=1.0, cast=float)
+
+# /metrics (core.metrics) answers staff users, and scrapers that send
+# `Authorization: Bearer <METRICS_TOKEN>` when a token is set
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# N+1 query detection (core.nplusone): a SELECT repeated NPLUSONE_THRESHOLD
+# times in one request logs a warning with its call site under DEBUG, and
+# raises under the test runner (core.testing). NPLUSONE_ALLOW lists regexes of
+# queries allowed to repeat
+NPLUSONE = config('NPLUSONE', default='warn' if DEBUG else 'off')
+NPLUSONE_THRESHOLD = config('NPLUSONE_THRESHOLD', default=3, cast=int)
+NPLUSONE_ALLOW = []
+TEST_RUNNER = 'core.testing.TestRunner'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'core.instrumentation.JsonFormatter'},
+        'simple': {'format': '{asctime} {levelname} {name}: {message}', 'style': '{'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'simple'},
+        'json': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'root': {'handlers': ['console'], 'level': config('LOG_LEVEL', default='INFO')},
+    'loggers': {
+        'portfolio': {
+            'handlers': ['json'],
+            # The test runner (core.testing) keeps the per-request lines out of its output
+            'level': config('REQUEST_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+    },
+}
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -123,20 +251,21 @@ USE_TZ = True
 STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Media files configuration
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
-#MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
-# Create media directories if they don't exist
-os.makedirs(MEDIA_ROOT / 'profile', exist_ok=True)
-os.makedirs(MEDIA_ROOT / 'projects/main', exist_ok=True)
-os.makedirs(MEDIA_ROOT / 'projects/gallery', exist_ok=True)
-os.makedirs(MEDIA_ROOT / 'certifications', exist_ok=True)
-os.makedirs(MEDIA_ROOT / 'resume', exist_ok=True)
+# Uploads are stored under the hash of their content, so identical files are
+# kept once and served as immutable (core.storage); gc_media removes orphans
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.ContentHashedStorage'},
+    # Hashed, compressed copies written by collectstatic and served by WhiteNoise
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+#MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Upload directories are created by the storage on first save
 
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -144,6 +273,20 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Email configuration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Contact form (core.contact): each client IP and each email address may send
+# CONTACT_RATE_LIMIT messages per sliding CONTACT_RATE_WINDOW seconds, and an
+# identical message is dropped for CONTACT_DUPLICATE_WINDOW seconds.
+# Notifications go to CONTACT_NOTIFY_EMAIL, or the profile's email when unset
+CONTACT_RATE_LIMIT = config('CONTACT_RATE_LIMIT', default=5, cast=int)
+CONTACT_RATE_WINDOW = config('CONTACT_RATE_WINDOW', default=60 * 60, cast=int)
+CONTACT_DUPLICATE_WINDOW = config('CONTACT_DUPLICATE_WINDOW', default=60 * 60 * 24, cast=int)
+CONTACT_NOTIFY_EMAIL = config('CONTACT_NOTIFY_EMAIL', default='')
+# request.META key holding the visitor's address; behind proxies use
+# HTTP_X_FORWARDED_FOR with CLIENT_IP_PROXIES set to how many of them append to
+# it (the entry that many from the right is used, the rest can be forged)
+CLIENT_IP_HEADER = config('CLIENT_IP_HEADER', default='REMOTE_ADDR')
+CLIENT_IP_PROXIES = config('CLIENT_IP_PROXIES', default=1, cast=int)
+
 # Static files finders
 STATICFILES_FINDERS = [
     'django.contrib.staticfiles.finders.FileSystemFinder',
@@ -16,20 +16,24 @@ Including another URLconf
 """
 # ai_portfolio/urls.py
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
+from core.views import media, metrics
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('core.urls', namespace='core')),
     path('projects/', include('projects.urls', namespace='projects')),
     path('certifications/', include('certifications.urls', namespace='certifications')),
+    path('api/v1/', include('api.urls', namespace='api')),
+    # Uploads, with far-future caching for content-hashed names
+    re_path(rf'^{settings.MEDIA_URL.lstrip("/")}(?P<path>.*)$', media, name='media'),
+    path('metrics', metrics, name='metrics'),
 ]
 
-# Serve media and static files in development
+# Serve static files in development
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
     
     
\ No newline at end of file
@@ -1,6 +1,9 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
+from core.actions import bulk_update_action
 from .models import ProjectCategory, Technology, Project, ProjectImage
+from .signals import projects_updated
 
 class ProjectImageInline(admin.TabularInline):
     model = ProjectImage
@@ -14,36 +17,50 @@ class ProjectCategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
     search_fields = ('name', 'description')
     
+    def get_queryset(self, request):
+        # Counted in the changelist query instead of once per row
+        return super().get_queryset(request).annotate(project_total=Count('projects'))
+    
+    @admin.display(description='Projects', ordering='project_total')
     def project_count(self, obj):
-        return obj.projects.count()
-    project_count.short_description = 'Projects'
+        return obj.project_total
 
 @admin.register(Technology)
 class TechnologyAdmin(admin.ModelAdmin):
     list_display = ('name', 'icon', 'project_count')
     search_fields = ('name',)
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(project_total=Count('projects'))
+    
+    @admin.display(description='Projects', ordering='project_total')
     def project_count(self, obj):
-        return obj.projects.count()
-    project_count.short_description = 'Projects'
+        return obj.project_total
 
 @admin.register(Project)
 class ProjectAdmin(admin.ModelAdmin):
     list_display = ('title', 'category', 'status', 'featured', 'published', 'created_at', 'preview_image')
+    list_select_related = ('category',)
     list_filter = ('category', 'status', 'featured', 'published', 'created_at')
     list_editable = ('status', 'featured', 'published')
     prepopulated_fields = {'slug': ('title',)}
     filter_horizontal = ('technologies',)
     search_fields = ('title', 'description', 'detailed_description')
-    readonly_fields = ('preview_image', 'created_at', 'updated_at')
+    readonly_fields = ('preview_image', 'image_status', 'created_at', 'updated_at')
     inlines = [ProjectImageInline]
+    actions = [
+        bulk_update_action('publish', 'Publish selected projects', projects_updated, published=True),
+        bulk_update_action('unpublish', 'Unpublish selected projects', projects_updated, published=False),
+        bulk_update_action('feature', 'Feature selected projects', projects_updated, featured=True),
+        bulk_update_action('unfeature', 'Unfeature selected projects', projects_updated, featured=False),
+    ]
     
     fieldsets = (
         ('Basic Information', {
             'fields': ('title', 'slug', 'category', 'technologies', 'status', 'featured', 'published')
         }),
         ('Content', {
-            'fields': ('description', 'detailed_description', 'image', 'preview_image')
+            'fields': ('description', 'detailed_description', 'image', 'image_status', 'preview_image')
         }),
         ('Links & Dates', {
             'fields': ('github_url', 'live_demo_url', 'start_date', 'end_date')
@@ -67,6 +84,7 @@ class ProjectAdmin(admin.ModelAdmin):
 @admin.register(ProjectImage)
 class ProjectImageAdmin(admin.ModelAdmin):
     list_display = ('project', 'caption', 'order', 'preview_image')
+    list_select_related = ('project',)
     list_editable = ('order',)
     list_filter = ('project',)
     
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:26
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+POSTGRESQL_FORWARD = [
+    'CREATE INDEX projects_project_search_gin ON projects_project USING gin (search_vector)',
+    """
+    UPDATE projects_project p SET search_vector =
+        setweight(to_tsvector('english', coalesce(p.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce((
+            SELECT string_agg(t.name, ' ')
+            FROM projects_technology t
+            JOIN projects_project_technologies pt ON pt.technology_id = t.id
+            WHERE pt.project_id = p.id
+        ), '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(p.description, '')), 'C') ||
+        setweight(to_tsvector('english', coalesce(p.detailed_description, '')), 'D')
+    """,
+]
+
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE projects_project_fts USING fts5(
+        title, technologies, description, detailed_description,
+        tokenize = 'porter unicode61'
+    )
+    """,
+    """
+    INSERT INTO projects_project_fts (rowid, title, technologies, description, detailed_description)
+    SELECT p.id, p.title, coalesce((
+        SELECT group_concat(t.name, ' ')
+        FROM projects_technology t
+        JOIN projects_project_technologies pt ON pt.technology_id = t.id
+        WHERE pt.project_id = p.id
+    ), ''), p.description, p.detailed_description
+    FROM projects_project p
+    """,
+]
+
+
+def create_search_index(apps, schema_editor):
+    statements = {
+        'postgresql': POSTGRESQL_FORWARD,
+        'sqlite': SQLITE_FORWARD,
+    }.get(schema_editor.connection.vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS projects_project_search_gin')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS projects_project_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:28
+
+from django.db import migrations, models
+
+
+def mark_existing_images_pending(apps, schema_editor):
+    # Images uploaded before the pipeline existed were never resized
+    apps.get_model('projects', 'Project').objects.exclude(image='').exclude(image__isnull=True).update(image_status='pending')
+    apps.get_model('projects', 'ProjectImage').objects.exclude(image='').exclude(image__isnull=True).update(image_status='pending')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('', 'No image'), ('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='', editable=False, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='projectimage',
+            name='image_status',
+            field=models.CharField(blank=True, choices=[('', 'No image'), ('pending', 'Pending'), ('processing', 'Processing'), ('done', 'Done'), ('failed', 'Failed')], default='', editable=False, max_length=20),
+        ),
+        migrations.RunPython(mark_existing_images_pending, migrations.RunPython.noop),
+    ]
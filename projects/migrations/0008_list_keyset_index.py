@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_image_renditions'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-featured', '-created_at', '-id'], name='project_list_keyset_idx'),
+        ),
+    ]
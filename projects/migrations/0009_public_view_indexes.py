@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_list_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('published', True)), fields=['category', '-featured', '-created_at'], name='project_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectcategory',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='projectcategory_active_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0010_related_links'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(condition=models.Q(('published', True)), fields=['-updated_at'], name='project_updated_idx'),
+        ),
+    ]
@@ -1,9 +1,9 @@
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.contrib.postgres.search import SearchVectorField
 from django.utils.text import slugify
 from django.urls import reverse
-from io import BytesIO
-from django.core.files.uploadedfile import InMemoryUploadedFile
-import os
+from core import images
 
 class ProjectCategory(models.Model):
     name = models.CharField(max_length=150, unique=True)
@@ -17,6 +17,14 @@ class ProjectCategory(models.Model):
         verbose_name = 'Project Category'
         verbose_name_plural = 'Project Categories'
         ordering = ['order', 'name']
+        indexes = [
+            # Category filter options on the project list
+            models.Index(
+                fields=['order', 'name'],
+                condition=models.Q(is_active=True),
+                name='projectcategory_active_idx',
+            ),
+        ]
         
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -42,7 +50,32 @@ class Technology(models.Model):
     def __str__(self):
         return self.name
 
+class ProjectQuerySet(models.QuerySet):
+
+    def for_cards(self):
+        """
+        Everything a project card renders in a fixed number of queries:
+        the category, a technology count and the first three technologies.
+        """
+        technologies = Project.technologies.through.objects.filter(project=models.OuterRef('pk'))
+        return self.select_related('category').annotate(
+            # A subquery rather than Count(), which would GROUP BY every column
+            technology_count=Coalesce(
+                models.Subquery(technologies.order_by().values('project').annotate(count=models.Count('pk')).values('count')),
+                0,
+            ),
+        ).prefetch_related(
+            models.Prefetch(
+                'technologies',
+                queryset=Technology.objects.all()[:3],
+                to_attr='card_technologies',
+            ),
+        )
+
 class Project(models.Model):
+    # Uploaded images are resized to fit within this box (see core.images)
+    IMAGE_MAX_SIZE = (800, 600)
+    
     STATUS_CHOICES = [
         ('completed', 'Completed'),
         ('in_progress', 'In Progress'),
@@ -58,6 +91,11 @@ class Project(models.Model):
     status = models.CharField(max_length=30, choices=STATUS_CHOICES, default='completed')
     featured = models.BooleanField(default=False)
     image = models.ImageField(upload_to='projects/main/', blank=True, null=True)
+    image_status = models.CharField(
+        max_length=20, choices=images.IMAGE_STATUS_CHOICES, default='', blank=True, editable=False
+    )
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    image_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     github_url = models.URLField(blank=True)
     live_demo_url = models.URLField(blank=True, null=True)
     start_date = models.DateField(blank=True, null=True)
@@ -67,54 +105,48 @@ class Project(models.Model):
     meta_description = models.CharField(max_length=255, blank=True)
     meta_keywords = models.CharField(max_length=255, blank=True)
     
+    # Maintained by core.search on PostgreSQL (SQLite uses an FTS5 table)
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     published = models.BooleanField(default=True)
     
+    objects = ProjectQuerySet.as_manager()
+    
     class Meta:
         verbose_name = 'Project'
         verbose_name_plural = 'Projects'
         ordering = ['-featured', '-created_at']
+        indexes = [
+            # Keyset pagination of the public list (see projects.views)
+            models.Index(
+                fields=['-featured', '-created_at', '-id'],
+                condition=models.Q(published=True),
+                name='project_list_keyset_idx',
+            ),
+            # Category filter on the list and related projects on the detail page
+            models.Index(
+                fields=['category', '-featured', '-created_at'],
+                condition=models.Q(published=True),
+                name='project_category_idx',
+            ),
+            # Last-Modified of the API project list (see api.views)
+            models.Index(
+                fields=['-updated_at'],
+                condition=models.Q(published=True),
+                name='project_updated_idx',
+            ),
+        ]
         
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
             
-        # Resize project main image before saving
-        if self.image and not self._state.adding:
-            try:
-                from PIL import Image
-                
-                img = Image.open(self.image)
-                
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Resize to optimal project image size (800x600 max)
-                max_size = (800, 600)
-                if img.height > max_size[1] or img.width > max_size[0]:
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                    
-                    # Save the resized image
-                    img_io = BytesIO()
-                    img.save(img_io, format='JPEG', quality=85, optimize=True)
-                    img_io.seek(0)
-                    
-                    # Replace the image field
-                    self.image = InMemoryUploadedFile(
-                        img_io,
-                        'ImageField',
-                        f"{os.path.splitext(self.image.name)[0]}.jpg",
-                        'image/jpeg',
-                        img_io.getbuffer().nbytes,
-                        None
-                    )
-            except Exception as e:
-                print(f"Error processing project image: {e}")
-                pass
-        
+        # Resize project main image to 800x600 max once the upload is stored
+        images.mark_pending(self, 'image')
         super().save(*args, **kwargs)
+        images.schedule(self, 'image', self.IMAGE_MAX_SIZE)
 
     def __str__(self):
         return self.title
@@ -160,10 +192,23 @@ class Project(models.Model):
     def get_technologies_list(self):
         """Get list of technology names"""
         return list(self.technologies.values_list('name', flat=True))
+    
+    @property
+    def extra_technologies_count(self):
+        """Technologies not shown on the card (needs for_cards())"""
+        return max(self.technology_count - len(self.card_technologies), 0)
 
 class ProjectImage(models.Model):
+    # Uploaded images are resized to fit within this box (see core.images)
+    IMAGE_MAX_SIZE = (600, 400)
+    
     project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='images')
     image = models.ImageField(upload_to='projects/gallery/')
+    image_status = models.CharField(
+        max_length=20, choices=images.IMAGE_STATUS_CHOICES, default='', blank=True, editable=False
+    )
+    image_renditions = models.JSONField(default=dict, blank=True, editable=False)
+    image_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     caption = models.CharField(max_length=250, blank=True)
     order = models.PositiveIntegerField(default=0)
     
@@ -173,45 +218,32 @@ class ProjectImage(models.Model):
         ordering = ['order']
         
     def save(self, *args, **kwargs):
-        # Resize gallery images before saving
-        if self.image and not self._state.adding:
-            try:
-                from PIL import Image
-                
-                img = Image.open(self.image)
-                
-                # Convert to RGB if necessary
-                if img.mode in ('RGBA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Resize gallery images to optimal size (600x400 max)
-                max_size = (600, 400)
-                if img.height > max_size[1] or img.width > max_size[0]:
-                    img.thumbnail(max_size, Image.Resampling.LANCZOS)
-                    
-                    # Save the resized image
-                    img_io = BytesIO()
-                    img.save(img_io, format='JPEG', quality=85, optimize=True)
-                    img_io.seek(0)
-                    
-                    # Replace the image field
-                    self.image = InMemoryUploadedFile(
-                        img_io,
-                        'ImageField',
-                        f"{os.path.splitext(self.image.name)[0]}.jpg",
-                        'image/jpeg',
-                        img_io.getbuffer().nbytes,
-                        None
-                    )
-            except Exception as e:
-                print(f"Error processing project gallery image: {e}")
-                pass
-        
+        # Resize gallery images to 600x400 max once the upload is stored
+        images.mark_pending(self, 'image')
         super().save(*args, **kwargs)
+        images.schedule(self, 'image', self.IMAGE_MAX_SIZE)
         
     def __str__(self):
         return f'Image for {self.project.title}'
     
     @property
     def filename(self):
-        return self.image.name.split('/')[-1] if self.image else ""
\ No newline at end of file
+        return self.image.name.split('/')[-1] if self.image else ""
+
+class RelatedProject(models.Model):
+    """Precomputed neighbours of a project (see projects.related)"""
+    source = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_links')
+    related = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='related_to_links')
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'related'], name='unique_related_project'),
+        ]
+        indexes = [
+            models.Index(fields=['source', '-score'], name='related_project_score_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.source_id} -> {self.related_id} ({self.score:.2f})'
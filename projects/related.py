@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+from django.db.models import Q
+
+from core.related import RelatedIndex, jaccard, register
+from .models import Project, RelatedProject
+
+TECHNOLOGY_WEIGHT = 3.0
+CATEGORY_WEIGHT = 1.0
+
+
+@register
+class ProjectRelations(RelatedIndex):
+    model = Project
+    link_model = RelatedProject
+    tag = 'projects'
+
+    def features(self, condition=Q()):
+        projects = Project.objects.filter(condition, published=True)
+        technologies = defaultdict(set)
+        through = Project.technologies.through.objects.filter(project__in=projects.values('pk'))
+        for project_id, technology_id in through.values_list('project_id', 'technology_id'):
+            technologies[project_id].add(technology_id)
+
+        rows = projects.values_list('pk', 'category_id', 'start_date', 'created_at')
+        return {
+            pk: {
+                'category': category_id,
+                'technologies': technologies[pk],
+                'date': start_date or created_at.date(),
+            }
+            for pk, category_id, start_date, created_at in rows
+        }
+
+    def keys(self, features):
+        return [('category', features['category'])] + [
+            ('technology', technology) for technology in features['technologies']
+        ]
+
+    def sharing(self, keys):
+        through = Project.technologies.through.objects.filter(technology_id__in=keys['technology'])
+        return Q(category_id__in=keys['category']) | Q(pk__in=through.values('project_id'))
+
+    def similarity(self, a, b):
+        return (
+            TECHNOLOGY_WEIGHT * jaccard(a['technologies'], b['technologies'])
+            + CATEGORY_WEIGHT * (a['category'] == b['category'])
+        )
@@ -0,0 +1,48 @@
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+
+from core.search import SearchIndex, register
+from .models import Project, Technology
+
+
+@register
+class ProjectIndex(SearchIndex):
+    model = Project
+    columns = (
+        ('title', 'A'),
+        ('technologies', 'B'),
+        ('description', 'C'),
+        ('detailed_description', 'D'),
+    )
+
+    def get_queryset(self):
+        return Project.objects.prefetch_related('technologies')
+
+    def document(self, project):
+        return [
+            project.title,
+            ' '.join(tech.name for tech in project.technologies.all()),
+            project.description,
+            project.detailed_description,
+        ]
+
+    def vector_expressions(self):
+        # PostgreSQL only; importing it loads the psycopg type adapters
+        from django.contrib.postgres.aggregates import StringAgg
+
+        technology_names = Technology.objects.filter(
+            projects=OuterRef('pk'),
+        ).values('projects').annotate(
+            names=StringAgg('name', delimiter=' '),
+        ).values('names')
+        return [F('title'), Subquery(technology_names), F('description'), F('detailed_description')]
+
+    def fallback_filter(self, query):
+        matching_technologies = Project.technologies.through.objects.filter(
+            project=OuterRef('pk'),
+            technology__name__icontains=query,
+        )
+        return (
+            Q(title__icontains=query) |
+            Q(description__icontains=query) |
+            Exists(matching_technologies)
+        )
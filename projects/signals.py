@@ -0,0 +1,118 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.caching import purge
+from core.related import schedule_refresh
+from .models import Project, ProjectCategory, ProjectImage, Technology
+from .search import ProjectIndex
+
+
+@receiver([post_save, post_delete], sender=Project)
+@receiver([post_save, post_delete], sender=ProjectCategory)
+@receiver([post_save, post_delete], sender=Technology)
+@receiver([post_save, post_delete], sender=ProjectImage)
+@receiver(m2m_changed, sender=Project.technologies.through)
+def project_content_changed(sender, **kwargs):
+    # After the commit, or a request in between could cache the old rows again
+    transaction.on_commit(lambda: purge('projects'))
+
+
+def touch_projects(queryset):
+    """Bump updated_at so cached project cards keyed on it are re-rendered"""
+    queryset.update(updated_at=timezone.now())
+
+
+def projects_updated(pks):
+    """What post_save does for projects changed with QuerySet.update() (see core.actions)"""
+    transaction.on_commit(lambda: purge('projects'))
+    schedule_refresh(Project, pks)
+
+
+@receiver(post_save, sender=ProjectCategory)
+def touch_category_projects(sender, instance, created, **kwargs):
+    if not created:
+        touch_projects(Project.objects.filter(category=instance))
+
+
+@receiver(post_save, sender=Technology)
+def touch_technology_projects(sender, instance, created, **kwargs):
+    if not created:
+        touch_projects(Project.objects.filter(technologies=instance))
+
+
+@receiver([post_save, post_delete], sender=ProjectImage)
+def touch_gallery_project(sender, instance, **kwargs):
+    touch_projects(Project.objects.filter(pk=instance.project_id))
+
+
+@receiver(pre_delete, sender=Technology)
+def touch_projects_losing_technology(sender, instance, **kwargs):
+    # The through rows are deleted without an m2m_changed signal
+    projects = Project.objects.filter(technologies=instance)
+    schedule_refresh(Project, projects.values_list('pk', flat=True))
+    touch_projects(projects)
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def touch_changed_projects(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        pks = [instance.pk]
+    elif action == 'post_clear':
+        # Captured on pre_clear by index_project_technologies below
+        pks = instance._cleared_project_ids
+    else:
+        pks = list(pk_set)
+    touch_projects(Project.objects.filter(pk__in=pks))
+    schedule_refresh(Project, pks)
+
+
+@receiver(post_save, sender=Project)
+def refresh_project_relations(sender, instance, **kwargs):
+    schedule_refresh(Project, [instance.pk])
+
+
+@receiver(pre_delete, sender=Project)
+def remember_related_sources(sender, instance, **kwargs):
+    # The links pointing at the project are about to cascade away
+    instance._related_sources = list(instance.related_to_links.values_list('source_id', flat=True))
+
+
+@receiver(post_delete, sender=Project)
+def refresh_after_project_delete(sender, instance, **kwargs):
+    schedule_refresh(Project, [instance.pk], getattr(instance, '_related_sources', ()))
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, **kwargs):
+    ProjectIndex.update(instance)
+
+
+@receiver(post_delete, sender=Project)
+def unindex_project(sender, instance, **kwargs):
+    ProjectIndex.remove(instance.pk)
+
+
+@receiver(post_save, sender=Technology)
+def index_technology_projects(sender, instance, created, **kwargs):
+    if not created:
+        ProjectIndex.update_many(instance.projects.all())
+
+
+@receiver(m2m_changed, sender=Project.technologies.through)
+def index_project_technologies(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            ProjectIndex.update(instance)
+        return
+
+    # technology.projects.add/remove/clear(): the projects are on the other side
+    if action == 'pre_clear':
+        instance._cleared_project_ids = list(instance.projects.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        ProjectIndex.update_many(Project.objects.filter(pk__in=pk_set))
+    elif action == 'post_clear':
+        ProjectIndex.update_many(Project.objects.filter(pk__in=instance._cleared_project_ids))
@@ -1,3 +1,432 @@
-from django.test import TestCase
+import threading
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.caching import cache_stats, tag_versions
+from core.services import get_profile
+
+from .models import Project, ProjectCategory, RelatedProject, Technology
+from .related import ProjectRelations
+from .search import ProjectIndex
+from .views import PROJECTS_PER_PAGE
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ProjectListQueryTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = ProjectCategory.objects.create(name='Machine Learning')
+        self.technologies = [
+            Technology.objects.create(name=name)
+            for name in ('Django', 'NumPy', 'Pandas', 'PyTorch', 'Scikit-learn')
+        ]
+
+    def create_projects(self, count):
+        start = Project.objects.count()
+        for i in range(start, start + count):
+            project = Project.objects.create(
+                title=f'Project {i}', slug=f'project-{i}', description='Description',
+                detailed_description='Details', category=self.category,
+            )
+            project.technologies.set(self.technologies[:i % 6])
+
+    def assert_list_queries(self, expected, params=None):
+        # profile, projects, card technologies and one count per facet
+        # (category, technology, status)
+        cache.clear()
+        with self.assertNumQueries(expected):
+            response = self.client.get(reverse('projects:project_list'), params or {})
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_query_budget_does_not_grow_with_project_count(self):
+        self.create_projects(2)
+        self.assert_list_queries(6)
+        self.create_projects(10)
+        self.assert_list_queries(6)
+
+    def test_search_keeps_full_technology_count(self):
+        self.create_projects(6)
+        # The full-text match runs inside the list and facet queries
+        response = self.assert_list_queries(6, {'q': 'pytorch'})
+        projects = {p.title: p for p in response.context['projects']}
+        self.assertEqual(set(projects), {'Project 4', 'Project 5'})
+        self.assertEqual(projects['Project 5'].technology_count, 5)
+        self.assertEqual(len(projects['Project 5'].card_technologies), 3)
+        self.assertContains(response, '+2')
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ProjectFacetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        ml = ProjectCategory.objects.create(name='Machine Learning')
+        web = ProjectCategory.objects.create(name='Web')
+        django, pytorch = Technology.objects.create(name='Django'), Technology.objects.create(name='PyTorch')
+        for title, category, technologies, status in [
+            ('Classifier', ml, [pytorch], 'completed'),
+            ('Dashboard', web, [django, pytorch], 'in_progress'),
+            ('Shop', web, [django], 'completed'),
+        ]:
+            project = Project.objects.create(
+                title=title, description='d', detailed_description='d', category=category, status=status,
+            )
+            project.technologies.set(technologies)
+
+    def get(self, params):
+        response = self.client.get(reverse('projects:project_list'), params)
+        facets = {
+            facet['name']: {option['value']: option['count'] for option in facet['options']}
+            for facet in response.context['facets']
+        }
+        return [project.title for project in response.context['projects']], facets
+
+    def test_values_of_one_facet_are_combined_with_or(self):
+        titles, _ = self.get({'technology': ['Django', 'PyTorch']})
+        self.assertEqual(sorted(titles), ['Classifier', 'Dashboard', 'Shop'])
+
+    def test_facets_are_combined_with_and(self):
+        titles, _ = self.get({'technology': 'Django', 'status': 'completed'})
+        self.assertEqual(titles, ['Shop'])
+
+    def test_each_facet_is_counted_within_the_others(self):
+        _, facets = self.get({'category': 'web', 'technology': 'PyTorch'})
+        # Technology counts ignore the technology selection, not the category
+        self.assertEqual(facets['technology'], {'Django': 2, 'PyTorch': 1})
+        self.assertEqual(facets['category'], {'machine-learning': 1, 'web': 1})
+        self.assertEqual(facets['status'], {'completed': 0, 'in_progress': 1, 'planned': 0})
+
+    def test_multi_technology_filter_keeps_full_technology_count(self):
+        response = self.client.get(reverse('projects:project_list'), {'technology': ['Django', 'PyTorch']})
+        counts = {project.title: project.technology_count for project in response.context['projects']}
+        self.assertEqual(counts['Dashboard'], 2)
+
+    def test_counts_are_cached_until_projects_change(self):
+        self.get({})
+        # Projects and card technologies only
+        with self.assertNumQueries(2):
+            self.get({})
+        Project.objects.filter(title='Shop').update(status='planned')
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.get(title='Shop').save()
+        _, facets = self.get({})
+        self.assertEqual(facets['status']['planned'], 1)
+        self.assertEqual(cache_stats('facet'), {'hits': 3, 'misses': 6, 'hit_rate': 1 / 3})
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ProjectSearchTests(TestCase):
+
+    def setUp(self):
+        category = ProjectCategory.objects.create(name='Computer Vision')
+        self.pytorch = Technology.objects.create(name='PyTorch')
+        self.crack = Project.objects.create(
+            title='CrackVision', description='Detects cracks in concrete surfaces',
+            detailed_description='A convolutional network', category=category,
+        )
+        self.hotel = Project.objects.create(
+            title='Hotel Booking', description='Reservation system',
+            detailed_description='Built on a concrete foundation of Django', category=category,
+        )
+
+    def search(self, query):
+        return list(ProjectIndex.search(Project.objects.all(), query).order_by('-search_rank'))
+
+    def test_prefix_match_ranked_by_field_weight(self):
+        self.assertEqual(self.search('concr'), [self.crack, self.hotel])
+        self.assertEqual(self.search('concrete django'), [self.hotel])
+
+    def test_index_follows_technology_changes(self):
+        self.assertEqual(self.search('pytorch'), [])
+        self.crack.technologies.add(self.pytorch)
+        self.assertEqual(self.search('pytorch'), [self.crack])
+        self.pytorch.name = 'Torch'
+        self.pytorch.save()
+        self.assertEqual(self.search('pytorch'), [])
+        self.assertEqual(self.search('torch'), [self.crack])
+        self.pytorch.projects.clear()
+        self.assertEqual(self.search('torch'), [])
+
+    def test_deleted_projects_leave_the_index(self):
+        self.crack.delete()
+        self.assertEqual(self.search('concrete'), [self.hotel])
+
+    def test_snippet_is_highlighted(self):
+        response = self.client.get(reverse('projects:project_list'), {'q': 'cracks'})
+        self.assertContains(response, '<mark>cracks</mark>')
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ProjectPaginationTests(TestCase):
+
+    def setUp(self):
+        category = ProjectCategory.objects.create(name='Web')
+        for i in range(PROJECTS_PER_PAGE * 2 + 3):
+            Project.objects.create(
+                title=f'Project {i}', slug=f'project-{i}', description='Description',
+                detailed_description='Details', category=category, featured=i % 5 == 0,
+            )
+
+    def test_cursor_walks_every_project_once_in_order(self):
+        url = reverse('projects:project_list')
+        seen, params = [], {}
+        while True:
+            page = self.client.get(url, params).context['page']
+            seen.extend(project.pk for project in page)
+            if not page.has_next:
+                break
+            params = {'cursor': page.next_cursor}
+        expected = list(Project.objects.order_by('-featured', '-created_at', '-id').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_partial_returns_only_the_next_cards(self):
+        url = reverse('projects:project_list')
+        cursor = self.client.get(url).context['page'].next_cursor
+        response = self.client.get(url, {'cursor': cursor, 'partial': '1'})
+        self.assertNotContains(response, '<html')
+        self.assertContains(response, 'class="project-card"', count=PROJECTS_PER_PAGE)
+        self.assertContains(response, 'data-load-more')
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        url = reverse('projects:project_list')
+        first = [p.pk for p in self.client.get(url).context['page']]
+        for cursor in ('garbage', 'WyJ4Il0', 'WzEsIDJd'):
+            response = self.client.get(url, {'cursor': cursor})
+            self.assertEqual([p.pk for p in response.context['page']], first)
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class ProjectCardFragmentTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.category = ProjectCategory.objects.create(name='Vision')
+        self.technology = Technology.objects.create(name='PyTorch')
+        self.project = Project.objects.create(
+            title='CrackVision', description='Crack detection', detailed_description='CNN',
+            category=self.category,
+        )
+        self.project.technologies.add(self.technology)
+        self.url = reverse('projects:project_list')
+
+    def test_cards_are_reused_between_requests(self):
+        self.client.get(self.url)
+        hits = cache_stats('fragment')['hits']
+        self.assertContains(self.client.get(self.url), 'CrackVision')
+        # the card plus the navbar and footer
+        self.assertEqual(cache_stats('fragment')['hits'] - hits, 3)
+
+    def test_related_changes_refresh_the_card(self):
+        self.client.get(self.url)
+
+        self.technology.name = 'Torch'
+        self.technology.save()
+        self.assertContains(self.client.get(self.url), 'Torch</span>')
+
+        self.category.name = 'Computer Vision'
+        self.category.save()
+        self.assertContains(self.client.get(self.url), 'Computer Vision')
+
+        self.project.technologies.remove(self.technology)
+        self.assertNotContains(self.client.get(self.url), 'Torch</span>')
+
+    def test_search_snippets_are_not_shared_with_plain_cards(self):
+        self.client.get(self.url)
+        self.assertContains(self.client.get(self.url, {'q': 'crack'}), '<mark>Crack</mark>')
+
+
+@override_settings(PAGE_CACHE_ENABLED=False)
+class RelatedProjectTests(TestCase):
+
+    def setUp(self):
+        self.ml = ProjectCategory.objects.create(name='Machine Learning')
+        self.web = ProjectCategory.objects.create(name='Web')
+        self.django, self.pytorch, self.numpy = (
+            Technology.objects.create(name=name) for name in ('Django', 'PyTorch', 'NumPy')
+        )
+        self.vision = self.create('Vision', self.ml, [self.django, self.pytorch])
+        self.serving = self.create('Serving', self.web, [self.django, self.pytorch])
+        self.notebook = self.create('Notebook', self.ml, [])
+        self.blog = self.create('Blog', self.web, [self.numpy])
+
+    def create(self, title, category, technologies):
+        with self.captureOnCommitCallbacks(execute=True):
+            project = Project.objects.create(
+                title=title, description='d', detailed_description='d', category=category,
+            )
+            project.technologies.set(technologies)
+        return project
+
+    def related(self, project):
+        return list(
+            Project.objects.filter(related_to_links__source=project).order_by('-related_to_links__score')
+        )
+
+    def links(self):
+        return set(RelatedProject.objects.values_list('source_id', 'related_id', 'score'))
+
+    def test_shared_technologies_outrank_a_shared_category(self):
+        self.assertEqual(self.related(self.vision), [self.serving, self.notebook])
+        self.assertEqual(self.related(self.blog), [self.serving])
+
+    def test_changes_are_applied_incrementally(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.blog.technologies.add(self.django, self.pytorch)
+        self.assertIn(self.blog, self.related(self.vision))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.serving.delete()
+        self.assertEqual(self.related(self.vision), [self.blog, self.notebook])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notebook.published = False
+            self.notebook.save()
+        self.assertEqual(self.related(self.vision), [self.blog])
+
+        incremental = self.links()
+        ProjectRelations.rebuild()
+        self.assertEqual(self.links(), incremental)
+
+    def test_refresh_loads_only_rows_sharing_a_key_and_purges_pages(self):
+        loner = self.create('Loner', ProjectCategory.objects.create(name='Games'), [])
+        features = ProjectRelations.features
+        loaded = set()
+
+        def spy(*args):
+            rows = features(*args)
+            loaded.update(rows)
+            return rows
+
+        versions = tag_versions('projects')
+        with mock.patch.object(ProjectRelations, 'features', side_effect=spy):
+            with self.captureOnCommitCallbacks(execute=True):
+                ProjectRelations.refresh([self.vision.pk])
+        self.assertIn(self.serving.pk, loaded)
+        self.assertNotIn(loner.pk, loaded)
+        self.assertNotEqual(tag_versions('projects'), versions)
+
+    def test_detail_page_reads_precomputed_neighbours(self):
+        response = self.client.get(reverse('projects:project_detail', args=[self.vision.slug]))
+        self.assertEqual(list(response.context['related_projects']), [self.serving, self.notebook])
+
+
+
+class RelatedProjectRefreshRaceTests(TransactionTestCase):
+
+    def setUp(self):
+        category = ProjectCategory.objects.create(name='Machine Learning')
+        django = Technology.objects.create(name='Django')
+        self.projects = []
+        for n in range(4):
+            project = Project.objects.create(
+                title=f'Project {n}', description='d', detailed_description='d', category=category,
+            )
+            project.technologies.add(django)
+            self.projects.append(project.pk)
+
+    def links(self):
+        return set(RelatedProject.objects.values_list('source_id', 'related_id', 'score'))
+
+    def test_overlapping_refreshes_run_one_at_a_time(self):
+        barrier = threading.Barrier(2, timeout=0.5)
+        compute, store = ProjectRelations._links, ProjectRelations._store
+        events, errors = [], []
+
+        def computed(*args):
+            links = compute(*args)
+            # Both would have their links before either stores them, unless one waits for the other
+            try:
+                barrier.wait()
+            except threading.BrokenBarrierError:
+                pass
+            events.append('computed')
+            return links
+
+        def stored(*args):
+            store(*args)
+            events.append('stored')
+
+        def refresh(pks):
+            try:
+                ProjectRelations.refresh(pks)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        first, second, third, _ = self.projects
+        with mock.patch.object(ProjectRelations, '_links', side_effect=computed), \
+                mock.patch.object(ProjectRelations, '_store', side_effect=stored):
+            threads = [
+                threading.Thread(target=refresh, args=([first, second],)),
+                threading.Thread(target=refresh, args=([second, third],)),
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(events, ['computed', 'stored', 'computed', 'stored'])
+
+        refreshed = self.links()
+        ProjectRelations.rebuild()
+        self.assertEqual(self.links(), refreshed)
+
+class ProjectAdminTests(TestCase):
+
+    def setUp(self):
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'pw'))
+        # Cached for the rest of the test, so every changelist costs the same
+        get_profile()
+        self.technologies = [Technology.objects.create(name=f'Tech {n}') for n in range(3)]
+
+    def add_projects(self, count):
+        for _ in range(count):
+            n = Project.objects.count()
+            category = ProjectCategory.objects.create(name=f'Category {n}')
+            project = Project.objects.create(
+                title=f'Project {n}', description='d', detailed_description='d', category=category, published=False,
+            )
+            project.technologies.set(self.technologies)
+
+    def changelist_queries(self, name):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(f'admin:projects_{name}_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        self.add_projects(2)
+        before = {name: self.changelist_queries(name) for name in ('projectcategory', 'technology', 'project')}
+        self.add_projects(6)
+        after = {name: self.changelist_queries(name) for name in ('projectcategory', 'technology', 'project')}
+        self.assertEqual(before, after)
+
+    def test_project_counts_are_annotated(self):
+        self.add_projects(3)
+        response = self.client.get(reverse('admin:projects_technology_changelist'), {'o': '-3'})
+        self.assertEqual([t.project_total for t in response.context['cl'].result_list], [3, 3, 3])
+        self.assertContains(response, '<td class="field-project_count">3</td>', count=3, html=True)
+
+    def test_bulk_publish_is_one_update(self):
+        self.add_projects(3)
+        versions = tag_versions('projects')
+        pks = list(Project.objects.values_list('pk', flat=True))
+        data = {'action': 'publish', '_selected_action': pks}
+        with self.captureOnCommitCallbacks(execute=True), CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('admin:projects_project_changelist'), data)
+        updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "projects_project" SET "published"')]
+        self.assertEqual(len(updates), 1)
+        self.assertEqual(Project.objects.filter(published=True).count(), 3)
+        self.assertNotEqual(tag_versions('projects'), versions)
+        # The related index now includes them
+        self.assertTrue(RelatedProject.objects.exists())
 
-# Create your tests here.
@@ -1,9 +1,11 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 app_name = 'projects'
 
+# Public pages use their async views when served over ASGI (see settings.ASYNC_VIEWS)
 urlpatterns = [
-    path('', views.project_list, name='project_list'),
-    path('<slug:slug>/', views.project_detail, name='project_detail'),
+    path('', views.aproject_list if settings.ASYNC_VIEWS else views.project_list, name='project_list'),
+    path('<slug:slug>/', views.aproject_detail if settings.ASYNC_VIEWS else views.project_detail, name='project_detail'),
 ]
\ No newline at end of file
@@ -1,68 +1,103 @@
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Q
-from .models import Project, ProjectCategory
+from asgiref.sync import sync_to_async
+from core.caching import cache_public_page
+from core.concurrency import arender, gather_queries, load_queries
+from core.facets import Facet, FacetedFilter
+from core.pagination import KeysetPaginator, is_partial
+from .models import Project
+from .search import ProjectIndex
 
-def project_list(request):
+PROJECTS_PER_PAGE = 12
+
+# Keyset orderings; each ends with the primary key so the cursor is unique
+PROJECT_ORDERING = ('-featured', '-created_at', '-id')
+SEARCH_ORDERING = ('-search_rank', '-featured', '-created_at', '-id')
+
+PROJECT_FACETS = (
+    Facet('category', 'category__slug', 'Category', label_field='category__name'),
+    Facet('technology', 'technologies__name', 'Technology', many=True, limit=20),
+    Facet('status', 'status', 'Status', choices=Project.STATUS_CHOICES),
+)
+
+def project_list_queries(request):
     """
-    List all projects with filtering and search functionality
+    The project list's independent queries (the page of cards and the facet
+    counts), plus the context that needs no query
     """
-    # Get filter parameters
-    category_slug = request.GET.get('category')
     search_query = request.GET.get('q')
     
     # Start with all published projects
-    projects = Project.objects.filter(published=True).select_related('category').prefetch_related('technologies')
-    
-    # Apply filters
-    if category_slug and category_slug != 'all':
-        try:
-            category = ProjectCategory.objects.get(slug=category_slug, is_active=True)
-            projects = projects.filter(category=category)
-        except ProjectCategory.DoesNotExist:
-            pass
+    projects = Project.objects.filter(published=True)
     
-    # Apply search
+    # Apply search, ranking matches by relevance
     if search_query:
-        projects = projects.filter(
-            Q(title__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(technologies__name__icontains=search_query)
-        ).distinct()
+        projects = ProjectIndex.search(projects, search_query)
+        ordering = SEARCH_ORDERING
+    else:
+        ordering = PROJECT_ORDERING
     
-    # Order projects
-    projects = projects.order_by('-featured', '-created_at')
-    
-    # Get filter options
-    categories = ProjectCategory.objects.filter(is_active=True)
-    
-    context = {
-        'projects': projects,
-        'categories': categories,
-        'selected_category': category_slug,
-        'search_query': search_query or '',
-    }
+    # Apply the category/technology/status filters
+    faceted = FacetedFilter(request, PROJECT_FACETS, tags=('projects',))
+    projects = faceted.apply(projects).for_cards()
     
+    paginator = KeysetPaginator(projects, ordering, PROJECTS_PER_PAGE)
+    if settings.STATIC_EXPORT:
+        # A static site can neither filter nor load more: every card on one page
+        return {'page': paginator.everything}, {'filtered': False, 'search_query': '', 'static_export': True}
+    queries = {'page': lambda: paginator.page(request.GET.get('cursor'))}
+    # "Load more" requests only need the next page's cards
+    if not is_partial(request):
+        queries['facets'] = faceted.facets_context
+    return queries, {'filtered': faceted.active, 'search_query': search_query or ''}
+
+def render_project_list(request, context):
+    context['projects'] = context['page']
+    if is_partial(request):
+        return render(request, 'projects/includes/project_page.html', context)
     return render(request, 'projects/project_list.html', context)
 
+@cache_public_page('profile', 'projects')
+def project_list(request):
+    """
+    List all projects with filtering and search functionality
+    """
+    queries, context = project_list_queries(request)
+    return render_project_list(request, {**context, **load_queries(queries)})
+
+@cache_public_page('profile', 'projects')
+async def aproject_list(request):
+    """project_list for the ASGI server, loading the page and facet counts concurrently"""
+    # Search may query while building the queryset (SQLite FTS)
+    queries, context = await sync_to_async(project_list_queries)(request)
+    context.update(await gather_queries(queries))
+    return await sync_to_async(render_project_list)(request, context)
+
+def project_detail_queries(slug):
+    """The project and its related projects, independent of each other"""
+    return {
+        'project': lambda: get_object_or_404(
+            Project.objects.select_related('category').prefetch_related('technologies', 'images'),
+            slug=slug, 
+            published=True
+        ),
+        # Precomputed related projects (see projects.related), best match first
+        'related_projects': lambda: list(
+            Project.objects.filter(
+                related_to_links__source__slug=slug,
+                published=True
+            ).select_related('category').order_by('-related_to_links__score')[:3]
+        ),
+    }
+
+@cache_public_page('profile', 'projects')
 def project_detail(request, slug):
     """
     Display details of a specific project
     """
-    project = get_object_or_404(
-        Project.objects.select_related('category').prefetch_related('technologies', 'images'),
-        slug=slug, 
-        published=True
-    )
-    
-    # Get related projects (same category, excluding current project)
-    related_projects = Project.objects.filter(
-        category=project.category, 
-        published=True
-    ).exclude(id=project.id).select_related('category')[:3]
-    
-    context = {
-        'project': project,
-        'related_projects': related_projects,
-    }
-    
-    return render(request, 'projects/project_detail.html', context)
\ No newline at end of file
+    return render(request, 'projects/project_detail.html', load_queries(project_detail_queries(slug)))
+
+@cache_public_page('profile', 'projects')
+async def aproject_detail(request, slug):
+    """project_detail for the ASGI server, loading the project and related ones concurrently"""
+    return await arender(request, 'projects/project_detail.html', await gather_queries(project_detail_queries(slug)))
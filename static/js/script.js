@@ -11,6 +11,9 @@ document.addEventListener('DOMContentLoaded', function() {
     
     // Card interactions
     initializeCardInteractions();
+    
+    // "Load more" buttons on paginated lists
+    initializeLoadMore();
 });
 
 // Function to handle smooth scrolling
@@ -88,6 +91,44 @@ function initializeCardInteractions() {
     });
 }
 
+// Fetch the next page's cards and append them in place. The link itself
+// points at the full next page, so it still works without JavaScript.
+function initializeLoadMore() {
+    document.addEventListener('click', function(e) {
+        const link = e.target.closest('[data-load-more] a');
+        if (!link) {
+            return;
+        }
+        e.preventDefault();
+        
+        const container = link.closest('[data-load-more]');
+        const grid = document.querySelector(link.dataset.target);
+        const url = new URL(link.href);
+        url.searchParams.set('partial', '1');
+        link.classList.add('disabled');
+        
+        fetch(url).then(response => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.text();
+        }).then(html => {
+            const fragment = document.createRange().createContextualFragment(html);
+            const next = fragment.querySelector('[data-load-more]');
+            if (next) {
+                next.remove();
+                container.replaceWith(next);
+            } else {
+                container.remove();
+            }
+            grid.appendChild(fragment);
+        }).catch(() => {
+            // Fall back to a normal page load
+            window.location.href = link.href;
+        });
+    });
+}
+
 // Loading animations
 window.addEventListener('load', function() {
     document.body.classList.add('loaded');
@@ -139,8 +180,8 @@ function updateFilter(type, value) {
         url.searchParams.set(type, value);
     }
     
-    // Remove page parameter when changing filters
-    url.searchParams.delete('page');
+    // Start from the first page when changing filters
+    url.searchParams.delete('cursor');
     
     window.location.href = url.toString();
 }